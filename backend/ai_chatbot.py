@@ -1,16 +1,30 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, Annotated, Sequence
+from typing import Any, Optional, TypedDict, Annotated, Sequence
+import asyncio
 import operator
+import logging
+import time
+from backend import metrics
 from backend.config import settings
 from backend.database import get_database
-from datetime import datetime
+from backend.schedule_window import find_in_window, local_now
+from backend.freebusy import free_busy
+from backend import user_stats
+from datetime import timedelta
+
+logger = logging.getLogger(__name__)
+
+# The LLM stack (langchain, langgraph, openai) takes seconds to import, so it is
+# imported on the first chat request, or in the background by warm_up, instead
+# of when the app starts
+
+def _import_llm_stack():
+    import langchain_core.messages  # noqa: F401
+    import langchain_openai  # noqa: F401
+    import langgraph.graph  # noqa: F401
 
 # Define the state for our graph
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[HumanMessage | AIMessage | SystemMessage], operator.add]
+    messages: Annotated[Sequence[Any], operator.add]  # langchain messages
     user_id: str
     user_context: dict
 
@@ -18,10 +32,13 @@ class AcademicPlannerChatbot:
     def __init__(self):
         self.llm = None
         self.graph = None
+        self._warm_up: Optional[asyncio.Task] = None
     
     def _initialize(self):
         """Lazy initialization of LLM and graph"""
         if self.llm is None:
+            from langchain_openai import ChatOpenAI
+            
             self.llm = ChatOpenAI(
                 model="gpt-3.5-turbo",
                 temperature=0.7,
@@ -29,8 +46,24 @@ class AcademicPlannerChatbot:
             )
             self.graph = self._create_graph()
     
-    async def get_user_context(self, user_id: str) -> dict:
-        """Fetch user's courses, assignments, and schedules for context"""
+    def start_warm_up(self):
+        """Import the LLM stack in the background so the first chat request doesn't wait for it"""
+        if self._warm_up is None:
+            self._warm_up = asyncio.get_running_loop().create_task(self._import_in_background())
+    
+    async def _import_in_background(self):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _import_llm_stack)
+            logger.info("Chatbot dependencies loaded")
+        except Exception as e:
+            logger.warning(f"Chatbot warm-up failed: {e}")
+    
+    async def get_user_context(self, user_id: str, tz_offset: int = 0) -> dict:
+        """Fetch user's courses, assignments, and schedules for context.
+        
+        Stored times are the user's wall-clock times, so "now" is the client's
+        local time, ``tz_offset`` minutes from UTC.
+        """
         try:
             db = await get_database()
             
@@ -44,14 +77,23 @@ class AcademicPlannerChatbot:
             }).sort("due_date", 1).to_list(length=None)
             
             # Get upcoming schedules
-            now = datetime.utcnow()
+            now = local_now(tz_offset)
             schedules = await db.schedules.find({
                 "user_id": user_id,
                 "start_time": {"$gte": now}
             }).sort("start_time", 1).limit(10).to_list(length=None)
             
+            # Free time over the next week, computed here rather than left to the LLM
+            week_end = now + timedelta(days=7)
+            week_events = await find_in_window(db, user_id, now, week_end)
+            _, free_slots = free_busy(week_events, now, week_end, resolution_minutes=5, min_free_minutes=60)
+            
+            # Counts come from the maintained stats document instead of a scan
+            stats = user_stats.summarize(await user_stats.get_stats(db, user_id), now)
+            
             # Format context
             context = {
+                "stats": stats,
                 "courses": [
                     {
                         "name": c.get("course_name"),
@@ -74,13 +116,19 @@ class AcademicPlannerChatbot:
                         "end_time": s.get("end_time").strftime("%Y-%m-%d %H:%M") if s.get("end_time") else None,
                         "location": s.get("location")
                     } for s in schedules
+                ],
+                "free_slots": [
+                    {
+                        "start": slot_start.strftime("%Y-%m-%d %H:%M"),
+                        "end": slot_end.strftime("%Y-%m-%d %H:%M")
+                    } for slot_start, slot_end in free_slots[:15]
                 ]
             }
             
             return context
         except Exception as e:
-            print(f"Error getting user context: {str(e)}")
-            return {"courses": [], "assignments": [], "schedules": []}
+            logger.exception(f"Error getting user context: {str(e)}")
+            return {"stats": {}, "courses": [], "assignments": [], "schedules": [], "free_slots": []}
     
     def _create_system_prompt(self, user_context: dict) -> str:
         """Create a system prompt with user context"""
@@ -93,6 +141,15 @@ class AcademicPlannerChatbot:
             f"- {s['title']} ({s['start_time']} to {s['end_time']})" 
             for s in user_context.get("schedules", [])
         ])
+        stats = user_context.get("stats") or {}
+        overview_text = (
+            f"{stats['pending']} pending ({stats['overdue']} overdue, "
+            f"{stats['due_this_week']} due in the next 7 days), {stats['completed']} completed"
+        ) if stats else ""
+        free_text = "\n".join([
+            f"- {slot['start']} to {slot['end']}"
+            for slot in user_context.get("free_slots", [])
+        ])
         
         return f"""You are an AI academic planning assistant for students. Your role is to help students:
 1. Manage their time effectively
@@ -105,6 +162,9 @@ class AcademicPlannerChatbot:
 
 Current Student Context:
 
+ASSIGNMENT OVERVIEW:
+{overview_text if overview_text else "No assignment statistics available"}
+
 ENROLLED COURSES:
 {courses_text if courses_text else "No courses enrolled yet"}
 
@@ -114,12 +174,17 @@ PENDING ASSIGNMENTS:
 UPCOMING SCHEDULE:
 {schedules_text if schedules_text else "No upcoming scheduled events"}
 
+FREE TIME IN THE NEXT 7 DAYS (slots of 1 hour or more, in the student's local time):
+{free_text if free_text else "No free slots of an hour or more"}
+
 Provide helpful, actionable advice based on the student's current academic situation. Be encouraging, practical, and specific. When suggesting study plans or time management strategies, consider their actual course load and deadlines.
 
 If asked about specific assignments or courses, refer to the information provided above. If you don't have enough information, ask clarifying questions."""
 
     async def process_node(self, state: AgentState) -> AgentState:
         """Process the user's message and generate a response"""
+        from langchain_core.messages import AIMessage, SystemMessage
+        
         try:
             # Create system prompt with context
             system_prompt = self._create_system_prompt(state["user_context"])
@@ -129,6 +194,7 @@ If asked about specific assignments or courses, refer to the information provide
             
             # Get response from LLM
             response = await self.llm.ainvoke(messages)
+            metrics.record_llm_usage(self.llm.model_name, response)
             
             # Add AI response to messages
             return {
@@ -146,6 +212,8 @@ If asked about specific assignments or courses, refer to the information provide
     
     def _create_graph(self):
         """Create the LangGraph workflow"""
+        from langgraph.graph import StateGraph, END
+        
         workflow = StateGraph(AgentState)
         
         # Add nodes
@@ -160,14 +228,20 @@ If asked about specific assignments or courses, refer to the information provide
         # Compile the graph
         return workflow.compile()
     
-    async def chat(self, user_id: str, message: str) -> str:
+    async def chat(self, user_id: str, message: str, tz_offset: int = 0) -> str:
         """Main chat interface"""
+        started = time.perf_counter()
+        outcome = "success"
         try:
-            # Initialize LLM if not already done
+            # Initialize LLM if not already done; the imports run off the event loop,
+            # waiting on a warm-up that is still importing rather than blocking it
+            if self.llm is None:
+                await asyncio.get_running_loop().run_in_executor(None, _import_llm_stack)
             self._initialize()
+            from langchain_core.messages import AIMessage, HumanMessage
             
             # Get user context
-            user_context = await self.get_user_context(user_id)
+            user_context = await self.get_user_context(user_id, tz_offset)
             
             # Create initial state
             initial_state = {
@@ -187,8 +261,11 @@ If asked about specific assignments or courses, refer to the information provide
                 return "I'm sorry, I couldn't generate a response. Please try again."
                 
         except Exception as e:
-            print(f"Chat error: {str(e)}")
+            outcome = "error"
+            logger.exception(f"Chat error: {str(e)}")
             return f"I apologize, but I encountered an error processing your request. Please ensure your OpenAI API key is configured correctly and try again."
+        finally:
+            metrics.chat_duration.observe(time.perf_counter() - started, outcome)
 
 # Create a singleton instance
 chatbot = AcademicPlannerChatbot()
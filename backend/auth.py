@@ -1,5 +1,9 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -8,10 +12,44 @@ from backend.config import settings
 from backend.models import TokenData, User
 from backend.database import get_database
 
+logger = logging.getLogger(__name__)
+
 # Security configuration
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+class TokenCache:
+    """LRU of verified access-token claims keyed by token digest.
+    
+    Entries expire at the token's ``exp``, so a cache hit is exactly as valid
+    as decoding the token again. Only successfully verified tokens are stored.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+    
+    def get(self, token: str) -> Optional[dict]:
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user
+    
+    def put(self, token: str, user: dict, expires_at: float):
+        key = hashlib.sha256(token.encode()).digest()
+        self._entries[key] = (user, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+token_cache = TokenCache(settings.JWT_CACHE_SIZE)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -41,6 +79,11 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Get the current user from the token, verifying each token only once while cached"""
+    user = token_cache.get(token)
+    if user is not None:
+        return dict(user)
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,17 +100,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         user_id = payload.get("user_id")
         email = payload.get("email")
         
-        if not email or not user_id:
+        # Tokens without an expiry would stay valid forever; create_access_token always sets one
+        expires_at = payload.get("exp")
+        if not email or not user_id or expires_at is None:
             raise credentials_exception
             
         # Return user data from token
-        return {
+        user = {
             "_id": user_id,
             "email": email
         }
+        token_cache.put(token, user, expires_at)
+        return dict(user)
         
     except JWTError as e:
-        print(f"JWT Error: {e}")
+        logger.debug(f"JWT Error: {e}")
         raise credentials_exception
 
 async def get_current_user_id(current_user: dict = Depends(get_current_user)) -> str:
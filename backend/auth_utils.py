@@ -1,11 +1,10 @@
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from typing import Dict
+from jose import jwt
 
 from backend.config import settings
+# Single implementation of passwords, access tokens and the token check, shared with the API routers
+from backend.auth import create_access_token, get_current_user, get_password_hash, verify_password
 
 # Security configuration - Using settings from config
 SECRET_KEY = settings.SECRET_KEY
@@ -13,28 +12,6 @@ ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = 7  # You might want to move this to settings as well
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    """Generate a password hash."""
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a new access token."""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
 def create_refresh_token(data: dict) -> str:
     """Create a new refresh token."""
     to_encode = data.copy()
@@ -43,34 +20,6 @@ def create_refresh_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Get the current user from the token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("type") != "access":
-            raise credentials_exception
-            
-        # Get user data from token
-        user_id = payload.get("user_id")
-        email = payload.get("email")
-        
-        if not email:
-            raise credentials_exception
-            
-        # Return user data from token
-        return {
-            "_id": user_id,
-            "email": email
-        }
-    except JWTError as e:
-        print(f"JWT Error: {e}")
-        raise credentials_exception
-
 def create_tokens(data: dict) -> Dict[str, str]:
     """Create both access and refresh tokens."""
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
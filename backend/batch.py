@@ -0,0 +1,110 @@
+from typing import Callable, List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.config import settings
+from backend.models import BatchItemResult, BatchResponse
+
+class BatchItemError(Exception):
+    """Raised while preparing a single batch operation to reject only that item"""
+
+async def run_batch(
+    collection,
+    user_id: str,
+    operations: list,
+    build_create: Callable[[object], dict],
+    build_update: Callable[[object], dict],
+    on_success: Optional[Callable[[Optional[dict], Optional[dict]], None]] = None
+) -> BatchResponse:
+    """Apply create/update/delete operations as one unordered bulk_write.
+
+    Ownership of every updated or deleted document is checked with a single
+    ``$in`` query up front. ``build_create`` and ``build_update`` turn an
+    operation's payload into the document to insert or the fields to ``$set``
+    and may raise BatchItemError to reject that item. Failures are reported per
+    item and never abort the other operations.
+
+    ``on_success(before, after)`` is called for every applied operation with the
+    document as it was (None for creates) and as it is now (None for deletes).
+    """
+    if len(operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_OPERATIONS} operations"
+        )
+
+    results: List[Optional[BatchItemResult]] = [None] * len(operations)
+
+    def fail(index: int, operation, error: str):
+        results[index] = BatchItemResult(index=index, op=operation.op, id=operation.id, success=False, error=error)
+
+    # Verify that every targeted document exists and belongs to the user in one query
+    target_ids = {
+        ObjectId(operation.id)
+        for operation in operations
+        if operation.op != "create" and operation.id and ObjectId.is_valid(operation.id)
+    }
+    owned = {}
+    if target_ids:
+        documents = await collection.find(
+            {"_id": {"$in": list(target_ids)}, "user_id": user_id},
+            None if on_success else {"_id": 1}
+        ).to_list(length=None)
+        owned = {document["_id"]: document for document in documents}
+
+    requests = []
+    request_items = []  # (operation index, document id, document after the write) for every queued request
+
+    for index, operation in enumerate(operations):
+        try:
+            if operation.op == "create":
+                if operation.data is None:
+                    raise BatchItemError("Missing data")
+                document = build_create(operation.data)
+                document["_id"] = ObjectId()
+                requests.append(InsertOne(document))
+                request_items.append((index, document["_id"], document))
+                continue
+
+            if not operation.id or not ObjectId.is_valid(operation.id):
+                raise BatchItemError("Invalid ID")
+            document_id = ObjectId(operation.id)
+            if document_id not in owned:
+                raise BatchItemError("Not found")
+
+            if operation.op == "update":
+                if operation.data is None:
+                    raise BatchItemError("Missing data")
+                fields = build_update(operation.data)
+                requests.append(UpdateOne(
+                    {"_id": document_id, "user_id": user_id},
+                    {"$set": fields}
+                ))
+                request_items.append((index, document_id, {**owned[document_id], **fields}))
+            else:
+                requests.append(DeleteOne({"_id": document_id, "user_id": user_id}))
+                request_items.append((index, document_id, None))
+        except BatchItemError as e:
+            fail(index, operation, str(e))
+
+    write_errors = {}
+    if requests:
+        try:
+            await collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            write_errors = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+
+    for request_index, (index, document_id, after) in enumerate(request_items):
+        operation = operations[index]
+        if request_index in write_errors:
+            fail(index, operation, write_errors[request_index])
+        else:
+            results[index] = BatchItemResult(index=index, op=operation.op, id=str(document_id), success=True)
+            if on_success:
+                on_success(owned.get(document_id), after)
+
+    succeeded = sum(1 for result in results if result.success)
+    return BatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
@@ -0,0 +1,37 @@
+"""Benchmarks behind the performance claims in the commit history.
+
+Each module runs standalone, e.g. ``python -m backend.benchmarks.recurrence``,
+and prints its measurements. They are not part of the test suite. The ones
+that drive the app use an in-memory MongoDB (mongomock-motor, installed with
+backend/requirements-dev.txt), so they measure the app rather than the
+database.
+
+    recurrence      expanding weekly series over a semester, per user
+    password_pool   API latency while a burst of logins hashes passwords
+    auth            the auth dependency with and without the verified-token cache
+    cors            per-request cost of the CORS middleware, via direct ASGI calls
+    compression     gzip and brotli size and time on API payloads and streams
+    serialization   list response encoding, FastAPI's path against orjson and msgpack
+    load_test       req/s and latency of the old uvicorn invocation and backend/serve.py
+                    (serves the app in backend/benchmarks/app.py)
+"""
+from bson import ObjectId
+
+def use_in_memory_database():
+    """Point the app at a fresh mongomock-motor database and return it"""
+    from mongomock_motor import AsyncMongoMockClient
+
+    from backend import database
+
+    client = AsyncMongoMockClient()
+    database.db.client, database.db.db = client, client["benchmark"]
+    return database.db.db
+
+def new_user() -> tuple:
+    """A new user id and the headers that authenticate as it"""
+    from backend.auth import create_access_token
+
+    user_id = str(ObjectId())
+    email = f"{user_id}@example.com"
+    token = create_access_token({"user_id": user_id, "email": email, "sub": email})
+    return user_id, {"Authorization": f"Bearer {token}"}
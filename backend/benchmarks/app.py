@@ -0,0 +1,61 @@
+"""The app backed by an in-memory MongoDB, for load tests that measure the server.
+
+Importing this module patches ``backend.main`` so its lifespan connects each
+worker to its own mongomock-motor database, seeded with one user and 20
+courses, and skips index creation and the scheduler election. Serve it like
+the real app:
+
+    uvicorn backend.benchmarks.app:app          # any ASGI server, by import string
+    python -m backend.benchmarks.app            # the production launcher, backend/serve.py
+
+The launcher imports ``backend.main`` itself, so the patches only reach its
+workers when they are forked from this process: with gunicorn (preloaded or
+not), or with a single uvicorn worker.
+"""
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend import main, serve
+from backend.auth import create_access_token
+from backend.benchmarks import use_in_memory_database
+from backend.config import settings
+
+USER_ID = ObjectId("65f000000000000000000001")
+EMAIL = "loadtest@example.com"
+COURSES = 20
+
+def token() -> str:
+    """A bearer token for the seeded user"""
+    return create_access_token({"user_id": str(USER_ID), "email": EMAIL, "sub": EMAIL})
+
+async def connect_to_mongo():
+    db = use_in_memory_database()
+    await db.users.insert_one({"_id": USER_ID, "email": EMAIL, "full_name": "Load Test"})
+    await db.courses.insert_many([
+        {
+            "user_id": str(USER_ID),
+            "course_name": f"Course {index}",
+            "course_code": f"C{index}",
+            "instructor": "Dr. Smith",
+            "description": None,
+            "color": "#3B82F6",
+            "created_at": datetime.utcnow(),
+        }
+        for index in range(COURSES)
+    ])
+
+async def _skip(*args, **kwargs):
+    pass
+
+main.connect_to_mongo = connect_to_mongo
+main.close_mongo_connection = _skip
+main.ensure_indexes = _skip
+main.scheduler_election.start = lambda: None
+# Importing the LLM stack in the background would compete with the load
+settings.CHAT_WARM_UP = False
+
+app = main.app
+
+if __name__ == "__main__":
+    serve.main()
@@ -0,0 +1,48 @@
+"""Cost of the auth dependency per request, with and without the token cache.
+
+``get_current_user`` runs on every authenticated request. Uncached, each call
+verifies the JWT signature and decodes its claims; cached, a repeat of a
+verified token is a SHA-256 digest and an LRU lookup. The uncached case uses
+a cache that holds nothing, so both run the same code path.
+
+    python -m backend.benchmarks.auth [--calls 20000] [--tokens 1]
+"""
+import argparse
+import asyncio
+import time
+
+from backend import auth
+from backend.benchmarks import new_user
+
+async def call(tokens: list, calls: int) -> float:
+    started = time.perf_counter()
+    for index in range(calls):
+        await auth.get_current_user(tokens[index % len(tokens)])
+    return time.perf_counter() - started
+
+def run(calls: int, token_count: int) -> None:
+    # The bearer token of each user, as the requests would send it
+    tokens = [new_user()[1]["Authorization"].split(" ", 1)[1] for _ in range(token_count)]
+    caches = {
+        "uncached": auth.TokenCache(0),
+        "cached": auth.TokenCache(max(token_count, 1)),
+    }
+    original = auth.token_cache
+    try:
+        for label, cache in caches.items():
+            auth.token_cache = cache
+            asyncio.run(call(tokens, len(tokens)))  # warm up, filling the cache
+            elapsed = asyncio.run(call(tokens, calls))
+            print(f"{label:9s} {calls} calls over {token_count} token(s): {elapsed / calls * 1e6:7.2f} us/call")
+    finally:
+        auth.token_cache = original
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark get_current_user with and without the token cache")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=1, help="distinct tokens, cycled through")
+    args = parser.parse_args()
+    run(args.calls, args.tokens)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Size and time of response compression, per encoding and level.
+
+Payloads are assignment lists shaped like the API's responses. Whole bodies
+are compressed at each gzip level and brotli quality the middleware can be
+configured with; a streamed NDJSON export then shows what flushing every
+chunk costs in size compared with compressing the stream in one go.
+
+    python -m backend.benchmarks.compression [--sizes 1 20 100 500]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from backend.middleware import _BrotliCompressor, _GzipCompressor, brotli
+
+COURSES = ("Linear Algebra", "Organic Chemistry", "World History", "Data Structures")
+WORDS = ["".join(chr(97 + (index * 7 + offset) % 26) for offset in range(2 + index % 9)) for index in range(2000)]
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def assignment(rng: random.Random) -> dict:
+    created = datetime(2026, 9, 1)
+    return {
+        "id": str(ObjectId()),
+        "course_id": str(ObjectId()),
+        "course_name": rng.choice(COURSES),
+        "title": text(rng, 4).title(),
+        "description": text(rng, rng.randint(10, 60)),
+        "due_date": (created + timedelta(minutes=rng.randrange(200000))).isoformat(),
+        "priority": rng.choice(("low", "medium", "high")),
+        "completed": rng.random() < 0.4,
+        "created_at": created.isoformat(),
+    }
+
+def encoders() -> dict:
+    levels = {f"gzip {level}": (lambda level=level: _GzipCompressor(level)) for level in (1, 6, 9)}
+    if brotli is not None:
+        levels.update({f"br {quality}": (lambda quality=quality: _BrotliCompressor(quality)) for quality in (4, 6, 11)})
+    return levels
+
+def compress_whole(make, body: bytes) -> bytes:
+    compressor = make()
+    return compressor.compress(body) + compressor.finish()
+
+def compress_stream(make, chunks: list, flush: bool) -> bytes:
+    compressor = make()
+    data = b""
+    for chunk in chunks:
+        data += compressor.compress(chunk)
+        if flush:
+            data += compressor.flush()
+    return data + compressor.finish()
+
+def run(sizes: list, rows: int) -> None:
+    rng = random.Random(1)
+    for size in sizes:
+        body = json.dumps([assignment(rng) for _ in range(size)]).encode()
+        repeat = max(3, int(2e6 / len(body)))
+        cells = []
+        for label, make in encoders().items():
+            count = 3 if label == "br 11" else repeat
+            started = time.perf_counter()
+            for _ in range(count):
+                data = compress_whole(make, body)
+            elapsed = (time.perf_counter() - started) / count
+            cells.append(f"{label} {len(data) / len(body):6.1%} {elapsed * 1000:6.2f} ms")
+        print(f"{size:4d} assignments {len(body):7d} B | " + " | ".join(cells))
+
+    # One chunk per line, as the NDJSON export sends them
+    chunks = [json.dumps(assignment(rng)).encode() + b"\n" for _ in range(rows)]
+    total = sum(len(chunk) for chunk in chunks)
+    print(f"\nNDJSON stream, {rows} lines, {total} B")
+    for label, make in encoders().items():
+        if label == "br 11":
+            continue
+        buffered = len(compress_stream(make, chunks, flush=False))
+        flushed = len(compress_stream(make, chunks, flush=True))
+        print(f"{label:8s} buffered {buffered / total:6.1%}  flushed per chunk {flushed / total:6.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark gzip and brotli on API-shaped payloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 20, 100, 500], help="assignments per response")
+    parser.add_argument("--rows", type=int, default=500, help="lines in the streamed export")
+    args = parser.parse_args()
+    run(args.sizes, args.rows)
+
+if __name__ == "__main__":
+    main()
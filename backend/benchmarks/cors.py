@@ -0,0 +1,78 @@
+"""Per-request cost of the CORS layer, measured by calling the ASGI app directly.
+
+Times GET /health with an Origin header and a CORS preflight, with no
+network or server in between, so the middleware stack dominates. The file
+imports nothing else from this package, so it can also time an older
+checkout, e.g. the two CORS layers this replaced:
+
+    python -m backend.benchmarks.cors
+    git worktree add /tmp/before <commit>
+    PYTHONPATH=/tmp/before python backend/benchmarks/cors.py
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import time
+
+ORIGIN = b"http://localhost:3000"
+GET_HEADERS = [
+    (b"host", b"benchmark"),
+    (b"origin", ORIGIN),
+    (b"authorization", b"Bearer " + b"x" * 160),
+    (b"accept", b"application/json"),
+]
+PREFLIGHT_HEADERS = GET_HEADERS + [(b"access-control-request-method", b"GET")]
+
+async def call(app, method: str, path: str, headers: list) -> int:
+    """Send one request through the ASGI app and return the response status"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 50000), "server": ("benchmark", 80),
+    }
+    received = False
+    status = 0
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()  # no disconnect while the response is sent
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+async def time_requests(app, method: str, headers: list, count: int):
+    started = time.perf_counter()
+    for _ in range(count):
+        status = await call(app, method, "/health", headers)
+    return (time.perf_counter() - started) / count * 1e6, status
+
+async def run(count: int) -> None:
+    from backend.main import app
+
+    await time_requests(app, "GET", GET_HEADERS, 200)  # warm up
+    for label, method, headers in (("GET /health", "GET", GET_HEADERS), ("preflight", "OPTIONS", PREFLIGHT_HEADERS)):
+        # Older versions print every request's headers; keep that out of the output
+        with contextlib.redirect_stdout(io.StringIO()):
+            micros, status = await time_requests(app, method, headers, count)
+        print(f"{label:12s} {micros:8.1f} us/request  (status {status})")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time requests through the app's middleware stack")
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
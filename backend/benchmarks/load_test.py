@@ -0,0 +1,133 @@
+"""Throughput and latency of the server launchers under keep-alive load.
+
+Starts the in-memory app (backend/benchmarks/app.py) under each launcher,
+then drives it with persistent HTTP/1.1 connections that each send one
+request at a time, and prints requests per second with p50 and p99 latency:
+
+    uvicorn   the invocation start.sh used before backend/serve.py:
+              ``uvicorn --workers N`` on asyncio and h11
+    serve     ``python -m backend.serve``: gunicorn with preloaded uvicorn
+              workers, uvloop and httptools, as installed
+
+    python -m backend.benchmarks.load_test [--launcher serve] [--connections 32] [--seconds 8]
+
+Both launchers run the same number of workers, one per available CPU unless
+``--workers`` is given. The client runs on the same machine, so keep it in
+mind when reading absolute numbers; compare launchers on the same host.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from backend.benchmarks.app import token
+from backend.serve import worker_count
+
+HOST = "127.0.0.1"
+PATHS = ("/health", "/api/courses/")
+
+def launcher_command(launcher: str, port: int, workers: int) -> list:
+    if launcher == "uvicorn":
+        return [
+            sys.executable, "-m", "uvicorn", "backend.benchmarks.app:app", "--host", HOST, "--port", str(port),
+            "--workers", str(workers), "--loop", "asyncio", "--http", "h11", "--log-level", "warning",
+        ]
+    return [sys.executable, "-m", "backend.benchmarks.app"]
+
+def start_server(launcher: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, SERVER_HOST=HOST, PORT=str(port), SERVER_WORKERS=str(workers), LOG_LEVEL="WARNING")
+    server = subprocess.Popen(launcher_command(launcher, port, workers), env=env, start_new_session=True)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"{launcher} exited with status {server.returncode}")
+        try:
+            with socket.create_connection((HOST, port), timeout=1) as connection:
+                connection.sendall(b"GET /health HTTP/1.1\r\nHost: loadtest\r\nConnection: close\r\n\r\n")
+                if connection.recv(64).startswith(b"HTTP/1.1 200"):
+                    return server
+        except OSError:
+            pass
+        time.sleep(0.2)
+    stop_server(server)
+    raise SystemExit(f"{launcher} did not answer /health within 30 s")
+
+def stop_server(server: subprocess.Popen) -> None:
+    # The whole process group, so uvicorn's and gunicorn's workers stop too
+    os.killpg(server.pid, signal.SIGTERM)
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+async def connection_loop(port: int, request: bytes, until: float, latencies: list, errors: list) -> None:
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        while time.perf_counter() < until:
+            started = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = None
+            for line in head.split(b"\r\n")[1:]:
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            if length is None:
+                raise RuntimeError("response without Content-Length")
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if head.split(b" ", 2)[1] != b"200":
+                errors.append(head.split(b"\r\n", 1)[0])
+    finally:
+        writer.close()
+
+async def load(port: int, path: str, connections: int, seconds: float) -> tuple:
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: loadtest\r\nAuthorization: Bearer {token()}\r\n\r\n"
+    ).encode("latin-1")
+    # Warm up every connection and worker before measuring
+    until = time.perf_counter() + 1
+    await asyncio.gather(*(connection_loop(port, request, until, [], []) for _ in range(connections)))
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        connection_loop(port, request, started + seconds, latencies, errors) for _ in range(connections)
+    ))
+    return latencies, errors, time.perf_counter() - started
+
+def percentile(ordered: list, fraction: float) -> float:
+    return ordered[int(fraction * (len(ordered) - 1))] * 1000
+
+def run(launchers: list, workers: int, connections: int, seconds: float, port: int) -> None:
+    for launcher in launchers:
+        server = start_server(launcher, port, workers)
+        try:
+            for path in PATHS:
+                latencies, errors, elapsed = asyncio.run(load(port, path, connections, seconds))
+                latencies.sort()
+                print(
+                    f"{launcher:8s} {path:14s} {len(latencies) / elapsed:7.0f} req/s  "
+                    f"p50 {percentile(latencies, 0.5):6.2f} ms  p99 {percentile(latencies, 0.99):6.2f} ms  "
+                    f"errors {len(errors)}"
+                )
+        finally:
+            stop_server(server)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the server launchers with an in-memory database")
+    parser.add_argument("--launcher", choices=("uvicorn", "serve"), action="append", help="default: both")
+    parser.add_argument("--workers", type=int, default=0, help="0 means one per available CPU")
+    parser.add_argument("--connections", type=int, default=32, help="concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=8, help="measured duration per path")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    run(args.launcher or ["uvicorn", "serve"], args.workers or worker_count(), args.connections, args.seconds, args.port)
+
+if __name__ == "__main__":
+    main()
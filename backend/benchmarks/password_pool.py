@@ -0,0 +1,81 @@
+"""API latency while a burst of logins hashes passwords.
+
+A client polls GET /api/assignments/ every 20 ms, first on an idle app and
+then while 40 logins arrive at once. With ``--inline`` bcrypt runs on the
+event loop, as it did before the pool, so every poll waits for the hashes
+queued ahead of it; by default it runs on the bounded worker pool
+(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT).
+
+    python -m backend.benchmarks.password_pool [--inline]
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+from bson import ObjectId
+
+from backend import passwords
+from backend.auth_utils import get_password_hash
+from backend.benchmarks import new_user, use_in_memory_database
+
+POLL_INTERVAL = 0.02
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+async def poll(client: httpx.AsyncClient, headers: dict, count: int) -> list:
+    """Latency of each poll in ms, measured from when it was due so loop stalls count"""
+    latencies = []
+    due = time.perf_counter()
+    for _ in range(count):
+        await client.get("/api/assignments/", headers=headers)
+        latencies.append((time.perf_counter() - due) * 1000)
+        due = time.perf_counter() + POLL_INTERVAL
+        await asyncio.sleep(POLL_INTERVAL)
+    return latencies
+
+async def run(logins: int) -> None:
+    from backend.main import app
+
+    db = use_in_memory_database()
+    user_id, headers = new_user()
+    await db.users.insert_one({
+        "_id": ObjectId(user_id), "email": "student@example.com", "full_name": "Student",
+        "hashed_password": get_password_hash("secret"),
+    })
+    credentials = {"username": "student@example.com", "password": "secret"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        idle = await poll(client, headers, 30)
+        busy, *responses = await asyncio.gather(
+            poll(client, headers, 100),
+            *(client.post("/api/auth/login", data=credentials) for _ in range(logins))
+        )
+
+    statuses = sorted({response.status_code for response in responses})
+    counts = ", ".join(f"{status}: {sum(r.status_code == status for r in responses)}" for status in statuses)
+    print(f"idle  p50 {percentile(idle, 0.5):7.1f} ms  max {max(idle):7.1f} ms")
+    print(
+        f"burst p50 {percentile(busy, 0.5):7.1f} ms  p99 {percentile(busy, 0.99):7.1f} ms  "
+        f"max {max(busy):7.1f} ms  logins {counts}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure API latency during a burst of logins")
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop instead of the pool")
+    parser.add_argument("--logins", type=int, default=40)
+    args = parser.parse_args()
+
+    if args.inline:
+        async def run_inline(operation, function, *function_args):
+            return function(*function_args)
+        passwords.pool.run = run_inline
+
+    logging.disable(logging.CRITICAL)
+    asyncio.run(run(args.logins))
+
+if __name__ == "__main__":
+    main()
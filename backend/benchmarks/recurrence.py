@@ -0,0 +1,64 @@
+"""Time to expand recurring schedules for a calendar window.
+
+Every user has 10 weekly series over a semester, with mixed weekdays,
+intervals, end dates and exceptions. The benchmark expands each user's
+series for the whole semester and for a single week, the two windows the
+app asks for most.
+
+    python -m backend.benchmarks.recurrence [--users 1000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from backend.models import WEEKDAYS
+from backend.recurrence import expand_all
+
+SEMESTER_START = datetime(2026, 9, 1)
+SEMESTER_END = datetime(2026, 12, 20)
+
+def make_series(rng: random.Random, count: int) -> list:
+    series = []
+    for index in range(count):
+        start = SEMESTER_START + timedelta(days=rng.randrange(7), hours=rng.randrange(8, 18))
+        weekdays = rng.sample(WEEKDAYS[:5], rng.randint(1, 3))
+        series.append({
+            "_id": f"series{index}",
+            "title": f"Lecture {index}",
+            "start_time": start,
+            "end_time": start + timedelta(minutes=rng.choice((50, 75, 90, 120))),
+            "recurrence": {
+                "weekdays": weekdays,
+                "interval": rng.choice((1, 1, 1, 2)),
+                "until": rng.choice((None, SEMESTER_END)),
+                "exceptions": [SEMESTER_START + timedelta(days=rng.randrange(100)) for _ in range(rng.randint(0, 3))],
+            },
+        })
+    return series
+
+def run(users: int, series_per_user: int) -> None:
+    rng = random.Random(1)
+    calendars = [make_series(rng, series_per_user) for _ in range(users)]
+    windows = {
+        "semester": (SEMESTER_START, SEMESTER_END),
+        "one week": (datetime(2026, 10, 5), datetime(2026, 10, 12)),
+    }
+    for label, (start, end) in windows.items():
+        started = time.perf_counter()
+        occurrences = sum(sum(1 for _ in expand_all(series, start, end)) for series in calendars)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{label:9s} {users} users x {series_per_user} series: {occurrences / users:6.1f} occurrences/user, "
+            f"{elapsed / users * 1000:.3f} ms/user"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark lazy expansion of recurring schedules")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--series", type=int, default=10, help="recurring series per user")
+    args = parser.parse_args()
+    run(args.users, args.series)
+
+if __name__ == "__main__":
+    main()
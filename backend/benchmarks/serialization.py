@@ -0,0 +1,107 @@
+"""Cost of encoding list responses, per row.
+
+The FastAPI path is what list endpoints did before backend/responses.py:
+build response models, let FastAPI validate them against ``response_model``
+and run ``jsonable_encoder``, then encode with the standard json module. The
+fast path serializes the documents to plain dicts and encodes them once with
+orjson, or MessagePack when it is installed. Both paths must produce the same
+JSON, which is checked before timing.
+
+    python -m backend.benchmarks.serialization [--rows 1000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from backend import models
+from backend.responses import MsgPackResponse, msgpack
+
+CREATED = datetime(2026, 9, 1, 8, 30, 0, 123000)
+
+def make_documents(rows: int) -> dict:
+    course_id = str(ObjectId())
+    courses = [
+        {"_id": ObjectId(), "user_id": "user", "course_name": f"Course {index}", "course_code": f"C{index}",
+         "instructor": "Dr. Smith", "description": None, "color": "#3B82F6", "created_at": CREATED}
+        for index in range(rows)
+    ]
+    assignments = [
+        {"_id": ObjectId(), "user_id": "user", "course_id": course_id, "title": f"Problem set {index}",
+         "description": f"Read chapter {index} and solve the exercises", "due_date": CREATED + timedelta(hours=index),
+         "priority": "medium", "completed": index % 2 == 0, "reminder_sent": False, "created_at": CREATED}
+        for index in range(rows)
+    ]
+    schedules = [
+        {"_id": ObjectId(), "user_id": "user", "course_id": course_id, "title": f"Lecture {index}", "description": None,
+         "start_time": CREATED + timedelta(hours=index), "end_time": CREATED + timedelta(hours=index + 1),
+         "day_of_week": "Monday", "location": "Hall A", "created_at": CREATED,
+         "recurrence": {"weekdays": ["Monday"], "interval": 1, "until": None, "exceptions": []} if index % 3 == 0 else None}
+        for index in range(rows)
+    ]
+    return {
+        "courses": (courses, models.CourseResponse, models.course_response, models.serialize_course),
+        "assignments": (
+            assignments, models.AssignmentResponse,
+            lambda document: models.assignment_response(document, "Math"),
+            lambda document: models.serialize_assignment(document, "Math"),
+        ),
+        "schedules": (
+            schedules, models.ScheduleResponse,
+            lambda document: models.schedule_response(document, "Math"),
+            lambda document: models.serialize_schedule(document, "Math"),
+        ),
+    }
+
+def fastapi_path(documents: list, model, build) -> bytes:
+    field = create_response_field(name="response", type_=List[model])
+
+    async def encode():
+        content = await serialize_response(
+            field=field, response_content=[build(document) for document in documents], is_coroutine=True
+        )
+        return JSONResponse(content).body
+    return asyncio.run(encode())
+
+def fast_path(documents: list, serialize, response_class) -> bytes:
+    return response_class([serialize(document) for document in documents]).body
+
+def timed(encode, repeat: int) -> tuple:
+    encode()  # warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = encode()
+    return (time.perf_counter() - started) / repeat, len(body)
+
+def run(rows: int, repeat: int) -> None:
+    for name, (documents, model, build, serialize) in make_documents(rows).items():
+        expected = json.loads(fastapi_path(documents, model, build))
+        if json.loads(fast_path(documents, serialize, ORJSONResponse)) != expected:
+            raise SystemExit(f"{name}: the fast path's JSON differs from FastAPI's")
+
+        paths = {
+            "fastapi": lambda: fastapi_path(documents, model, build),
+            "orjson": lambda: fast_path(documents, serialize, ORJSONResponse),
+        }
+        if msgpack is not None:
+            paths["msgpack"] = lambda: fast_path(documents, serialize, MsgPackResponse)
+        for label, encode in paths.items():
+            elapsed, size = timed(encode, repeat)
+            print(f"{name:11s} {label:8s} {elapsed * 1000:8.2f} ms/{rows} rows  {elapsed / rows * 1e6:6.2f} us/row  {size} B")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list response encoding")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""iCalendar subscription feed with conditional requests and a rendered-feed cache.
+
+Calendar clients poll the feed every few minutes. Its validators come from
+the user's collection version counters (backend/versions.py), which every
+worker reads from MongoDB, so a poll lands on any worker and still gets a 304
+after the token and version lookups, without rendering. The feed also
+depends on the date (it covers CALENDAR_FEED_PAST_DAYS back from today), so
+the date is part of the ETag. Rendered bodies are cached per process by
+user and ETag; a worker that hasn't rendered the current version renders it
+once.
+"""
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Optional, Tuple
+
+from backend.config import settings
+from backend.database import get_course_names
+from backend.models import WEEKDAYS
+from backend.versions import matches
+
+ICS_MEDIA_TYPE = "text/calendar"  # Starlette appends the utf-8 charset
+
+# Collections the feed is rendered from
+FEED_COLLECTIONS = ("schedules", "assignments", "courses")
+
+class FeedCache:
+    """LRU of rendered feeds keyed by user id, each kept with its ETag"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._feeds: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+
+    def get(self, user_id: str, etag: str) -> Optional[bytes]:
+        entry = self._feeds.get(user_id)
+        if entry is None or entry[0] != etag:
+            return None
+        self._feeds.move_to_end(user_id)
+        return entry[1]
+
+    def put(self, user_id: str, etag: str, body: bytes):
+        self._feeds[user_id] = (etag, body)
+        self._feeds.move_to_end(user_id)
+        while len(self._feeds) > self.max_entries:
+            self._feeds.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self._feeds.pop(user_id, None)
+
+feed_cache = FeedCache(settings.CALENDAR_FEED_CACHE_SIZE)
+
+def invalidate(user_id: str):
+    """Drop the cached feed of a user after any write to their data; the
+    version bump that goes with the write already stops it from being served"""
+    feed_cache.invalidate(user_id)
+
+def validators(versions: dict, today: date) -> Tuple[str, float]:
+    """The ETag and Last-Modified timestamp of a user's feed as of ``today``"""
+    counters = ".".join(str(versions.get(collection, 0)) for collection in FEED_COLLECTIONS)
+    etag = f'W/"{versions.get("epoch", "0")}.{counters}.{today:%Y%m%d}"'
+    last_modified = datetime.combine(today, time.min, timezone.utc).timestamp()
+    if versions.get("modified_at") is not None:
+        last_modified = max(last_modified, versions["modified_at"].replace(tzinfo=timezone.utc).timestamp())
+    return etag, last_modified
+
+def is_not_modified(etag: str, last_modified: float, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+    """Evaluate conditional request headers against the feed's validators"""
+    if if_none_match is not None:
+        return matches(if_none_match, etag)
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets as RFC 5545 requires"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split a multi-byte UTF-8 sequence
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    parts.append(encoded.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+def _timestamp(value: datetime) -> str:
+    # Stored event times are the user's wall-clock times (the frontend sends
+    # datetime-local values), so they are written as floating times without a
+    # "Z": clients show them as-is in the viewer's own zone
+    return value.strftime("%Y%m%dT%H%M%S")
+
+def _utc_timestamp(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+def _event(uid: str, start: datetime, end: Optional[datetime], summary: str, stamp: str, **extra) -> str:
+    # Without DTEND the event is an instant at DTSTART (RFC 5545 3.6.1); DTEND must be later
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@student-planner",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_timestamp(start)}",
+    ]
+    if end is not None:
+        lines.append(f"DTEND:{_timestamp(end)}")
+    lines.append(f"SUMMARY:{_escape(summary)}")
+    for name, value in extra.items():
+        if value:
+            lines.append(f"{name}:{value}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+def _recurrence_lines(schedule: dict) -> dict:
+    rule = schedule["recurrence"]
+    weekdays = rule.get("weekdays") or []
+    if not weekdays and schedule.get("day_of_week") in WEEKDAYS:
+        weekdays = [schedule["day_of_week"]]
+    if not weekdays:
+        weekdays = [WEEKDAYS[schedule["start_time"].weekday()]]
+
+    parts = ["FREQ=WEEKLY", f"INTERVAL={rule.get('interval') or 1}"]
+    parts.append("BYDAY=" + ",".join(day[:2].upper() for day in weekdays))
+    if rule.get("until") is not None:
+        # Floating like DTSTART, as RFC 5545 requires
+        parts.append(f"UNTIL={rule['until'].strftime('%Y%m%d')}T235959")
+
+    start_time = schedule["start_time"].time()
+    exdates = ",".join(
+        _timestamp(datetime.combine(exception.date(), start_time))
+        for exception in rule.get("exceptions") or []
+    )
+    return {"RRULE": ";".join(parts), "EXDATE": exdates}
+
+async def render_feed(database, user_id: str, today: date) -> AsyncIterator[bytes]:
+    """Render a user's schedules and assignments as an iCalendar stream"""
+    stamp = _utc_timestamp(datetime.utcnow())
+    # Whole days, so the feed only changes with the date in its ETag
+    since = datetime.combine(today - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS), time.min)
+    course_names = await get_course_names(database, user_id)
+
+    yield "".join(_fold(line) for line in [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Student Academic Planner//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Student Planner",
+    ]).encode()
+
+    schedules = database.schedules.find({
+        "$or": [
+            {"user_id": user_id, "recurrence": {"$type": "object"}},
+            {"user_id": user_id, "recurrence": None, "end_time": {"$gte": since}},
+        ]
+    }).batch_size(settings.STREAM_BATCH_SIZE)
+    async for schedule in schedules:
+        extra = {
+            "LOCATION": _escape(schedule.get("location") or ""),
+            "DESCRIPTION": _escape(schedule.get("description") or ""),
+            "CATEGORIES": _escape(course_names.get(str(schedule.get("course_id")), "")),
+        }
+        if schedule.get("recurrence"):
+            extra.update(_recurrence_lines(schedule))
+        yield _event(
+            f"schedule-{schedule['_id']}", schedule["start_time"], schedule["end_time"],
+            schedule["title"], stamp, **extra
+        ).encode()
+
+    assignments = database.assignments.find({
+        "user_id": user_id,
+        "due_date": {"$gte": since},
+    }).batch_size(settings.STREAM_BATCH_SIZE)
+    async for assignment in assignments:
+        course_name = course_names.get(str(assignment.get("course_id")), "Unknown Course")
+        status = "Completed" if assignment.get("completed") else "Due"
+        yield _event(
+            f"assignment-{assignment['_id']}", assignment["due_date"], None,
+            f"{status}: {assignment['title']} ({course_name})", stamp,
+            DESCRIPTION=_escape(assignment.get("description") or ""),
+        ).encode()
+
+    yield _fold("END:VCALENDAR").encode()
+
+async def cached_render(database, user_id: str, etag: str, today: date) -> AsyncIterator[bytes]:
+    """Stream a feed while collecting it into the cache under ``etag``"""
+    chunks = []
+    async for chunk in render_feed(database, user_id, today):
+        chunks.append(chunk)
+        yield chunk
+    feed_cache.put(user_id, etag, b"".join(chunks))
@@ -1,7 +1,10 @@
+import logging
 import os
 from dotenv import load_dotenv
 from typing import Optional, Dict, Any
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env file if it exists
 load_dotenv()
 
@@ -21,9 +24,13 @@ class Settings:
         self.SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
         self.ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
         self.ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+        # Verified tokens kept in memory so each is decoded once per process
+        self.JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", 10000))
         
         # OpenAI Configuration
         self.OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+        # Import the LLM libraries in the background at startup rather than on the first chat request
+        self.CHAT_WARM_UP: bool = os.getenv("CHAT_WARM_UP", "false").lower() == "true"
         
         # SMTP Configuration
         self.SMTP_HOST: str = os.getenv("SMTP_HOST", "smtp.gmail.com")
@@ -32,22 +39,107 @@ class Settings:
         self.SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
         self.EMAIL_FROM: str = os.getenv("EMAIL_FROM", "")
         
+        # Pagination
+        self.DEFAULT_PAGE_SIZE: int = int(os.getenv("DEFAULT_PAGE_SIZE", 100))
+        self.MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", 500))
+        
+        # Schedule window queries
+        # Longest event accepted on write; range queries look back this far for events already running
+        self.SCHEDULE_MAX_EVENT_HOURS: int = int(os.getenv("SCHEDULE_MAX_EVENT_HOURS", 24 * 7))
+        self.SCHEDULE_MAX_RANGE_DAYS: int = int(os.getenv("SCHEDULE_MAX_RANGE_DAYS", 366))
+        # How far ahead open-ended recurring series are checked for conflicts
+        self.SCHEDULE_CONFLICT_HORIZON_DAYS: int = int(os.getenv("SCHEDULE_CONFLICT_HORIZON_DAYS", 180))
+        
+        # Calendar subscription feed
+        self.CALENDAR_FEED_CACHE_SIZE: int = int(os.getenv("CALENDAR_FEED_CACHE_SIZE", 1000))
+        self.CALENDAR_FEED_PAST_DAYS: int = int(os.getenv("CALENDAR_FEED_PAST_DAYS", 90))
+        
+        # Streaming responses
+        self.STREAM_BATCH_SIZE: int = int(os.getenv("STREAM_BATCH_SIZE", 500))
+        
+        # Response compression (brotli is used when the optional brotli package is installed)
+        self.COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+        self.COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+        self.COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+        
+        # Conditional GETs
+        # Keep at 0 with more than one worker: cached versions miss other workers' writes
+        self.VERSION_CACHE_SECONDS: float = float(os.getenv("VERSION_CACHE_SECONDS", 0))
+        self.VERSION_CACHE_SIZE: int = int(os.getenv("VERSION_CACHE_SIZE", 10000))
+        
+        # Batch writes
+        self.BATCH_MAX_OPERATIONS: int = int(os.getenv("BATCH_MAX_OPERATIONS", 100))
+        
+        # Password hashing
+        # bcrypt runs on a dedicated thread pool; callers beyond workers + queue limit get 503
+        self.PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+        self.PASSWORD_HASH_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", 32))
+        self.PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 2))
+        
+        # User statistics
+        self.USER_STATS_RECONCILE_MINUTES: int = int(os.getenv("USER_STATS_RECONCILE_MINUTES", 60))
+        
+        # Metrics
+        # When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+        self.METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+        # Seconds between event-loop lag samples; 0 turns sampling off
+        self.METRICS_LOOP_LAG_INTERVAL: float = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", 0.5))
+        
+        # Profiling, off unless PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set
+        # Requests with "X-Profile-Token: <PROFILE_TOKEN>" are profiled; keep it admin-only
+        self.PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN", "")
+        self.PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+        self.PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+        # Profiles kept in PROFILE_DIR; the oldest are deleted beyond this (0 keeps every file)
+        self.PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", 200))
+        # Sampling interval of pyinstrument in seconds
+        self.PROFILE_INTERVAL: float = float(os.getenv("PROFILE_INTERVAL", 0.001))
+        
+        # Scheduler leader election: only the worker holding the lease runs scheduled jobs
+        self.LEADER_LEASE_SECONDS: int = int(os.getenv("LEADER_LEASE_SECONDS", 30))
+        self.LEADER_RENEW_SECONDS: int = int(os.getenv("LEADER_RENEW_SECONDS", 10))
+        
+        # Production server, started by backend/serve.py
+        self.SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+        self.SERVER_PORT: int = int(os.getenv("PORT", 8000))
+        # Worker processes; 0 sizes them from the CPUs available to the container
+        self.SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", os.getenv("WEB_CONCURRENCY", 0)))
+        # Import the app once in the parent and fork workers from it (needs gunicorn)
+        self.SERVER_PRELOAD: bool = os.getenv("SERVER_PRELOAD", "true").lower() == "true"
+        # Seconds an idle keep-alive connection stays open; keep it above the proxy's idle timeout
+        self.SERVER_KEEPALIVE: int = int(os.getenv("SERVER_KEEPALIVE", 75))
+        # Connections waiting to be accepted per listening socket; the kernel caps it at net.core.somaxconn
+        self.SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", 2048))
+        # Open connections plus running requests per worker past which requests get a 503; 0 means no limit
+        self.SERVER_LIMIT_CONCURRENCY: int = int(os.getenv("SERVER_LIMIT_CONCURRENCY", 1000))
+        
+        # Logging
+        self.LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+        self.LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+        # Fraction of requests logged, overridable per route prefix as "prefix=rate,..."
+        self.LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+        self.LOG_ROUTE_SAMPLE_RATES: str = os.getenv("LOG_ROUTE_SAMPLE_RATES", "/health=0,/metrics=0")
+        # Errors and requests slower than this are always logged
+        self.LOG_SLOW_REQUEST_MS: int = int(os.getenv("LOG_SLOW_REQUEST_MS", 1000))
+        self.LOG_REQUEST_HEADERS: bool = os.getenv("LOG_REQUEST_HEADERS", "false").lower() == "true"
+        
         # Environment
         self.ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
-        
-        # Print configuration for debugging
-        self._print_config()
     
-    def _print_config(self) -> None:
-        """Print configuration details (hiding sensitive information)."""
-        print(" Application Configuration:")
-        print(f"- Environment: {self.ENVIRONMENT}")
-        print(f"- Database: {self.DATABASE_NAME}")
-        print(f"- MongoDB URL: {self._mask_sensitive(self.MONGODB_URL)}")
-        print(f"- JWT Algorithm: {self.ALGORITHM}")
-        print(f"- Token Expiry: {self.ACCESS_TOKEN_EXPIRE_MINUTES} minutes")
-        print(f"- SMTP Server: {self.SMTP_HOST}:{self.SMTP_PORT}")
-        print(f"- Email From: {self.EMAIL_FROM}")
+    def log_config(self) -> None:
+        """Log configuration details (hiding sensitive information)."""
+        logger.info(
+            "Application configuration",
+            extra={
+                "environment": self.ENVIRONMENT,
+                "database": self.DATABASE_NAME,
+                "mongodb_url": self._mask_sensitive(self.MONGODB_URL),
+                "jwt_algorithm": self.ALGORITHM,
+                "token_expiry_minutes": self.ACCESS_TOKEN_EXPIRE_MINUTES,
+                "smtp_server": f"{self.SMTP_HOST}:{self.SMTP_PORT}",
+                "email_from": self.EMAIL_FROM,
+            }
+        )
     
     @staticmethod
     def _mask_sensitive(value: str, show_chars: int = 10) -> str:
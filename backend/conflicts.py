@@ -0,0 +1,40 @@
+"""Schedule overlap detection.
+
+Both the per-write check and the conflicts report use a sort-and-sweep pass:
+events are visited in start order while a min-heap keeps the ones still
+running, so finding every overlapping pair costs O(n log n + k).
+"""
+import heapq
+from typing import Iterable, Iterator, List, Tuple
+
+def find_overlaps(events: Iterable[dict]) -> Iterator[Tuple[dict, dict]]:
+    """Yield every pair of overlapping events; ``events`` must be ordered by start_time.
+
+    Events that merely touch (one ends when the next starts) don't overlap.
+    """
+    active = []  # (end_time, sequence, event) of events still running
+    for sequence, event in enumerate(events):
+        while active and active[0][0] <= event["start_time"]:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, event
+        heapq.heappush(active, (event["end_time"], sequence, event))
+
+def find_conflicts(candidates: List[dict], existing: List[dict]) -> List[dict]:
+    """Existing events overlapping any of the candidates, both lists ordered by start_time"""
+    tagged = heapq.merge(
+        ((event, True) for event in candidates),
+        ((event, False) for event in existing),
+        key=lambda item: item[0]["start_time"]
+    )
+    conflicts = {}
+    active = []
+    for sequence, (event, is_candidate) in enumerate(tagged):
+        while active and active[0][0] <= event["start_time"]:
+            heapq.heappop(active)
+        for _, _, other, other_is_candidate in active:
+            if is_candidate != other_is_candidate:
+                clash = event if not is_candidate else other
+                conflicts[str(clash["_id"])] = clash
+        heapq.heappush(active, (event["end_time"], sequence, event, is_candidate))
+    return sorted(conflicts.values(), key=lambda event: event["start_time"])
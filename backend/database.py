@@ -1,8 +1,12 @@
 import asyncio
 import logging
 import os
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from typing import Optional
 from backend.config import settings
+from backend.metrics import mongo_listener
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,8 @@ async def connect_to_mongo():
                     connect=False,  # Use connect=False to handle connection manually
                     retryWrites=True,
                     w='majority',
-                    appName='student-planner-backend'
+                    appName='student-planner-backend',
+                    event_listeners=[mongo_listener]
                 )
                 
                 # Force connection and get server info
@@ -81,3 +86,60 @@ async def close_mongo_connection():
         finally:
             db.client = None
             db.db = None
+
+async def get_course_names(database, user_id: str, course_ids=None) -> dict:
+    """Resolve course names for a set of course ids with a single query.
+    
+    Passing ``course_ids=None`` resolves every course of the user, which is used
+    when the referenced ids aren't known up front (e.g. streamed responses).
+    """
+    query = {"user_id": user_id}
+    if course_ids is not None:
+        object_ids = {ObjectId(cid) for cid in course_ids if cid and ObjectId.is_valid(cid)}
+        if not object_ids:
+            return {}
+        query["_id"] = {"$in": list(object_ids)}
+    
+    courses = await database.courses.find(query, {"course_name": 1}).to_list(length=None)
+    
+    return {str(course["_id"]): course["course_name"] for course in courses}
+
+async def insert_document(collection, document: dict) -> dict:
+    """Insert a document and return it with its _id, without reading it back"""
+    result = await collection.insert_one(document)
+    document["_id"] = result.inserted_id
+    return document
+
+async def update_document(
+    collection,
+    query: dict,
+    fields: dict,
+    return_document: bool = ReturnDocument.AFTER
+) -> Optional[dict]:
+    """Apply ``$set`` to the matching document and return it as stored after the update.
+    
+    Pass ``return_document=ReturnDocument.BEFORE`` to get the previous version
+    instead. Returns None when no document matches.
+    """
+    return await collection.find_one_and_update(
+        query,
+        {"$set": fields},
+        return_document=return_document
+    )
+
+async def toggle_field(
+    collection,
+    query: dict,
+    field: str,
+    return_document: bool = ReturnDocument.AFTER
+) -> Optional[dict]:
+    """Atomically flip a boolean field and return the document after the update.
+    
+    Uses a pipeline update so the read and the write happen in one server-side
+    operation; a missing field counts as False. Returns None when no document matches.
+    """
+    return await collection.find_one_and_update(
+        query,
+        [{"$set": {field: {"$not": [{"$ifNull": [f"${field}", False]}]}}}],
+        return_document=return_document
+    )
@@ -1,12 +1,18 @@
+import logging
+import time
 import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from backend import metrics
 from backend.config import settings
 from datetime import datetime
 from typing import List
 
+logger = logging.getLogger(__name__)
+
 async def send_email(to_email: str, subject: str, body: str):
     """Send email notification"""
+    started = time.perf_counter()
     try:
         message = MIMEMultipart("alternative")
         message["From"] = settings.EMAIL_FROM
@@ -40,10 +46,12 @@ async def send_email(to_email: str, subject: str, body: str):
             password=settings.SMTP_PASSWORD,
             start_tls=True,
         )
-        print(f"Email sent successfully to {to_email}")
+        metrics.email_send_duration.observe(time.perf_counter() - started, "sent")
+        logger.info(f"Email sent successfully to {to_email}")
         return True
     except Exception as e:
-        print(f"Failed to send email to {to_email}: {str(e)}")
+        metrics.email_send_duration.observe(time.perf_counter() - started, "failed")
+        logger.error(f"Failed to send email to {to_email}: {str(e)}")
         return False
 
 async def send_assignment_notification(user_email: str, assignment_title: str, course_name: str, due_date: datetime):
@@ -70,8 +78,8 @@ async def send_schedule_notification(user_email: str, schedule_title: str, start
     """
     await send_email(user_email, subject, body)
 
-async def send_assignment_reminder(user_email: str, assignment_title: str, course_name: str, due_date: datetime):
-    """Send reminder for upcoming assignment"""
+async def send_assignment_reminder(user_email: str, assignment_title: str, course_name: str, due_date: datetime) -> bool:
+    """Send reminder for upcoming assignment; returns whether it was sent"""
     subject = f"Reminder: Assignment Due Soon - {assignment_title}"
     body = f"""
         <h3 style="color: #DC2626;">⏰ Assignment Reminder</h3>
@@ -81,4 +89,4 @@ async def send_assignment_reminder(user_email: str, assignment_title: str, cours
         <p style="color: #DC2626; font-weight: bold;">This assignment is due in less than 2 days!</p>
         <p>Make sure to complete it on time to avoid any penalties.</p>
     """
-    await send_email(user_email, subject, body)
+    return await send_email(user_email, subject, body)
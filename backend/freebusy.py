@@ -0,0 +1,58 @@
+"""Free/busy computation on a fixed-resolution occupancy grid.
+
+Events are rasterized onto one slot per ``resolution_minutes`` with a
+difference array and a cumulative sum, and free runs are found with
+``np.diff``/``np.flatnonzero``, so the cost is a handful of vectorized passes
+over the window regardless of how events are laid out.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+Slot = Tuple[datetime, datetime]
+
+def occupancy(events: Iterable[dict], start: datetime, end: datetime, resolution_minutes: int) -> np.ndarray:
+    """Boolean array with one entry per slot of [start, end), True where any event overlaps it.
+
+    Event bounds are rounded outward to whole slots, so partially busy slots count as busy.
+    """
+    step = resolution_minutes * 60
+    slots = int(np.ceil((end - start).total_seconds() / step))
+
+    events = list(events)
+    if not events or slots <= 0:
+        return np.zeros(max(slots, 0), dtype=bool)
+
+    # Offsets from the window start in seconds; cheaper than converting to datetime64
+    starts = np.fromiter(((event["start_time"] - start).total_seconds() for event in events), float, len(events))
+    ends = np.fromiter(((event["end_time"] - start).total_seconds() for event in events), float, len(events))
+    first = np.clip(np.floor(starts / step).astype(np.int64), 0, slots)
+    last = np.clip(np.ceil(ends / step).astype(np.int64), 0, slots)
+
+    delta = np.bincount(first, minlength=slots + 1) - np.bincount(last, minlength=slots + 1)
+    return np.cumsum(delta[:-1]) > 0
+
+def runs(mask: np.ndarray) -> np.ndarray:
+    """(start, end) slot indexes of every run of True values, as an (n, 2) array"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    return np.flatnonzero(np.diff(padded)).reshape(-1, 2)
+
+def free_busy(
+    events: Iterable[dict],
+    start: datetime,
+    end: datetime,
+    resolution_minutes: int = 5,
+    min_free_minutes: int = 30
+) -> Tuple[List[Slot], List[Slot]]:
+    """Busy intervals and free intervals of at least ``min_free_minutes`` within [start, end)"""
+    mask = occupancy(events, start, end, resolution_minutes)
+    step = timedelta(minutes=resolution_minutes)
+
+    def to_slots(bounds: np.ndarray) -> List[Slot]:
+        return [(start + int(a) * step, min(start + int(b) * step, end)) for a, b in bounds]
+
+    busy = runs(mask)
+    free = runs(~mask)
+    free = free[(free[:, 1] - free[:, 0]) * resolution_minutes >= min_free_minutes]
+    return to_slots(busy), to_slots(free)
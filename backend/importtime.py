@@ -0,0 +1,77 @@
+"""Import-time budget check for app startup.
+
+Imports ``backend.main`` in a fresh interpreter under ``python -X importtime``,
+prints the slowest imports and fails when startup regresses:
+
+    python -m backend.importtime                    # check against the default budget
+    python -m backend.importtime --budget-ms 1500 --top 20
+
+The exit status is 1 when the best of ``--runs`` cumulative import times is
+over the budget, or when a module that must stay lazy (the LLM stack, see
+backend/ai_chatbot.py) was imported, so the check can run in CI.
+"""
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+DEFAULT_BUDGET_MS = 2000
+
+# Imported on the first chat request only; importing them at startup costs seconds
+LAZY_MODULES = ("langchain", "langchain_core", "langchain_openai", "langgraph", "openai", "tiktoken")
+
+# (module, self microseconds, cumulative microseconds)
+ImportTiming = Tuple[str, int, int]
+
+def measure(module: str = "backend.main") -> List[ImportTiming]:
+    """Import ``module`` in a new interpreter and return the timing of every import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        # "import time:       770 |      52277 |     pymongo._telemetry"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+def _total_us(timings: List[ImportTiming], module: str = "backend.main") -> int:
+    return next(cumulative for name, _, cumulative in timings if name == module)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the import time of backend.main against a budget")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="maximum cumulative import time")
+    parser.add_argument("--runs", type=int, default=3, help="imports to time; the fastest one counts")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(max(args.runs, 1))]
+    # The fastest run is the least disturbed by whatever else the machine is doing
+    timings = min(runs, key=_total_us)
+    total_ms = _total_us(timings) / 1000
+
+    print(f"Slowest imports (cumulative ms) of the fastest of {len(runs)} runs:")
+    for name, _, cumulative_us in sorted(timings, key=lambda timing: timing[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:9.1f}  {name}")
+
+    failed = False
+    eager = sorted({name for name, _, _ in timings if name.split(".")[0] in LAZY_MODULES})
+    if eager:
+        failed = True
+        print(f"Modules that must be imported lazily were imported at startup: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"import backend.main took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    else:
+        print(f"import backend.main took {total_ms:.0f} ms, within the {args.budget_ms:.0f} ms budget")
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Declarative MongoDB index registry.
+
+Every index the application relies on is declared in ``INDEXES`` below.
+``ensure_indexes`` applies the registry idempotently at startup, and the
+module doubles as a CLI that diffs the declared indexes against the live ones:
+
+    python -m backend.indexes            # show the diff
+    python -m backend.indexes --apply    # create missing indexes
+    python -m backend.indexes --apply --drop-extra   # also drop undeclared ones
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Index options that are compared when diffing declared and live indexes
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Login and registration look users up by email
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # Calendar feed requests resolve the user from their feed token
+        IndexModel(
+            [("calendar_token", ASCENDING)],
+            name="calendar_token_unique",
+            unique=True,
+            partialFilterExpression={"calendar_token": {"$type": "string"}},
+        ),
+    ],
+    "courses": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "assignments": [
+        # Assignment list, keyset-paginated on (due_date, _id), optionally filtered
+        IndexModel([("user_id", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)], name="user_due_date_id"),
+        IndexModel(
+            [("user_id", ASCENDING), ("completed", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+            name="user_completed_due_date_id",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("priority", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+            name="user_priority_due_date_id",
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("course_id", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING)],
+            name="user_course_due_date_id",
+        ),
+        # Reminder scan in scheduler.check_assignment_reminders
+        IndexModel(
+            [("due_date", ASCENDING)],
+            name="pending_reminders",
+            partialFilterExpression={"completed": False, "reminder_sent": False},
+        ),
+    ],
+    "schedules": [
+        # Schedule list, keyset-paginated on (start_time, _id), optionally filtered
+        IndexModel([("user_id", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)], name="user_start_time_id"),
+        IndexModel(
+            [("user_id", ASCENDING), ("course_id", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)],
+            name="user_course_start_time_id",
+        ),
+        # Recurring series considered by calendar-window queries
+        IndexModel(
+            [("user_id", ASCENDING), ("start_time", ASCENDING)],
+            name="user_recurring_series",
+            partialFilterExpression={"recurrence": {"$type": "object"}},
+        ),
+    ],
+    "leases": [
+        # Removes leases left behind by dead workers; see backend/leader.py
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+def _normalize(spec: dict) -> dict:
+    """Reduce an index document to the fields that define it"""
+    normalized = {"key": [(field, direction) for field, direction in dict(spec["key"]).items()]}
+    for option in COMPARED_OPTIONS:
+        if option in spec:
+            normalized[option] = spec[option]
+    return normalized
+
+# Collections whose indexes enforce correctness rather than speed: registration
+# relies on email_unique to reject duplicate emails, so the app must not start without it
+REQUIRED_COLLECTIONS = {"users"}
+
+async def ensure_indexes(database) -> None:
+    """Create every declared index; existing identical indexes are left untouched.
+    
+    Raises OperationFailure when an index on a REQUIRED_COLLECTIONS collection
+    can't be created, e.g. because existing users share an email.
+    """
+    for collection_name, models in INDEXES.items():
+        try:
+            created = await database[collection_name].create_indexes(models)
+            logger.info(f"📇 Indexes ensured on {collection_name}: {', '.join(created)}")
+        except OperationFailure as e:
+            logger.error(f"❌ Could not ensure indexes on {collection_name}: {e}")
+            if collection_name in REQUIRED_COLLECTIONS:
+                raise
+            # A conflicting live index must be fixed by hand; don't block startup on it
+
+async def diff_indexes(database) -> Dict[str, Dict[str, list]]:
+    """Compare declared indexes with live ones, per collection"""
+    existing_collections = set(await database.list_collection_names())
+    diff = {}
+
+    for collection_name, models in INDEXES.items():
+        live = {}
+        if collection_name in existing_collections:
+            live = await database[collection_name].index_information()
+        live.pop("_id_", None)
+
+        declared = {model.document["name"]: _normalize(model.document) for model in models}
+        live = {name: _normalize(info) for name, info in live.items()}
+
+        diff[collection_name] = {
+            "missing": [name for name in declared if name not in live],
+            "changed": [name for name in declared if name in live and declared[name] != live[name]],
+            "extra": [name for name in live if name not in declared],
+        }
+
+    return diff
+
+async def drop_extra_indexes(database) -> List[str]:
+    """Drop live indexes that are no longer declared, e.g. after a key change"""
+    dropped = []
+    for collection_name, entries in (await diff_indexes(database)).items():
+        for name in entries["extra"]:
+            await database[collection_name].drop_index(name)
+            dropped.append(f"{collection_name}.{name}")
+    return dropped
+
+async def _run_cli(apply: bool, drop_extra: bool) -> int:
+    from backend.database import connect_to_mongo, close_mongo_connection, get_database
+
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        if apply:
+            await ensure_indexes(db)
+        if drop_extra:
+            for name in await drop_extra_indexes(db):
+                print(f"{name}: dropped")
+
+        diff = await diff_indexes(db)
+        in_sync = True
+        for collection_name, entries in diff.items():
+            for state, names in entries.items():
+                for name in names:
+                    in_sync = False
+                    print(f"{collection_name}.{name}: {state}")
+
+        if in_sync:
+            print("All declared indexes are in sync")
+        return 0 if in_sync else 1
+    finally:
+        await close_mongo_connection()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff declared MongoDB indexes against live ones")
+    parser.add_argument("--apply", action="store_true", help="create missing indexes before diffing")
+    parser.add_argument("--drop-extra", action="store_true", help="drop live indexes that are not declared")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_run_cli(args.apply, args.drop_extra)))
+
+if __name__ == "__main__":
+    main()
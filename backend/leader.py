@@ -0,0 +1,144 @@
+"""Lease-based leader election through MongoDB.
+
+Each lease is one document in the ``leases`` collection:
+``{"_id": name, "holder": worker_id, "expires_at": datetime}``. A worker
+takes the lease when it is free or expired and renews it every
+LEADER_RENEW_SECONDS, pushing ``expires_at`` LEADER_LEASE_SECONDS ahead. Both
+are a single conditional upsert, so at most one worker holds a lease at a
+time. When the holder dies its lease expires and another worker takes over
+on its next attempt; a holder that shuts down cleanly releases the lease
+right away.
+
+Expiry compares against the workers' own clocks, so nodes must be roughly in
+sync (NTP): a lease is only as exclusive as the clock skew is small compared
+to LEADER_LEASE_SECONDS. Work that must never run twice should also be
+claimed atomically, as the reminder job does. A TTL index on ``expires_at``
+(see backend/indexes.py) removes leases left behind by dead workers.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.config import settings
+from backend.database import get_database
+
+logger = logging.getLogger(__name__)
+
+def _new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{os.urandom(3).hex()}"
+
+# Unique per process, so several workers on one host are told apart
+WORKER_ID = _new_worker_id()
+
+def _reset_after_fork():
+    # Workers forked from a preloaded app (backend/serve.py) must not share the parent's id
+    global WORKER_ID
+    WORKER_ID = _new_worker_id()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+class LeaderElection:
+    """Hold the named lease while possible, calling ``on_elected``/``on_demoted`` on changes"""
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        lease_seconds: float = settings.LEADER_LEASE_SECONDS,
+        renew_seconds: float = settings.LEADER_RENEW_SECONDS,
+        worker_id: Optional[str] = None
+    ):
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self._worker_id = worker_id
+        self.is_leader = False
+        self._valid_until = 0.0  # monotonic time the lease is known to be held until
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def worker_id(self) -> str:
+        # Read at use rather than bound at import, which may happen before a fork
+        return self._worker_id or WORKER_ID
+
+    async def _try_acquire(self) -> bool:
+        db = await get_database()
+        now = datetime.utcnow()
+        try:
+            lease = await db.leases.find_one_and_update(
+                {
+                    "_id": self.name,
+                    "$or": [{"holder": self.worker_id}, {"expires_at": {"$lt": now}}],
+                },
+                {"$set": {"holder": self.worker_id, "expires_at": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Held by another worker: the filter missed and the upsert hit the existing _id
+            return False
+        return lease is not None and lease["holder"] == self.worker_id
+
+    def _set_leader(self, is_leader: bool):
+        if is_leader == self.is_leader:
+            return
+        self.is_leader = is_leader
+        if is_leader:
+            logger.info(f"Acquired the {self.name} lease", extra={"worker": self.worker_id})
+            self.on_elected()
+        else:
+            logger.warning(f"Lost the {self.name} lease", extra={"worker": self.worker_id})
+            self.on_demoted()
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                acquired = await self._try_acquire()
+                if acquired:
+                    self._valid_until = started + self.lease_seconds
+                self._set_leader(acquired)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to renew the {self.name} lease: {e}")
+                # Keep leading only for as long as the last successful renewal holds
+                if self.is_leader and time.monotonic() >= self._valid_until:
+                    self._set_leader(False)
+            await asyncio.sleep(self.renew_seconds)
+
+    def start(self):
+        """Start competing for the lease in the background"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop competing and hand the lease back if held"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.is_leader:
+            self.is_leader = False
+            self.on_demoted()
+            try:
+                db = await get_database()
+                await db.leases.delete_one({"_id": self.name, "holder": self.worker_id})
+                logger.info(f"Released the {self.name} lease", extra={"worker": self.worker_id})
+            except Exception as e:
+                logger.warning(f"Failed to release the {self.name} lease: {e}")
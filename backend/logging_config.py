@@ -0,0 +1,146 @@
+"""Structured, non-blocking logging.
+
+Every record is formatted as one compact JSON line. Loggers only put records
+on an in-memory queue; a background QueueListener thread does the formatting
+and the write to stdout, so a slow stdout never stalls the event loop. When
+the queue is full records are dropped and counted instead of blocking.
+
+Request logs come from ``RequestLoggingMiddleware`` in backend/middleware.py
+and are sampled per route with ``sample_rate``.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from backend import metrics
+from backend.config import settings
+
+SENSITIVE_HEADERS = frozenset({
+    b"authorization", b"proxy-authorization", b"cookie", b"set-cookie", b"x-api-key",
+})
+
+# Standard LogRecord attributes, so anything else passed via ``extra`` is logged as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the timestamp, level, logger, message and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, separators=(",", ":"), ensure_ascii=False)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking or erroring when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only make the record safe to hand over
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+metrics.Collector(
+    "log_records_dropped_total", "counter", "Log records dropped because the log queue was full",
+    lambda: [("", {}, DroppingQueueHandler.dropped)]
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def configure_logging():
+    """Route all logging through the queue to a JSON stdout handler; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    records = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.handlers = [DroppingQueueHandler(records)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # Uvicorn installs its own stream handlers; send its records through the queue as well
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # Requests are logged by RequestLoggingMiddleware
+    logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=False)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _restart_after_fork():
+    # The listener thread doesn't survive a fork (backend/serve.py preloads the
+    # app before forking workers), so each worker starts its own
+    global _listener
+    if _listener is not None:
+        _listener = None
+        configure_logging()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+def redact_headers(headers: Iterable[Tuple[bytes, bytes]]) -> Dict[str, str]:
+    """Decode ASGI headers for logging with credentials replaced"""
+    return {
+        name.decode("latin-1"): "[REDACTED]" if name in SENSITIVE_HEADERS else value.decode("latin-1")
+        for name, value in headers
+    }
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in spec.split(","):
+        prefix, _, rate = item.strip().rpartition("=")
+        if prefix:
+            rates[prefix] = float(rate)
+    return rates
+
+_route_rates = _parse_rates(settings.LOG_ROUTE_SAMPLE_RATES)
+_rate_cache: Dict[str, float] = {}
+
+def sample_rate(route: str) -> float:
+    """Fraction of requests to a route that get logged: the longest matching
+    prefix in LOG_ROUTE_SAMPLE_RATES, else LOG_SAMPLE_RATE"""
+    rate = _rate_cache.get(route)
+    if rate is None:
+        matches = [prefix for prefix in _route_rates if route.startswith(prefix)]
+        rate = _route_rates[max(matches, key=len)] if matches else settings.LOG_SAMPLE_RATE
+        _rate_cache[route] = rate
+    return rate
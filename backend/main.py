@@ -1,47 +1,71 @@
-from fastapi import FastAPI, Response, Request, status
-from fastapi.middleware.cors import CORSMiddleware
+import hmac
+import logging
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from backend.database import connect_to_mongo, close_mongo_connection
-from backend.scheduler import start_scheduler, stop_scheduler
-from backend.routers import auth, courses, assignments, schedules, chat
+from backend.config import settings
+from backend.logging_config import configure_logging
+from backend.database import connect_to_mongo, close_mongo_connection, get_database
+from backend.indexes import ensure_indexes
+from backend.scheduler import scheduler_election
+from backend.middleware import (
+    CORSMiddleware, CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware, RequestLoggingMiddleware
+)
+from backend import metrics, passwords
+from backend.ai_chatbot import chatbot
+from backend.routers import auth, courses, assignments, schedules, chat, calendar, dashboard
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    settings.log_config()
+    
     try:
         await connect_to_mongo()
-        print("✅ Successfully connected to MongoDB")
-    except Exception as e:
-        print(f"❌ Failed to connect to MongoDB: {e}")
-        raise
-        
-    try:
-        start_scheduler()
-        print("✅ Scheduler started successfully")
+        logger.info("✅ Successfully connected to MongoDB")
     except Exception as e:
-        print(f"❌ Failed to start scheduler: {e}")
+        logger.error(f"❌ Failed to connect to MongoDB: {e}")
         raise
         
+    await ensure_indexes(await get_database())
+    
+    # Every worker competes for the scheduler lease; only the holder runs the jobs
+    scheduler_election.start()
+    logger.info("✅ Scheduler leader election started")
+    
+    metrics.start_loop_lag_monitor()
+    
+    if settings.CHAT_WARM_UP:
+        chatbot.start_warm_up()
+    
     yield
     
+    metrics.stop_loop_lag_monitor()
+    
     # Shutdown
     try:
-        stop_scheduler()
-        print("🛑 Scheduler stopped")
+        await scheduler_election.stop()
+        logger.info("🛑 Scheduler stopped")
     except Exception as e:
-        print(f"⚠️ Error stopping scheduler: {e}")
+        logger.warning(f"⚠️ Error stopping scheduler: {e}")
         
+    passwords.pool.shutdown()
+    
     try:
         await close_mongo_connection()
-        print("🛑 MongoDB connection closed")
+        logger.info("🛑 MongoDB connection closed")
     except Exception as e:
-        print(f"⚠️ Error closing MongoDB connection: {e}")
+        logger.warning(f"⚠️ Error closing MongoDB connection: {e}")
 
 app = FastAPI(
     title="Student Academic Planner API",
     description="A comprehensive student time management and academic planning application",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Allowed origins - update this list with your frontend URLs
@@ -53,71 +77,38 @@ ALLOWED_ORIGINS = [
     "https://student-planner-frontend.onrender.com"  # Add your frontend URL here
 ]
 
-# CORS middleware configuration
+# CORS is handled by a single pure ASGI middleware; see backend/middleware.py
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type", "Accept"],
-    expose_headers=["Authorization", "Content-Type"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "Accept", "X-Profile-Token"],
+    expose_headers=["Authorization", "Content-Type", "X-Next-Cursor", "ETag", "X-Profile-Id"],
     max_age=600  # Cache preflight response for 10 minutes
 )
 
-# Custom CORS middleware to handle preflight requests
-@app.middleware("http")
-async def custom_cors_middleware(request: Request, call_next):
-    # Log incoming requests
-    print(f"\n=== Incoming Request ===")
-    print(f"Method: {request.method}")
-    print(f"URL: {request.url}")
-    print(f"Headers: {dict(request.headers)}")
-    
-    # Handle preflight requests
-    if request.method == "OPTIONS":
-        print("Handling OPTIONS preflight request")
-        origin = request.headers.get("Origin")
-        
-        # Check if the origin is allowed
-        if origin not in ALLOWED_ORIGINS:
-            return Response(
-                status_code=status.HTTP_403_FORBIDDEN,
-                content="Origin not allowed",
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                    "Access-Control-Allow-Headers": "Authorization, Content-Type",
-                    "Access-Control-Max-Age": "600"
-                }
-            )
-        
-        # Return successful preflight response
-        return Response(
-            status_code=status.HTTP_204_NO_CONTENT,
-            headers={
-                "Access-Control-Allow-Origin": origin,
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                "Access-Control-Allow-Headers": "Authorization, Content-Type",
-                "Access-Control-Allow-Credentials": "true",
-                "Access-Control-Max-Age": "600"
-            }
-        )
-    
-    # Process the request
-    response = await call_next(request)
-    
-    # Add CORS headers to the response
-    origin = request.headers.get("Origin")
-    if origin in ALLOWED_ORIGINS:
-        response.headers["Access-Control-Allow-Origin"] = origin
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-    
-    # Log the response headers
-    print("\n=== Response Headers ===")
-    for key, value in response.headers.items():
-        print(f"{key}: {value}")
-    
-    return response
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
+# Only installed when configured, so requests pay nothing for it otherwise
+if settings.PROFILE_TOKEN or settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=settings.PROFILE_TOKEN,
+        sample_rate=settings.PROFILE_SAMPLE_RATE,
+        directory=settings.PROFILE_DIR,
+        max_files=settings.PROFILE_MAX_FILES,
+        interval=settings.PROFILE_INTERVAL
+    )
+
+app.add_middleware(MetricsMiddleware)
+
+# Added last so it is outermost and times the whole request, preflights included
+app.add_middleware(RequestLoggingMiddleware)
 
 # Include routers
 app.include_router(auth.router)
@@ -125,6 +116,8 @@ app.include_router(courses.router)
 app.include_router(assignments.router)
 app.include_router(schedules.router)
 app.include_router(chat.router)
+app.include_router(calendar.router)
+app.include_router(dashboard.router)
 
 @app.get("/")
 async def root():
@@ -136,4 +129,17 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "scheduler_leader": scheduler_election.is_leader,
+        "password_hashing": passwords.pool.snapshot()
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint(request: Request):
+    """Prometheus metrics for this worker process"""
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not hmac.compare_digest(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
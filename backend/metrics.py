@@ -0,0 +1,266 @@
+"""Prometheus metrics, served in the text exposition format at /metrics.
+
+Counters, gauges and histograms are kept in process. Recording a value is a
+dict lookup and a few additions under a lock (Mongo command events arrive on
+driver threads), so instrumenting a request costs microseconds; all the
+formatting happens at scrape time. Every worker process keeps its own values.
+
+Values owned by other modules, such as the password pool's counters, are
+exported with a ``Collector`` that reads them at scrape time.
+"""
+import asyncio
+import bisect
+import functools
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; +Inf is always added
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+INF = float("inf")
+
+# (suffix, labels, value) of one sample, e.g. ("_bucket", {"le": "0.5"}, 3)
+Sample = Tuple[str, Dict[str, str], float]
+
+_registry: List["_Metric"] = []
+
+def format_value(value: float) -> str:
+    """A sample value or bucket bound as Prometheus writes it"""
+    if value == INF:
+        return "+Inf"
+    return repr(float(value))
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        return [("", dict(zip(self.labelnames, labels)), value) for labels, value in values]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: a count per bucket, one for +Inf, then the sum
+        self._values: Dict[tuple, List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [(labels, list(counts)) for labels, counts in self._values.items()]
+        samples = []
+        for labels, counts in values:
+            named = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, INF), counts):
+                cumulative += count
+                samples.append(("_bucket", {**named, "le": format_value(bound)}, cumulative))
+            samples.append(("_sum", named, counts[-1]))
+            samples.append(("_count", named, cumulative))
+        return samples
+
+class Collector(_Metric):
+    """A metric whose samples are read from elsewhere at scrape time"""
+
+    def __init__(self, name: str, kind: str, documentation: str, collect: Callable[[], Iterable[Sample]]):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> Iterable[Sample]:
+        return self._collect()
+
+def render() -> str:
+    """Every registered metric in the Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        try:
+            lines.extend(metric.render())
+        except Exception:
+            logger.exception(f"Failed to collect metric {metric.name}")
+    return "\n".join(lines) + "\n"
+
+# HTTP, recorded by MetricsMiddleware in backend/middleware.py
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests currently being handled"
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by route template", ("method", "route")
+)
+http_requests = Counter(
+    "http_requests_total", "Requests handled, by route template and status", ("method", "route", "status")
+)
+
+# MongoDB, recorded by mongo_listener
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trips", ("command", "collection")
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total", "MongoDB commands that failed", ("command", "collection")
+)
+
+# Outbound calls
+email_send_duration = Histogram(
+    "email_send_duration_seconds", "Time to send one email over SMTP", ("outcome",), SLOW_BUCKETS
+)
+chat_duration = Histogram(
+    "chat_duration_seconds", "Time to answer one chatbot message, context and LLM call included",
+    ("outcome",), SLOW_BUCKETS
+)
+llm_tokens = Counter(
+    "llm_tokens_total", "Tokens used by LLM calls", ("model", "kind")
+)
+
+# Background work
+scheduler_job_duration = Histogram(
+    "scheduler_job_duration_seconds", "Duration of scheduled job runs", ("job", "outcome"), SLOW_BUCKETS
+)
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a sleeping task", buckets=LAG_BUCKETS
+)
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Time every command the driver sends, by command name and collection"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[object, int], str] = {}
+
+    @staticmethod
+    def _key(event) -> Tuple[object, int]:
+        return event.connection_id, event.request_id
+
+    def started(self, event):
+        command = event.command
+        # e.g. {"find": "assignments", ...}; getMore names the collection separately
+        collection = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        self._collections[self._key(event)] = collection if isinstance(collection, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop(self._key(event), "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, collection)
+
+    def failed(self, event):
+        collection = self._collections.pop(self._key(event), "")
+        mongo_command_duration.observe(event.duration_micros / 1e6, event.command_name, collection)
+        mongo_command_failures.inc(event.command_name, collection)
+
+mongo_listener = MongoCommandListener()
+
+def record_llm_usage(model: str, message):
+    """Count the prompt and completion tokens reported on an LLM response message"""
+    metadata = getattr(message, "response_metadata", None) or {}
+    usage = metadata.get("token_usage") or {}
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            llm_tokens.inc(model, kind, amount=tokens)
+
+def timed_job(job: str, function: Callable):
+    """Wrap a scheduler job coroutine function so each run's duration is recorded"""
+    @functools.wraps(function)
+    async def run(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            return await function(*args, **kwargs)
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            scheduler_job_duration.observe(time.perf_counter() - started, job, outcome)
+    return run
+
+_lag_task: Optional[asyncio.Task] = None
+
+async def _sample_loop_lag(interval: float):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - started - interval))
+
+def start_loop_lag_monitor():
+    """Sample event-loop lag every METRICS_LOOP_LAG_INTERVAL seconds; 0 turns it off"""
+    global _lag_task
+    if settings.METRICS_LOOP_LAG_INTERVAL > 0 and _lag_task is None:
+        _lag_task = asyncio.get_running_loop().create_task(_sample_loop_lag(settings.METRICS_LOOP_LAG_INTERVAL))
+
+def stop_loop_lag_monitor():
+    global _lag_task
+    if _lag_task is not None:
+        _lag_task.cancel()
+        _lag_task = None
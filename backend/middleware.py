@@ -0,0 +1,450 @@
+"""Pure ASGI middleware.
+
+These wrap the ASGI callable directly instead of going through
+``BaseHTTPMiddleware``/``@app.middleware("http")``, which run every request in
+an extra task and re-wrap the response body stream.
+"""
+import asyncio
+import hmac
+import logging
+import os
+import random
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is used when it isn't installed
+    brotli = None
+
+from backend import metrics, profiling
+from backend.config import settings
+from backend.logging_config import redact_headers, sample_rate
+
+request_logger = logging.getLogger("backend.requests")
+logger = logging.getLogger(__name__)
+
+Headers = List[Tuple[bytes, bytes]]
+
+COMPRESSIBLE_TYPES = (
+    b"application/json", b"application/x-ndjson", b"text/", b"application/javascript", b"application/xml",
+)
+
+_route_paths: Dict[object, str] = {}
+
+def route_template(scope) -> str:
+    """The path template of the route that handled a request, e.g. /api/courses/{course_id}.
+
+    Only known once the app has routed the request, so call it afterwards.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "<unmatched>"
+    path = _route_paths.get(endpoint)
+    if path is None:
+        _route_paths.update(
+            (getattr(route, "endpoint", None), route.path)
+            for route in scope["app"].routes
+            if hasattr(route, "path")
+        )
+        path = _route_paths.setdefault(endpoint, "<unmatched>")
+    return path
+
+class CORSMiddleware:
+    """CORS for a fixed set of allowed origins.
+
+    Origins are checked against a precomputed set of the raw header bytes and
+    every header except Access-Control-Allow-Origin is built once up front, so
+    a request only costs a scan of its headers for Origin. Requests without an
+    Origin header, and non-HTTP scopes, pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        allow_origins: Iterable[str],
+        allow_methods: Iterable[str],
+        allow_headers: Iterable[str],
+        expose_headers: Iterable[str] = (),
+        max_age: int = 600
+    ):
+        self.app = app
+        self.allow_origins = frozenset(origin.encode("latin-1") for origin in allow_origins)
+        self.preflight_headers: Headers = [
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-allow-headers", ", ".join(allow_headers).encode("latin-1")),
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (b"vary", b"Origin"),
+            (b"content-length", b"0"),
+        ]
+        self.simple_headers: Headers = [(b"access-control-allow-credentials", b"true"), (b"vary", b"Origin")]
+        if expose_headers:
+            self.simple_headers.append(
+                (b"access-control-expose-headers", ", ".join(expose_headers).encode("latin-1"))
+            )
+        self.rejected_headers: Headers = [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", b"18"),
+            (b"vary", b"Origin"),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        preflight = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                preflight = True
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed = origin in self.allow_origins
+
+        if preflight and scope["method"] == "OPTIONS":
+            if allowed:
+                await send({
+                    "type": "http.response.start",
+                    "status": 204,
+                    "headers": [(b"access-control-allow-origin", origin), *self.preflight_headers],
+                })
+                await send({"type": "http.response.body", "body": b""})
+            else:
+                await send({"type": "http.response.start", "status": 403, "headers": self.rejected_headers})
+                await send({"type": "http.response.body", "body": b"Origin not allowed"})
+            return
+
+        if not allowed:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"access-control-allow-origin", origin),
+                    *self.simple_headers,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+class RequestLoggingMiddleware:
+    """Log one structured line per request with its route, status, size and timing.
+
+    Requests are sampled per route template (see ``sample_rate`` in
+    backend/logging_config.py); server errors and requests slower than
+    LOG_SLOW_REQUEST_MS are always logged. The route template is logged rather
+    than the raw path so secrets in paths, like calendar feed tokens, stay out
+    of the logs, and the query string is never logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            route = route_template(scope)
+            status = response["status"]
+            if (
+                status >= 500
+                or duration_ms >= settings.LOG_SLOW_REQUEST_MS
+                or random.random() < sample_rate(route)
+            ):
+                fields = {
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(duration_ms, 2),
+                    "bytes": response["bytes"],
+                }
+                if settings.LOG_REQUEST_HEADERS:
+                    fields["headers"] = redact_headers(scope["headers"])
+                request_logger.log(logging.ERROR if status >= 500 else logging.INFO, "request", extra=fields)
+
+class MetricsMiddleware:
+    """Record in-flight requests, and the latency and status of each request by route template.
+
+    The route is only known once routing is done, so the in-flight gauge is
+    not broken down by route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            metrics.http_requests_in_flight.dec()
+            method = scope["method"]
+            route = route_template(scope)
+            metrics.http_request_duration.observe(time.perf_counter() - started, method, route)
+            metrics.http_requests.inc(method, route, str(status))
+
+class ProfilingMiddleware:
+    """Profile single requests and write each profile to ``directory``.
+
+    A request is profiled when its X-Profile-Token header matches ``token``,
+    or at random with probability ``sample_rate``. One request is profiled
+    at a time; requests arriving meanwhile run unprofiled. The response of a
+    profiled request carries an X-Profile-Id header naming the file. Only the
+    newest ``max_files`` profiles are kept. See backend/profiling.py for the
+    profilers and file formats.
+
+    main.py only installs this middleware when profiling is configured, so
+    it costs nothing when it is off.
+    """
+
+    def __init__(self, app, token: str, sample_rate: float, directory: str, max_files: int, interval: float):
+        self.app = app
+        self.token = token.encode("latin-1")
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.max_files = max_files
+        self.interval = interval
+        self._busy = False
+
+    def _selected(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == b"x-profile-token":
+                    return hmac.compare_digest(value, self.token)
+        return random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{os.urandom(4).hex()}"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        session = profiling.new_session(self.interval)
+        session.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            session.stop()
+            self._busy = False
+            try:
+                # Rendering and writing the profile stay off the event loop
+                path = await asyncio.get_running_loop().run_in_executor(
+                    None, profiling.save, session, self.directory, profile_id, self.max_files
+                )
+                logger.info(
+                    "Request profiled",
+                    extra={"method": scope["method"], "route": route_template(scope), "profile": path}
+                )
+            except Exception:
+                logger.exception(f"Failed to save profile {profile_id}")
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class CompressionMiddleware:
+    """Compress text and JSON responses with brotli or gzip, as the client accepts.
+
+    Brotli is preferred when the ``brotli`` package is installed. Responses
+    smaller than ``minimum_size`` are sent as they are; their size is known
+    from Content-Length or from a single-message body, so small JSON responses
+    cost no compression work at all. Streaming responses are compressed and
+    flushed chunk by chunk, so each chunk reaches the client as it is sent
+    instead of waiting in the compressor's window.
+    """
+
+    def __init__(self, app, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._encodings: Dict[bytes, Optional[bytes]] = {}
+
+    def _choose_encoding(self, accept_encoding: bytes) -> Optional[bytes]:
+        encoding = self._encodings.get(accept_encoding, b"")
+        if encoding != b"":
+            return encoding
+
+        accepted = set()
+        for item in accept_encoding.lower().split(b","):
+            name, _, params = item.strip().partition(b";")
+            quality = params.strip()
+            if quality.startswith(b"q="):
+                try:
+                    if float(quality[2:]) == 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(name.strip())
+
+        if brotli is not None and b"br" in accepted:
+            encoding = b"br"
+        elif b"gzip" in accepted or b"*" in accepted:
+            encoding = b"gzip"
+        else:
+            encoding = None
+        if len(self._encodings) < 256:  # header values repeat; keep the cache small
+            self._encodings[accept_encoding] = encoding
+        return encoding
+
+    def _compressor(self, encoding: bytes):
+        if encoding == b"br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+    @staticmethod
+    def _compressible(message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        content_type = b""
+        for name, value in message.get("headers", ()):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _compress_chunk(compressor, body: bytes, more_body: bool) -> bytes:
+        data = compressor.compress(body)
+        if not more_body:
+            return data + compressor.finish()
+        # Flush so the chunk can be decoded now rather than when the stream ends
+        return data + compressor.flush() if body else data
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = self._choose_encoding(value)
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        held_start = None  # response start, held until the first body chunk decides
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal held_start, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                if not self._compressible(message):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers = list(message.get("headers", ()))
+                headers.append((b"vary", b"Accept-Encoding"))
+                message["headers"] = headers
+                for name, value in headers:
+                    if name == b"content-length" and int(value) < self.minimum_size:
+                        passthrough = True
+                        await send(message)
+                        return
+                held_start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                start, held_start = held_start, None
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = self._compressor(encoding)
+                data = self._compress_chunk(compressor, body, more_body)
+                headers = [(name, value) for name, value in start["headers"] if name != b"content-length"]
+                headers.append((b"content-encoding", encoding))
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode("latin-1")))
+                start["headers"] = headers
+                await send(start)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            data = self._compress_chunk(compressor, body, more_body)
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
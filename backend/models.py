@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, validator
+from typing import Optional, List, Literal
+from datetime import datetime, date, timedelta
 from bson import ObjectId
+from backend.config import settings
 
 class PyObjectId(ObjectId):
     @classmethod
@@ -18,6 +19,10 @@ class PyObjectId(ObjectId):
     def __get_pydantic_json_schema__(cls, field_schema):
         field_schema.update(type="string")
 
+def _projection(model, *derived: str) -> dict:
+    """MongoDB projection of the stored fields a response model is built from"""
+    return {name: 1 for name in model.__fields__ if name not in ("id", *derived)}
+
 # User Models
 class UserBase(BaseModel):
     email: EmailStr
@@ -79,6 +84,23 @@ class CourseResponse(BaseModel):
     class Config:
         populate_by_name = True
 
+COURSE_PROJECTION = _projection(CourseResponse)
+
+def serialize_course(course: dict) -> dict:
+    """Serialize a stored course document as a CourseResponse, without validation"""
+    return {
+        "id": str(course["_id"]),
+        "course_name": course["course_name"],
+        "course_code": course.get("course_code"),
+        "instructor": course.get("instructor"),
+        "description": course.get("description"),
+        "created_at": course.get("created_at", datetime.utcnow()),
+    }
+
+def course_response(course: dict) -> CourseResponse:
+    """Build a CourseResponse from a stored course document"""
+    return CourseResponse(**serialize_course(course))
+
 # Assignment Models
 class AssignmentBase(BaseModel):
     title: str
@@ -116,7 +138,69 @@ class AssignmentResponse(BaseModel):
     class Config:
         populate_by_name = True
 
+ASSIGNMENT_PROJECTION = _projection(AssignmentResponse, "course_name")
+
+def serialize_assignment(assignment: dict, course_name: str) -> dict:
+    """Serialize a stored assignment document as an AssignmentResponse, without validation"""
+    return {
+        "id": str(assignment["_id"]),
+        "title": assignment["title"],
+        "description": assignment.get("description"),
+        "course_id": str(assignment["course_id"]),
+        "course_name": course_name,
+        "due_date": assignment["due_date"],
+        "priority": assignment["priority"],
+        "completed": assignment["completed"],
+        "created_at": assignment.get("created_at", datetime.utcnow()),
+    }
+
+def assignment_response(assignment: dict, course_name: str) -> AssignmentResponse:
+    """Build an AssignmentResponse from a stored assignment document"""
+    return AssignmentResponse(**serialize_assignment(assignment, course_name))
+
+class AssignmentCounts(BaseModel):
+    total: int = 0
+    pending: int = 0
+    completed: int = 0
+    overdue: int = 0
+    due_this_week: int = 0
+
+class CourseStats(BaseModel):
+    course_id: str
+    course_name: str
+    total: int = 0
+    pending: int = 0
+    completed: int = 0
+
+class AssignmentStats(AssignmentCounts):
+    by_course: List[CourseStats] = []
+
 # Schedule Models
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+class RecurrenceRule(BaseModel):
+    # Weekly recurrence; with no weekdays the series repeats on day_of_week,
+    # or on the weekday of start_time
+    weekdays: List[str] = []
+    interval: int = Field(default=1, ge=1)  # every N weeks
+    until: Optional[datetime] = None  # inclusive, by date
+    exceptions: List[datetime] = []  # dates of skipped occurrences
+    
+    @validator("weekdays", each_item=True)
+    def validate_weekday(cls, v):
+        if v not in WEEKDAYS:
+            raise ValueError(f"Weekday must be one of {', '.join(WEEKDAYS)}")
+        return v
+    
+    @validator("exceptions", pre=True, each_item=True)
+    def parse_exception_date(cls, v):
+        # Accept plain dates; MongoDB can only store full datetimes
+        if isinstance(v, str) and len(v) == 10:
+            v = date.fromisoformat(v)
+        if isinstance(v, date) and not isinstance(v, datetime):
+            v = datetime(v.year, v.month, v.day)
+        return v
+
 class ScheduleBase(BaseModel):
     title: str
     description: Optional[str] = None
@@ -125,6 +209,20 @@ class ScheduleBase(BaseModel):
     end_time: datetime
     day_of_week: Optional[str] = None  # Monday, Tuesday, etc.
     location: Optional[str] = None
+    recurrence: Optional[RecurrenceRule] = None
+    
+    @validator("end_time")
+    def validate_duration(cls, v, values):
+        # Window queries only look back SCHEDULE_MAX_EVENT_HOURS for events that
+        # started earlier, and free/busy needs non-negative durations
+        start = values.get("start_time")
+        if start is None:
+            return v
+        if v <= start:
+            raise ValueError("end_time must be after start_time")
+        if v - start > timedelta(hours=settings.SCHEDULE_MAX_EVENT_HOURS):
+            raise ValueError(f"An event may last at most {settings.SCHEDULE_MAX_EVENT_HOURS} hours")
+        return v
 
 class ScheduleCreate(ScheduleBase):
     pass
@@ -149,11 +247,117 @@ class ScheduleResponse(BaseModel):
     end_time: datetime
     day_of_week: Optional[str] = None
     location: Optional[str] = None
+    recurrence: Optional[RecurrenceRule] = None
+    series_id: Optional[str] = None  # set on occurrences expanded from a recurring series
     created_at: datetime
     
     class Config:
         populate_by_name = True
 
+SCHEDULE_PROJECTION = _projection(ScheduleResponse, "course_name", "series_id")
+
+def _serialize_recurrence(rule: Optional[dict]) -> Optional[dict]:
+    # Stored rules may omit fields that RecurrenceRule fills with defaults
+    if rule is None:
+        return None
+    return {
+        "weekdays": rule.get("weekdays", []),
+        "interval": rule.get("interval", 1),
+        "until": rule.get("until"),
+        "exceptions": rule.get("exceptions", []),
+    }
+
+def serialize_schedule(schedule: dict, course_name: Optional[str]) -> dict:
+    """Serialize a stored schedule document as a ScheduleResponse, without validation"""
+    return {
+        "id": str(schedule["_id"]),
+        "title": schedule["title"],
+        "description": schedule.get("description"),
+        "course_id": str(schedule["course_id"]) if schedule.get("course_id") else None,
+        "course_name": course_name,
+        "start_time": schedule["start_time"],
+        "end_time": schedule["end_time"],
+        "day_of_week": schedule.get("day_of_week"),
+        "location": schedule.get("location"),
+        "recurrence": _serialize_recurrence(schedule.get("recurrence")),
+        "series_id": schedule.get("series_id"),
+        "created_at": schedule.get("created_at", datetime.utcnow()),
+    }
+
+def schedule_response(schedule: dict, course_name: Optional[str]) -> ScheduleResponse:
+    """Build a ScheduleResponse from a stored schedule document"""
+    return ScheduleResponse(**serialize_schedule(schedule, course_name))
+
+class ScheduleConflict(BaseModel):
+    first: ScheduleResponse
+    second: ScheduleResponse
+
+class ConflictingEvent(BaseModel):
+    """An event that a written schedule overlaps"""
+    id: Optional[str] = None  # None for an item created by the same batch
+    title: str
+    start_time: datetime
+    end_time: datetime
+    batch_index: Optional[int] = None  # set when the event is another item of the same batch
+
+class ScheduleWriteResponse(ScheduleResponse):
+    # Overlaps are reported, not rejected; the schedule has been saved
+    conflicts: List[ConflictingEvent] = []
+
+class TimeSlot(BaseModel):
+    start: datetime
+    end: datetime
+
+class FreeBusyResponse(BaseModel):
+    busy: List[TimeSlot]
+    free: List[TimeSlot]
+
+# Batch Models
+class BatchItemResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[str] = None
+    success: bool
+    error: Optional[str] = None
+    conflicts: Optional[List[ConflictingEvent]] = None  # schedule batches only
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
+
+class CourseBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    data: Optional[CourseCreate] = None
+
+class CourseBatchRequest(BaseModel):
+    operations: List[CourseBatchOperation]
+
+class AssignmentBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    data: Optional[AssignmentCreate] = None
+
+class AssignmentBatchRequest(BaseModel):
+    operations: List[AssignmentBatchOperation]
+
+class ScheduleBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    data: Optional[ScheduleCreate] = None
+
+class ScheduleBatchRequest(BaseModel):
+    operations: List[ScheduleBatchOperation]
+
+# Dashboard Models
+class DashboardResponse(BaseModel):
+    courses: List[CourseResponse]
+    pending_assignments: List[AssignmentResponse]  # next pending assignments by due date
+    assignment_counts: AssignmentCounts
+    today_schedule: List[ScheduleResponse]
+    week_schedule: List[ScheduleResponse]  # today and the following six days
+
 # Token Models
 class Token(BaseModel):
     access_token: str
@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: datetime, document_id) -> str:
+    """Encode the (sort value, _id) position of a document as an opaque cursor"""
+    payload = json.dumps({"v": sort_value.isoformat(), "id": str(document_id)})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_position(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor, keeping the id as a string.
+
+    Expanded occurrences of recurring series have synthetic string ids.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["v"]), str(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_cursor for a stored document"""
+    sort_value, document_id = decode_position(cursor)
+    if not ObjectId.is_valid(document_id):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, ObjectId(document_id)
+
+def keyset_filter(sort_field: str, cursor: str) -> dict:
+    """Filter matching documents strictly after the cursor in (sort_field, _id) order"""
+    sort_value, document_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {sort_field: {"$gt": sort_value}},
+            {sort_field: sort_value, "_id": {"$gt": document_id}},
+        ]
+    }
+
+def paginated_query(query: dict, sort_field: str, cursor: Optional[str]) -> dict:
+    """Combine a filter with the keyset condition for the requested cursor"""
+    if not cursor:
+        return query
+    return {"$and": [query, keyset_filter(sort_field, cursor)]}
+
+async def fetch_page(
+    collection,
+    query: dict,
+    sort_field: str,
+    cursor: Optional[str],
+    limit: int,
+    projection: Optional[dict] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page ordered by (sort_field, _id) and the cursor of the next page.
+
+    One extra document is read to find out whether another page exists, so the
+    number of documents held in memory is bounded by ``limit + 1``.
+    ``projection`` must include ``sort_field``.
+    """
+    documents = await collection.find(
+        paginated_query(query, sort_field, cursor), projection
+    ).sort([(sort_field, 1), ("_id", 1)]).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last[sort_field], last["_id"])
+
+    return documents, next_cursor
+
+def date_range(field: str, after: Optional[datetime], before: Optional[datetime]) -> dict:
+    """Build an inclusive range condition on a date field"""
+    condition = {}
+    if after is not None:
+        condition["$gte"] = after
+    if before is not None:
+        condition["$lte"] = before
+    return {field: condition} if condition else {}
@@ -0,0 +1,153 @@
+"""Password hashing and verification on a bounded worker pool.
+
+bcrypt deliberately takes 100-300 ms per call, which would stall the event
+loop and every request in flight if run inline. Calls go to a dedicated
+thread pool instead (bcrypt releases the GIL while hashing) with at most
+PASSWORD_HASH_WORKERS running and PASSWORD_HASH_QUEUE_LIMIT waiting; beyond
+that requests are rejected with 503 and a Retry-After header rather than
+queueing without bound.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from backend import metrics
+from backend.auth_utils import get_password_hash, verify_password
+from backend.config import settings
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+class LatencyStats:
+    """Count, sum, max and a cumulative histogram of observed durations.
+
+    Observed from the pool's worker threads as well as the event loop, so
+    updates and reads hold a lock, as the collectors in backend/metrics.py do.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: List[int] = [0] * len(LATENCY_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[index] += 1
+
+    def read(self) -> Tuple[int, float, float, List[int]]:
+        """A consistent copy of count, total, max and the bucket counts"""
+        with self._lock:
+            return self.count, self.total, self.max, list(self.buckets)
+
+    def snapshot(self) -> dict:
+        count, total, maximum, buckets = self.read()
+        return {
+            "count": count,
+            "avg_ms": round(total / count * 1000, 1) if count else 0.0,
+            "max_ms": round(maximum * 1000, 1),
+            "buckets": {str(bound): bucket for bound, bucket in zip(LATENCY_BUCKETS, buckets)},
+        }
+
+class PasswordPool:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.in_flight = 0  # only touched from the event loop, so no lock is needed
+        self.rejected = 0
+        # "hash" is time spent in bcrypt, "total" adds the wait for a free worker
+        self.latency: Dict[str, Dict[str, LatencyStats]] = {
+            operation: {"hash": LatencyStats(), "total": LatencyStats()}
+            for operation in ("hash", "verify")
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _timed(self, operation: str, function: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.latency[operation]["hash"].observe(time.perf_counter() - started)
+
+    async def run(self, operation: str, function: Callable, *args):
+        if self.in_flight >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in requests, please retry shortly",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)}
+            )
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._timed, operation, function, *args
+            )
+        finally:
+            self.in_flight -= 1
+            self.latency[operation]["total"].observe(time.perf_counter() - started)
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "latency": {
+                operation: {kind: stats.snapshot() for kind, stats in kinds.items()}
+                for operation, kinds in self.latency.items()
+            },
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+pool = PasswordPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
+
+def _latency_samples():
+    for operation, stages in pool.latency.items():
+        for stage, stats in stages.items():
+            labels = {"operation": operation, "stage": stage}
+            count, total, _, buckets = stats.read()
+            for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                yield "_bucket", {**labels, "le": metrics.format_value(bound)}, bucket
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+metrics.Collector(
+    "password_pool_in_flight", "gauge", "Password hashes running or waiting for a worker",
+    lambda: [("", {}, pool.in_flight)]
+)
+metrics.Collector(
+    "password_pool_rejected_total", "counter", "Password hashes rejected with 503 because the pool was full",
+    lambda: [("", {}, pool.rejected)]
+)
+metrics.Collector(
+    "password_pool_duration_seconds", "histogram",
+    "Password hash and verify time; stage \"hash\" is bcrypt alone, \"total\" adds the wait for a worker",
+    _latency_samples
+)
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the worker pool; raises 503 when the pool is saturated"""
+    return await pool.run("hash", get_password_hash, password)
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the worker pool; raises 503 when the pool is saturated"""
+    return await pool.run("verify", verify_password, plain_password, hashed_password)
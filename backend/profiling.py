@@ -0,0 +1,87 @@
+"""Profiler sessions for ProfilingMiddleware in backend/middleware.py.
+
+With ``pyinstrument``, installed from backend/requirements.txt, a request is
+profiled by its sampling profiler in async mode: time spent awaiting MongoDB,
+SMTP or the LLM shows up under the route handler that awaited it, and the
+profile is written as speedscope JSON (open it at https://www.speedscope.app).
+If it is missing, cProfile is used and a ``.pstats`` file is written; cProfile
+only sees CPU time on the event loop thread, so awaits are not attributed and
+other requests running at the same time show up in the profile too.
+"""
+import cProfile
+import marshal
+import os
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # cProfile is used on installs without it
+    Profiler = None
+
+class _PyinstrumentSession:
+    suffix = ".speedscope.json"
+
+    def __init__(self, interval: float):
+        self._profiler = Profiler(interval=interval, async_mode="enabled")
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    def render(self) -> bytes:
+        return self._profiler.output(SpeedscopeRenderer()).encode()
+
+class _CProfileSession:
+    suffix = ".pstats"
+
+    def __init__(self, interval: float):
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+
+    def render(self) -> bytes:
+        # The format pstats.Stats and tools like snakeviz read, as Profile.dump_stats writes it
+        self._profiler.create_stats()
+        return marshal.dumps(self._profiler.stats)
+
+def new_session(interval: float):
+    """A profiler session for one request, using pyinstrument when it is installed"""
+    if Profiler is not None:
+        return _PyinstrumentSession(interval)
+    return _CProfileSession(interval)
+
+def save(session, directory: str, profile_id: str, max_files: int = 0) -> str:
+    """Render a stopped session to ``directory`` and return the file path; blocking.
+
+    With ``max_files`` set, the oldest profiles beyond that many are deleted.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile_id + session.suffix)
+    with open(path, "wb") as output:
+        output.write(session.render())
+    if max_files > 0:
+        _prune(directory, max_files)
+    return path
+
+def _prune(directory: str, max_files: int):
+    suffixes = (_PyinstrumentSession.suffix, _CProfileSession.suffix)
+    profiles = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(suffixes):
+                try:
+                    profiles.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:  # pruned meanwhile by another worker
+                    pass
+    profiles.sort()
+    for _, path in profiles[:-max_files]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,85 @@
+"""Lazy expansion of recurring schedules.
+
+A recurring schedule is stored once, as its first occurrence plus a weekly
+``recurrence`` rule (see ``RecurrenceRule`` in backend/models.py). Occurrences
+are never stored; they are generated on demand for the requested window only.
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List
+
+from backend.models import WEEKDAYS
+
+def _weekday_indexes(schedule: dict) -> List[int]:
+    rule = schedule["recurrence"]
+    names = rule.get("weekdays") or []
+    if not names and schedule.get("day_of_week") in WEEKDAYS:
+        names = [schedule["day_of_week"]]
+    if not names:
+        return [schedule["start_time"].weekday()]
+    return sorted({WEEKDAYS.index(name) for name in names})
+
+def occurrence_starts(schedule: dict, window_start: datetime, window_end: datetime) -> Iterator[datetime]:
+    """Yield the start of every occurrence of a recurring schedule overlapping the window, in order"""
+    rule = schedule["recurrence"]
+    first = schedule["start_time"]
+    duration = schedule["end_time"] - first
+    interval = rule.get("interval") or 1
+    weekdays = _weekday_indexes(schedule)
+    exceptions = {exception.date() for exception in rule.get("exceptions") or []}
+
+    last_date = (window_end - timedelta(microseconds=1)).date()
+    if rule.get("until") is not None:
+        last_date = min(last_date, rule["until"].date())
+
+    # Skip straight to the week containing the earliest occurrence that can still overlap
+    earliest = max(first, window_start - duration)
+    first_monday = first.date() - timedelta(days=first.weekday())
+    week = max(0, (earliest.date() - first_monday).days // 7)
+    week += -week % interval
+
+    while True:
+        monday = first_monday + timedelta(weeks=week)
+        if monday > last_date:
+            return
+        for weekday in weekdays:
+            day = monday + timedelta(days=weekday)
+            if day > last_date:
+                return
+            start = datetime.combine(day, first.time())
+            if start >= window_end:
+                return
+            if start < first or day in exceptions:
+                continue
+            if start + duration > window_start:
+                yield start
+        week += interval
+
+def expand(schedule: dict, window_start: datetime, window_end: datetime) -> Iterator[dict]:
+    """Yield the schedule's occurrences overlapping [window_start, window_end).
+
+    One-off schedules yield themselves; occurrences of a recurring series carry
+    a synthetic ``_id`` and the series id in ``series_id``.
+    """
+    if not schedule.get("recurrence"):
+        yield schedule
+        return
+
+    duration = schedule["end_time"] - schedule["start_time"]
+    series_id = str(schedule["_id"])
+    for start in occurrence_starts(schedule, window_start, window_end):
+        yield {
+            **schedule,
+            "_id": f"{series_id}_{start:%Y%m%dT%H%M}",
+            "series_id": series_id,
+            "start_time": start,
+            "end_time": start + duration,
+            "day_of_week": WEEKDAYS[start.weekday()],
+        }
+
+def expand_all(schedules: Iterable[dict], window_start: datetime, window_end: datetime) -> Iterator[dict]:
+    """Merge the occurrences of many schedules into one stream ordered by start time"""
+    return heapq.merge(
+        *(expand(schedule, window_start, window_end) for schedule in schedules),
+        key=lambda occurrence: occurrence["start_time"]
+    )
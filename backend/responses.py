@@ -0,0 +1,87 @@
+"""Fast encoding for list responses.
+
+List endpoints build plain dicts with ``serialize_course``,
+``serialize_assignment`` and ``serialize_schedule`` in backend/models.py and
+return them through ``encoded_response``. Returning a Response skips FastAPI's
+second pass over the content, which would validate it against
+``response_model`` and run ``jsonable_encoder`` over every row; the
+``response_model`` still documents the endpoint in OpenAPI.
+
+JSON is encoded with orjson. Clients that prefer ``application/msgpack`` in
+their Accept header get MessagePack instead.
+"""
+from datetime import datetime
+from typing import Dict
+
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+try:
+    import msgpack
+except ImportError:  # installed from requirements.txt; JSON is served without it
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+JSON_MEDIA_TYPES = ("application/json", "application/*", "*/*")
+
+# Accept header value -> whether it selects MessagePack; header values repeat
+_accept_cache: Dict[str, bool] = {}
+
+def _encode_default(value):
+    # Datetimes are sent as ISO 8601 strings, the same as in JSON
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, default=_encode_default)
+
+def _prefers_msgpack(accept: str) -> bool:
+    msgpack_quality = json_quality = 0.0
+    for item in accept.lower().split(","):
+        media_type, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.strip()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in JSON_MEDIA_TYPES:
+            json_quality = max(json_quality, quality)
+    # q=0 means "not acceptable"; on a tie the client named MessagePack explicitly
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client prefers MessagePack to JSON and it can be produced"""
+    if msgpack is None:
+        return False
+    accept = request.headers.get("accept", "")
+    preferred = _accept_cache.get(accept)
+    if preferred is None:
+        preferred = _prefers_msgpack(accept)
+        if len(_accept_cache) < 256:
+            _accept_cache[accept] = preferred
+    return preferred
+
+def encoded_response(request: Request, response: Response, content) -> Response:
+    """Encode plain, already serialized content in the format the client accepts.
+
+    Headers the handler set on its ``response`` parameter, such as ETag and
+    X-Next-Cursor, are carried over.
+    """
+    response_class = MsgPackResponse if wants_msgpack(request) else ORJSONResponse
+    encoded = response_class(content, status_code=response.status_code or 200)
+    encoded.raw_headers.extend(
+        (name, value) for name, value in response.raw_headers
+        if name not in (b"content-length", b"content-type")
+    )
+    encoded.raw_headers.append((b"vary", b"Accept"))
+    return encoded
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from backend.routers import auth, courses, assignments, schedules, chat
+from backend.routers import auth, courses, assignments, schedules, chat, calendar, dashboard
 
 router = APIRouter()
 router.include_router(auth.router, tags=["Authentication"])
@@ -7,5 +7,7 @@ router.include_router(courses.router, prefix="/courses", tags=["Courses"])
 router.include_router(assignments.router, prefix="/assignments", tags=["Assignments"])
 router.include_router(schedules.router, prefix="/schedules", tags=["Schedules"])
 router.include_router(chat.router, prefix="/chat", tags=["AI Chat"])
+router.include_router(calendar.router, prefix="/calendar", tags=["Calendar"])
+router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 
-__all__ = ["router", "auth", "courses", "assignments", "schedules", "chat"]
+__all__ = ["router", "auth", "courses", "assignments", "schedules", "chat", "calendar", "dashboard"]
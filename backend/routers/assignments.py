@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from backend.models import AssignmentCreate, AssignmentResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
+from backend.models import AssignmentCreate, AssignmentResponse, AssignmentBatchRequest, AssignmentStats, CourseStats, BatchResponse, ASSIGNMENT_PROJECTION, assignment_response, serialize_assignment
 from backend.auth import get_current_user_id, get_current_user
-from backend.database import get_database
+from backend import calendar_feed, user_stats, versions
+from backend.database import get_database, get_course_names, insert_document, update_document, toggle_field
 from bson import ObjectId
+from pymongo import ReturnDocument
 from backend.email_service import send_assignment_notification
+from backend.batch import BatchItemError, run_batch
+from backend.pagination import NEXT_CURSOR_HEADER, date_range, fetch_page, paginated_query
+from backend.responses import encoded_response
+from backend.schedule_window import MAX_TZ_OFFSET_MINUTES, local_now
+from backend.streaming import ndjson_response, wants_ndjson
+from backend.config import settings
+import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/assignments", tags=["Assignments"])
 
 @router.post("/", response_model=AssignmentResponse)
@@ -36,8 +46,10 @@ async def create_assignment(
     assignment_dict["reminder_sent"] = False
     assignment_dict["created_at"] = datetime.utcnow()
     
-    result = await db.assignments.insert_one(assignment_dict)
-    created_assignment = await db.assignments.find_one({"_id": result.inserted_id})
+    created_assignment = await insert_document(db.assignments, assignment_dict)
+    await user_stats.apply(db, user_id, added=[created_assignment])
+    await versions.bump(db, user_id, "assignments")
+    calendar_feed.invalidate(user_id)
     
     # Send email notification
     try:
@@ -48,45 +60,140 @@ async def create_assignment(
             due_date=created_assignment["due_date"]
         )
     except Exception as e:
-        print(f"Failed to send email notification: {str(e)}")
-    
-    return AssignmentResponse(
-        id=str(created_assignment["_id"]),
-        title=created_assignment["title"],
-        description=created_assignment.get("description"),
-        course_id=str(created_assignment["course_id"]),
-        course_name=course["course_name"],
-        due_date=created_assignment["due_date"],
-        priority=created_assignment["priority"],
-        completed=created_assignment["completed"],
-        created_at=created_assignment.get("created_at", datetime.utcnow())
+        logger.warning(f"Failed to send email notification: {str(e)}")
+    
+    return assignment_response(created_assignment, course["course_name"])
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch_assignments(
+    batch: AssignmentBatchRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Create, update or delete many assignments in one request.
+    
+    No notification emails are sent for batched creates.
+    """
+    db = await get_database()
+    
+    # Verify every referenced course belongs to the user with a single query
+    owned_courses = await get_course_names(
+        db, user_id, {operation.data.course_id for operation in batch.operations if operation.data}
     )
+    
+    def build_update(assignment: AssignmentCreate) -> dict:
+        if assignment.course_id not in owned_courses:
+            raise BatchItemError("Course not found")
+        return assignment.dict()
+    
+    def build_create(assignment: AssignmentCreate) -> dict:
+        assignment_dict = build_update(assignment)
+        assignment_dict["user_id"] = user_id
+        assignment_dict["completed"] = False
+        assignment_dict["reminder_sent"] = False
+        assignment_dict["created_at"] = datetime.utcnow()
+        return assignment_dict
+    
+    removed, added = [], []
+    
+    def record(before, after):
+        removed.append(before)
+        added.append(after)
+    
+    result = await run_batch(db.assignments, user_id, batch.operations, build_create, build_update, record)
+    await user_stats.apply(db, user_id, removed, added)
+    await versions.bump(db, user_id, "assignments")
+    calendar_feed.invalidate(user_id)
+    
+    return result
 
 @router.get("/", response_model=List[AssignmentResponse])
-async def get_assignments(user_id: str = Depends(get_current_user_id)):
-    """Get all assignments for the current user"""
+async def get_assignments(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    completed: Optional[bool] = None,
+    priority: Optional[str] = None,
+    course_id: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    stream: bool = False
+):
+    """Get a page of assignments for the current user, ordered by due date.
+    
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header.
+    With ``stream=true`` or ``Accept: application/x-ndjson`` every matching
+    assignment after the cursor is streamed as NDJSON instead, ignoring ``limit``.
+    Otherwise the response carries an ETag and ``If-None-Match`` is answered with 304.
+    """
     db = await get_database()
     
-    assignments = await db.assignments.find({"user_id": user_id}).sort("due_date", 1).to_list(length=None)
-    
-    result = []
-    for assignment in assignments:
-        course = await db.courses.find_one({"_id": ObjectId(assignment["course_id"])})
-        course_name = course["course_name"] if course else "Unknown Course"
-        
-        result.append(AssignmentResponse(
-            id=str(assignment["_id"]),
-            title=assignment["title"],
-            description=assignment.get("description"),
-            course_id=str(assignment["course_id"]),
-            course_name=course_name,
-            due_date=assignment["due_date"],
-            priority=assignment["priority"],
-            completed=assignment["completed"],
-            created_at=assignment.get("created_at", datetime.utcnow())
-        ))
+    query = {"user_id": user_id, **date_range("due_date", due_after, due_before)}
+    if completed is not None:
+        query["completed"] = completed
+    if priority is not None:
+        query["priority"] = priority
+    if course_id is not None:
+        if not ObjectId.is_valid(course_id):
+            raise HTTPException(status_code=400, detail="Invalid course ID")
+        query["course_id"] = course_id
+    
+    if wants_ndjson(request, stream):
+        course_names = await get_course_names(db, user_id)
+        return ndjson_response(
+            db.assignments.find(
+                paginated_query(query, "due_date", cursor), ASSIGNMENT_PROJECTION
+            ).sort([("due_date", 1), ("_id", 1)]),
+            lambda assignment: serialize_assignment(
+                assignment, course_names.get(str(assignment["course_id"]), "Unknown Course")
+            )
+        )
     
-    return result
+    # Answer from the version counters alone when the client's copy is current
+    cached = await versions.not_modified(db, request, response, user_id, "assignments", "courses")
+    if cached:
+        return cached
+    
+    assignments, next_cursor = await fetch_page(
+        db.assignments, query, "due_date", cursor, limit, ASSIGNMENT_PROJECTION
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Resolve every course name with one query instead of one per assignment
+    course_names = await get_course_names(db, user_id, {a["course_id"] for a in assignments})
+    
+    return encoded_response(request, response, [
+        serialize_assignment(assignment, course_names.get(str(assignment["course_id"]), "Unknown Course"))
+        for assignment in assignments
+    ])
+
+@router.get("/stats", response_model=AssignmentStats)
+async def get_assignment_stats(
+    user_id: str = Depends(get_current_user_id),
+    tz_offset: int = Query(0, ge=-MAX_TZ_OFFSET_MINUTES, le=MAX_TZ_OFFSET_MINUTES)
+):
+    """Get assignment counts for the current user, overall and per course.
+    
+    Served from the incrementally maintained user_stats document, so the cost
+    doesn't grow with the number of assignments. ``tz_offset`` is the client's
+    offset from UTC in minutes; overdue and due-this-week counts compare due
+    dates against the client's local time, as /api/dashboard does.
+    """
+    db = await get_database()
+    
+    stats = await user_stats.get_stats(db, user_id)
+    course_names = await get_course_names(db, user_id)
+    
+    return AssignmentStats(
+        **user_stats.summarize(stats, local_now(tz_offset)),
+        by_course=[
+            CourseStats(course_id=course_id, course_name=course_names[course_id], **counts)
+            for course_id, counts in (stats.get("courses") or {}).items()
+            if course_id in course_names
+        ]
+    )
 
 @router.get("/{assignment_id}", response_model=AssignmentResponse)
 async def get_assignment(
@@ -107,20 +214,9 @@ async def get_assignment(
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
-    course = await db.courses.find_one({"_id": ObjectId(assignment["course_id"])})
-    course_name = course["course_name"] if course else "Unknown Course"
-    
-    return AssignmentResponse(
-        id=str(assignment["_id"]),
-        title=assignment["title"],
-        description=assignment.get("description"),
-        course_id=str(assignment["course_id"]),
-        course_name=course_name,
-        due_date=assignment["due_date"],
-        priority=assignment["priority"],
-        completed=assignment["completed"],
-        created_at=assignment.get("created_at", datetime.utcnow())
-    )
+    course_names = await get_course_names(db, user_id, [assignment["course_id"]])
+    
+    return assignment_response(assignment, course_names.get(str(assignment["course_id"]), "Unknown Course"))
 
 @router.put("/{assignment_id}", response_model=AssignmentResponse)
 async def update_assignment(
@@ -146,27 +242,23 @@ async def update_assignment(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    result = await db.assignments.update_one(
+    fields = assignment.dict()
+    previous_assignment = await update_document(
+        db.assignments,
         {"_id": ObjectId(assignment_id), "user_id": user_id},
-        {"$set": assignment.dict()}
+        fields,
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.matched_count == 0:
+    if not previous_assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
-    updated_assignment = await db.assignments.find_one({"_id": ObjectId(assignment_id)})
-    
-    return AssignmentResponse(
-        id=str(updated_assignment["_id"]),
-        title=updated_assignment["title"],
-        description=updated_assignment.get("description"),
-        course_id=str(updated_assignment["course_id"]),
-        course_name=course["course_name"],
-        due_date=updated_assignment["due_date"],
-        priority=updated_assignment["priority"],
-        completed=updated_assignment["completed"],
-        created_at=updated_assignment.get("created_at", datetime.utcnow())
-    )
+    updated_assignment = {**previous_assignment, **fields}
+    await user_stats.apply(db, user_id, [previous_assignment], [updated_assignment])
+    await versions.bump(db, user_id, "assignments")
+    calendar_feed.invalidate(user_id)
+    
+    return assignment_response(updated_assignment, course["course_name"])
 
 @router.patch("/{assignment_id}/complete")
 async def toggle_assignment_completion(
@@ -179,22 +271,22 @@ async def toggle_assignment_completion(
     if not ObjectId.is_valid(assignment_id):
         raise HTTPException(status_code=400, detail="Invalid assignment ID")
     
-    assignment = await db.assignments.find_one({
-        "_id": ObjectId(assignment_id),
-        "user_id": user_id
-    })
+    previous_assignment = await toggle_field(
+        db.assignments,
+        {"_id": ObjectId(assignment_id), "user_id": user_id},
+        "completed",
+        return_document=ReturnDocument.BEFORE
+    )
     
-    if not assignment:
+    if not previous_assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
-    new_status = not assignment.get("completed", False)
+    assignment = {**previous_assignment, "completed": not previous_assignment.get("completed", False)}
+    await user_stats.apply(db, user_id, [previous_assignment], [assignment])
+    await versions.bump(db, user_id, "assignments")
+    calendar_feed.invalidate(user_id)
     
-    await db.assignments.update_one(
-        {"_id": ObjectId(assignment_id)},
-        {"$set": {"completed": new_status}}
-    )
-    
-    return {"message": "Assignment status updated", "completed": new_status}
+    return {"message": "Assignment status updated", "completed": assignment["completed"]}
 
 @router.delete("/{assignment_id}")
 async def delete_assignment(
@@ -207,12 +299,16 @@ async def delete_assignment(
     if not ObjectId.is_valid(assignment_id):
         raise HTTPException(status_code=400, detail="Invalid assignment ID")
     
-    result = await db.assignments.delete_one({
+    deleted_assignment = await db.assignments.find_one_and_delete({
         "_id": ObjectId(assignment_id),
         "user_id": user_id
     })
     
-    if result.deleted_count == 0:
+    if not deleted_assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
     
+    await user_stats.apply(db, user_id, removed=[deleted_assignment])
+    await versions.bump(db, user_id, "assignments")
+    calendar_feed.invalidate(user_id)
+    
     return {"message": "Assignment deleted successfully"}
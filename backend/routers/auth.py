@@ -3,17 +3,19 @@ from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
 from backend.models import UserCreate, UserResponse, Token, User
 from backend.auth_utils import (
-    get_password_hash, 
-    verify_password, 
     create_access_token, 
     get_current_user,
     create_tokens,
     create_refresh_token  # Add this import
 )
-from backend.database import get_database
+from backend.database import get_database, insert_document
+from backend.passwords import hash_password, check_password
 from backend.config import settings
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+import logging
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=UserResponse)
@@ -21,21 +23,18 @@ async def register(user: UserCreate):
     """Register a new user"""
     db = await get_database()
     
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user.email})
-    if existing_user:
+    # Create new user; the unique index on users.email rejects duplicates
+    user_dict = user.dict()
+    user_dict["hashed_password"] = await hash_password(user_dict.pop("password"))
+    
+    try:
+        created_user = await insert_document(db.users, user_dict)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    user_dict = user.dict()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
-    
-    result = await db.users.insert_one(user_dict)
-    created_user = await db.users.find_one({"_id": result.inserted_id})
-    
     return UserResponse(
         id=str(created_user["_id"]),
         email=created_user["email"],
@@ -49,7 +48,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     
     # Find user
     user = await db.users.find_one({"email": form_data.username})
-    if not user or not verify_password(form_data.password, user.get("hashed_password", "")):
+    if not user or not await check_password(form_data.password, user.get("hashed_password", "")):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -131,7 +130,7 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
         )
         
     except Exception as e:
-        print(f"Error in get_current_user_info: {e}")
+        logger.exception(f"Error in get_current_user_info: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error retrieving user information"
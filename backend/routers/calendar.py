@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from backend.auth import get_current_user_id
+from backend.database import get_database
+from backend import calendar_feed, versions
+from bson import ObjectId
+from datetime import datetime
+import secrets
+
+router = APIRouter(prefix="/api/calendar", tags=["Calendar"])
+
+@router.post("/token")
+async def create_calendar_token(user_id: str = Depends(get_current_user_id)):
+    """Create or rotate the secret token of the user's calendar subscription feed"""
+    db = await get_database()
+    
+    token = secrets.token_urlsafe(32)
+    await db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"calendar_token": token}})
+    
+    # The old token stops working, so drop anything cached for it
+    calendar_feed.invalidate(user_id)
+    
+    return {"token": token, "url": f"/api/calendar/{token}.ics"}
+
+@router.get("/{token}.ics")
+async def get_calendar_feed(
+    token: str,
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
+):
+    """iCalendar feed of the user's schedules and assignments for calendar subscriptions.
+    
+    Conditional requests for an unchanged feed are answered with 304 after
+    looking up the token and the user's version counters, without rendering.
+    """
+    db = await get_database()
+    user = await db.users.find_one({"calendar_token": token}, {"_id": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+    user_id = str(user["_id"])
+    
+    today = datetime.utcnow().date()
+    etag, last_modified = calendar_feed.validators(await versions.get_versions(db, user_id), today)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": calendar_feed.http_date(last_modified),
+        "Cache-Control": "private, no-cache",
+    }
+    if calendar_feed.is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    
+    body = calendar_feed.feed_cache.get(user_id, etag)
+    if body is not None:
+        return Response(content=body, media_type=calendar_feed.ICS_MEDIA_TYPE, headers=headers)
+    
+    return StreamingResponse(
+        calendar_feed.cached_render(db, user_id, etag, today),
+        media_type=calendar_feed.ICS_MEDIA_TYPE,
+        headers=headers
+    )
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from backend.models import ChatMessage, ChatResponse
 from backend.auth import get_current_user_id
 from backend.ai_chatbot import chatbot
+from backend.schedule_window import MAX_TZ_OFFSET_MINUTES
 
 router = APIRouter(prefix="/api/chat", tags=["AI Chatbot"])
 
 @router.post("/", response_model=ChatResponse)
 async def chat_with_ai(
     message: ChatMessage,
-    user_id: str = Depends(get_current_user_id)
+    user_id: str = Depends(get_current_user_id),
+    tz_offset: int = Query(0, ge=-MAX_TZ_OFFSET_MINUTES, le=MAX_TZ_OFFSET_MINUTES)
 ):
-    """Chat with the AI academic planning assistant"""
+    """Chat with the AI academic planning assistant.
+    
+    ``tz_offset`` is the client's offset from UTC in minutes, so the assistant's
+    view of upcoming events and free time starts at the client's local time.
+    """
     try:
-        response = await chatbot.chat(user_id, message.message)
+        response = await chatbot.chat(user_id, message.message, tz_offset)
         return ChatResponse(response=response)
     except Exception as e:
         raise HTTPException(
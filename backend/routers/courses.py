@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
-from backend.models import CourseCreate, CourseResponse
+from backend.models import CourseCreate, CourseResponse, CourseBatchRequest, BatchResponse, COURSE_PROJECTION, course_response, serialize_course
 from backend.auth import get_current_user_id
-from backend.database import get_database
+from backend import calendar_feed, user_stats, versions
+from backend.database import get_database, insert_document, update_document
+from backend.batch import run_batch
+from backend.responses import encoded_response
+from backend.streaming import ndjson_response, wants_ndjson
 from bson import ObjectId
 from datetime import datetime
 
@@ -20,36 +24,66 @@ async def create_course(
     course_dict["user_id"] = user_id
     course_dict["created_at"] = datetime.utcnow()
     
-    result = await db.courses.insert_one(course_dict)
-    created_course = await db.courses.find_one({"_id": result.inserted_id})
+    created_course = await insert_document(db.courses, course_dict)
+    await user_stats.update_courses(db, user_id, added=[str(created_course["_id"])])
+    await versions.bump(db, user_id, "courses")
     
-    return CourseResponse(
-        id=str(created_course["_id"]),
-        course_name=created_course["course_name"],
-        course_code=created_course.get("course_code"),
-        instructor=created_course.get("instructor"),
-        description=created_course.get("description"),
-        created_at=created_course["created_at"]
-    )
+    return course_response(created_course)
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch_courses(
+    batch: CourseBatchRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Create, update or delete many courses in one request"""
+    db = await get_database()
+    
+    def build_create(course: CourseCreate) -> dict:
+        course_dict = course.dict()
+        course_dict["user_id"] = user_id
+        course_dict["created_at"] = datetime.utcnow()
+        return course_dict
+    
+    added, removed = [], []
+    
+    def record(before, after):
+        if before is None:
+            added.append(str(after["_id"]))
+        elif after is None:
+            removed.append(str(before["_id"]))
+    
+    result = await run_batch(db.courses, user_id, batch.operations, build_create, lambda course: course.dict(), record)
+    await user_stats.update_courses(db, user_id, added, removed)
+    await versions.bump(db, user_id, "courses")
+    calendar_feed.invalidate(user_id)
+    
+    return result
 
 @router.get("/", response_model=List[CourseResponse])
-async def get_courses(user_id: str = Depends(get_current_user_id)):
-    """Get all courses for the current user"""
+async def get_courses(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    stream: bool = False
+):
+    """Get all courses for the current user.
+    
+    With ``stream=true`` or ``Accept: application/x-ndjson`` courses are streamed as NDJSON.
+    Otherwise the response carries an ETag and ``If-None-Match`` is answered with 304.
+    """
     db = await get_database()
     
-    courses = await db.courses.find({"user_id": user_id}).to_list(length=None)
-    
-    return [
-        CourseResponse(
-            id=str(course["_id"]),
-            course_name=course["course_name"],
-            course_code=course.get("course_code"),
-            instructor=course.get("instructor"),
-            description=course.get("description"),
-            created_at=course.get("created_at", datetime.utcnow())
-        )
-        for course in courses
-    ]
+    if wants_ndjson(request, stream):
+        return ndjson_response(db.courses.find({"user_id": user_id}, COURSE_PROJECTION), serialize_course)
+    
+    # Answer from the version counters alone when the client's copy is current
+    cached = await versions.not_modified(db, request, response, user_id, "courses")
+    if cached:
+        return cached
+    
+    courses = await db.courses.find({"user_id": user_id}, COURSE_PROJECTION).to_list(length=None)
+    
+    return encoded_response(request, response, [serialize_course(course) for course in courses])
 
 @router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
@@ -70,14 +104,7 @@ async def get_course(
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    return CourseResponse(
-        id=str(course["_id"]),
-        course_name=course["course_name"],
-        course_code=course.get("course_code"),
-        instructor=course.get("instructor"),
-        description=course.get("description"),
-        created_at=course.get("created_at", datetime.utcnow())
-    )
+    return course_response(course)
 
 @router.put("/{course_id}", response_model=CourseResponse)
 async def update_course(
@@ -91,24 +118,19 @@ async def update_course(
     if not ObjectId.is_valid(course_id):
         raise HTTPException(status_code=400, detail="Invalid course ID")
     
-    result = await db.courses.update_one(
+    updated_course = await update_document(
+        db.courses,
         {"_id": ObjectId(course_id), "user_id": user_id},
-        {"$set": course.dict()}
+        course.dict()
     )
     
-    if result.matched_count == 0:
+    if not updated_course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    updated_course = await db.courses.find_one({"_id": ObjectId(course_id)})
+    await versions.bump(db, user_id, "courses")
+    calendar_feed.invalidate(user_id)
     
-    return CourseResponse(
-        id=str(updated_course["_id"]),
-        course_name=updated_course["course_name"],
-        course_code=updated_course.get("course_code"),
-        instructor=updated_course.get("instructor"),
-        description=updated_course.get("description"),
-        created_at=updated_course.get("created_at", datetime.utcnow())
-    )
+    return course_response(updated_course)
 
 @router.delete("/{course_id}")
 async def delete_course(
@@ -129,4 +151,8 @@ async def delete_course(
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Course not found")
     
+    await user_stats.update_courses(db, user_id, removed=[course_id])
+    await versions.bump(db, user_id, "courses")
+    calendar_feed.invalidate(user_id)
+    
     return {"message": "Course deleted successfully"}
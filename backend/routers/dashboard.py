@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from backend.models import (
+    DashboardResponse, AssignmentCounts, ASSIGNMENT_PROJECTION, COURSE_PROJECTION,
+    serialize_assignment, serialize_course, serialize_schedule
+)
+from backend.auth import get_current_user_id
+from backend.database import get_database
+from backend.schedule_window import MAX_TZ_OFFSET_MINUTES, find_in_window, local_now
+from backend import user_stats
+from backend.responses import encoded_response
+from datetime import datetime, time, timedelta
+import asyncio
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+@router.get("", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    pending_limit: int = Query(5, ge=1, le=50),
+    tz_offset: int = Query(0, ge=-MAX_TZ_OFFSET_MINUTES, le=MAX_TZ_OFFSET_MINUTES)
+):
+    """Get everything the dashboard shows in one request.
+    
+    ``tz_offset`` is the client's offset from UTC in minutes. Stored times are
+    the user's wall-clock times, as the frontend's datetime-local inputs send
+    them, so "today" runs from the client's local midnight to the next one
+    and overdue counts compare against the client's local time.
+    """
+    db = await get_database()
+    
+    now = local_now(tz_offset)
+    today_start = datetime.combine(now.date(), time.min)
+    today_end = today_start + timedelta(days=1)
+    week_end = today_start + timedelta(days=7)
+    
+    # Four independent queries, run concurrently; course names are resolved from the course list
+    courses, pending, stats, week = await asyncio.gather(
+        db.courses.find({"user_id": user_id}, COURSE_PROJECTION).to_list(length=None),
+        db.assignments.find({"user_id": user_id, "completed": False}, ASSIGNMENT_PROJECTION)
+            .sort([("due_date", 1), ("_id", 1)]).limit(pending_limit).to_list(length=pending_limit),
+        user_stats.get_stats(db, user_id),
+        find_in_window(db, user_id, today_start, week_end)
+    )
+    
+    course_names = {str(course["_id"]): course["course_name"] for course in courses}
+    week_schedule = [
+        serialize_schedule(schedule, course_names.get(str(schedule.get("course_id"))))
+        for schedule in week
+    ]
+    
+    return encoded_response(request, response, {
+        "courses": [serialize_course(course) for course in courses],
+        "pending_assignments": [
+            serialize_assignment(assignment, course_names.get(str(assignment["course_id"]), "Unknown Course"))
+            for assignment in pending
+        ],
+        "assignment_counts": AssignmentCounts(**user_stats.summarize(stats, now)).dict(),
+        "today_schedule": [schedule for schedule in week_schedule if schedule["start_time"] < today_end],
+        "week_schedule": week_schedule,
+    })
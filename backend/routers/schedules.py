@@ -1,21 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from backend.models import ScheduleCreate, ScheduleResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Dict, List, Optional
+from backend.models import ScheduleCreate, ScheduleResponse, ScheduleConflict, ScheduleWriteResponse, FreeBusyResponse, TimeSlot, ScheduleBatchRequest, BatchResponse, SCHEDULE_PROJECTION, schedule_response, serialize_schedule
 from backend.auth import get_current_user_id, get_current_user
-from backend.database import get_database
+from backend import calendar_feed, versions
+from backend.database import get_database, get_course_names, insert_document, update_document
 from bson import ObjectId
 from backend.email_service import send_schedule_notification
-from datetime import datetime
+from backend.batch import BatchItemError, run_batch
+from backend.pagination import NEXT_CURSOR_HEADER, date_range, decode_position, encode_cursor, fetch_page, paginated_query
+from backend.responses import encoded_response
+from backend.streaming import ndjson_response, wants_ndjson
+from backend.schedule_window import find_in_window, to_utc_naive, validate_window
+from backend.recurrence import expand
+from backend.conflicts import find_conflicts, find_overlaps
+from backend.freebusy import free_busy
+from backend.config import settings
+import logging
+from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/schedules", tags=["Schedules"])
 
-@router.post("/", response_model=ScheduleResponse)
+def _candidates(schedule_dict: dict, event_id: str) -> List[dict]:
+    """The occurrences of a schedule that other events could overlap.
+    
+    A recurring series is expanded over the next SCHEDULE_CONFLICT_HORIZON_DAYS
+    days, or until it ends if that is sooner.
+    """
+    candidate = {
+        **schedule_dict,
+        "_id": event_id,
+        "start_time": to_utc_naive(schedule_dict["start_time"]),
+        "end_time": to_utc_naive(schedule_dict["end_time"]),
+    }
+    start, end = candidate["start_time"], candidate["end_time"]
+    if candidate.get("recurrence"):
+        end = start + timedelta(days=settings.SCHEDULE_CONFLICT_HORIZON_DAYS)
+        until = candidate["recurrence"].get("until")
+        if until is not None:
+            end = min(end, datetime.combine(until.date() + timedelta(days=1), datetime.min.time()))
+    if end <= start:
+        return []
+    return list(expand(candidate, start, end))
+
+def _window(candidates: List[dict]):
+    return min(event["start_time"] for event in candidates), max(event["end_time"] for event in candidates)
+
+def _excluding(events: List[dict], schedule_ids: set) -> List[dict]:
+    """Events other than the given schedules and the occurrences of those series"""
+    return [
+        event for event in events
+        if str(event["_id"]) not in schedule_ids and event.get("series_id") not in schedule_ids
+    ]
+
+def _conflict(event: dict) -> dict:
+    return {
+        "id": None if event.get("batch_new") else str(event["_id"]),
+        "title": event["title"],
+        "start_time": event["start_time"],
+        "end_time": event["end_time"],
+        "batch_index": event.get("batch_index"),
+    }
+
+async def _find_conflicts(db, user_id: str, schedule_dict: dict, schedule_id: Optional[str] = None) -> List[dict]:
+    """The user's other events that the schedule would overlap, ordered by start time.
+    
+    Only the window the new event (or its recurring series) covers is queried,
+    so the check costs one bounded range query plus a sweep over its results.
+    """
+    candidates = _candidates(schedule_dict, schedule_id or "new")
+    if not candidates:
+        return []
+    existing = await find_in_window(db, user_id, *_window(candidates))
+    if schedule_id is not None:
+        existing = _excluding(existing, {schedule_id})
+    return find_conflicts(candidates, existing)
+
+async def _find_batch_conflicts(db, user_id: str, operations: list) -> Dict[int, List[dict]]:
+    """The events each create or update of a batch would overlap, by operation index.
+    
+    One range query covers the window of every item; the items are then swept
+    against the stored events and against each other in a single pass. Stored
+    versions of schedules the batch updates or deletes are left out.
+    """
+    candidates = []
+    for index, operation in enumerate(operations):
+        if operation.op == "delete" or operation.data is None:
+            continue
+        event_id = operation.id if operation.op == "update" and operation.id else f"batch-{index}"
+        for occurrence in _candidates(operation.data.dict(), event_id):
+            occurrence["batch_index"] = index
+            occurrence["batch_new"] = operation.op == "create"
+            candidates.append(occurrence)
+    if not candidates:
+        return {}
+    
+    replaced = {operation.id for operation in operations if operation.op != "create" and operation.id}
+    stored = _excluding(await find_in_window(db, user_id, *_window(candidates)), replaced)
+    events = sorted(stored + candidates, key=lambda event: event["start_time"])
+    
+    conflicts: Dict[int, Dict[str, dict]] = {}
+    for first, second in find_overlaps(events):
+        for event, other in ((first, second), (second, first)):
+            index = event.get("batch_index")
+            if index is not None and other.get("batch_index") != index:
+                conflicts.setdefault(index, {})[str(other["_id"])] = other
+    return {
+        index: sorted(clashes.values(), key=lambda event: event["start_time"])
+        for index, clashes in conflicts.items()
+    }
+
+@router.post("/", response_model=ScheduleWriteResponse)
 async def create_schedule(
     schedule: ScheduleCreate,
     user_id: str = Depends(get_current_user_id),
     current_user: dict = Depends(get_current_user)
 ):
-    """Create a new schedule"""
+    """Create a new schedule.
+    
+    Overlapping events don't prevent saving; they are listed in ``conflicts``
+    so the client can warn about them.
+    """
     db = await get_database()
     
     # Verify course exists if course_id is provided
@@ -35,11 +140,14 @@ async def create_schedule(
         course_name = course["course_name"]
     
     schedule_dict = schedule.dict()
+    conflicts = await _find_conflicts(db, user_id, schedule_dict)
+    
     schedule_dict["user_id"] = user_id
     schedule_dict["created_at"] = datetime.utcnow()
     
-    result = await db.schedules.insert_one(schedule_dict)
-    created_schedule = await db.schedules.find_one({"_id": result.inserted_id})
+    created_schedule = await insert_document(db.schedules, schedule_dict)
+    await versions.bump(db, user_id, "schedules")
+    calendar_feed.invalidate(user_id)
     
     # Send email notification
     try:
@@ -50,50 +158,234 @@ async def create_schedule(
             end_time=created_schedule["end_time"]
         )
     except Exception as e:
-        print(f"Failed to send email notification: {str(e)}")
-    
-    return ScheduleResponse(
-        id=str(created_schedule["_id"]),
-        title=created_schedule["title"],
-        description=created_schedule.get("description"),
-        course_id=str(created_schedule["course_id"]) if created_schedule.get("course_id") else None,
-        course_name=course_name,
-        start_time=created_schedule["start_time"],
-        end_time=created_schedule["end_time"],
-        day_of_week=created_schedule.get("day_of_week"),
-        location=created_schedule.get("location"),
-        created_at=created_schedule.get("created_at", datetime.utcnow())
+        logger.warning(f"Failed to send email notification: {str(e)}")
+    
+    return ScheduleWriteResponse(
+        **serialize_schedule(created_schedule, course_name),
+        conflicts=[_conflict(event) for event in conflicts]
     )
 
-@router.get("/", response_model=List[ScheduleResponse])
-async def get_schedules(user_id: str = Depends(get_current_user_id)):
-    """Get all schedules for the current user"""
+@router.post("/batch", response_model=BatchResponse)
+async def batch_schedules(
+    batch: ScheduleBatchRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Create, update or delete many schedules in one request.
+    
+    Each saved create or update lists the events it overlaps in ``conflicts``,
+    stored events and other items of the batch alike. No notification emails
+    are sent for batched creates.
+    """
     db = await get_database()
     
-    schedules = await db.schedules.find({"user_id": user_id}).sort("start_time", 1).to_list(length=None)
+    # Verify every referenced course belongs to the user with a single query
+    owned_courses = await get_course_names(
+        db, user_id, {operation.data.course_id for operation in batch.operations if operation.data}
+    )
+    
+    def build_update(schedule: ScheduleCreate) -> dict:
+        if schedule.course_id and schedule.course_id not in owned_courses:
+            raise BatchItemError("Course not found")
+        return schedule.dict()
     
-    result = []
-    for schedule in schedules:
-        course_name = None
-        if schedule.get("course_id"):
-            course = await db.courses.find_one({"_id": ObjectId(schedule["course_id"])})
-            course_name = course["course_name"] if course else None
-        
-        result.append(ScheduleResponse(
-            id=str(schedule["_id"]),
-            title=schedule["title"],
-            description=schedule.get("description"),
-            course_id=str(schedule["course_id"]) if schedule.get("course_id") else None,
-            course_name=course_name,
-            start_time=schedule["start_time"],
-            end_time=schedule["end_time"],
-            day_of_week=schedule.get("day_of_week"),
-            location=schedule.get("location"),
-            created_at=schedule.get("created_at", datetime.utcnow())
-        ))
+    def build_create(schedule: ScheduleCreate) -> dict:
+        schedule_dict = build_update(schedule)
+        schedule_dict["user_id"] = user_id
+        schedule_dict["created_at"] = datetime.utcnow()
+        return schedule_dict
+    
+    # Checked against the events as they were before the batch; oversized batches are
+    # rejected by run_batch, so skip the query for them
+    conflicts = {}
+    if len(batch.operations) <= settings.BATCH_MAX_OPERATIONS:
+        conflicts = await _find_batch_conflicts(db, user_id, batch.operations)
+    
+    result = await run_batch(db.schedules, user_id, batch.operations, build_create, build_update)
+    await versions.bump(db, user_id, "schedules")
+    calendar_feed.invalidate(user_id)
+    
+    for item in result.results:
+        if item.success and item.index in conflicts:
+            item.conflicts = [_conflict(event) for event in conflicts[item.index]]
     
     return result
 
+@router.get("/", response_model=List[ScheduleResponse])
+async def get_schedules(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    course_id: Optional[str] = None,
+    start_after: Optional[datetime] = None,
+    start_before: Optional[datetime] = None,
+    stream: bool = False,
+    expand_series: bool = Query(False, alias="expand")
+):
+    """Get a page of schedules for the current user, ordered by start time.
+    
+    The cursor for the next page, if any, is returned in the X-Next-Cursor header.
+    With ``stream=true`` or ``Accept: application/x-ndjson`` every matching
+    schedule after the cursor is streamed as NDJSON instead, ignoring ``limit``.
+    With ``expand=true`` recurring series are expanded into their occurrences
+    between start_after and start_before (both required), paged the same way.
+    Responses other than NDJSON streams carry an ETag and ``If-None-Match`` is
+    answered with 304.
+    """
+    db = await get_database()
+    
+    if expand_series or not wants_ndjson(request, stream):
+        # Answer from the version counters alone when the client's copy is current
+        cached = await versions.not_modified(db, request, response, user_id, "schedules", "courses")
+        if cached:
+            return cached
+    
+    if expand_series:
+        if start_after is None or start_before is None:
+            raise HTTPException(status_code=400, detail="expand requires start_after and start_before")
+        start, end = validate_window(start_after, start_before)
+        # Occurrences are paged in (start_time, id) order; ids of expanded occurrences are strings
+        position = decode_position(cursor) if cursor else None
+        window_start = max(start, position[0]) if position else start
+        occurrences = sorted(
+            (
+                occurrence for occurrence in await find_in_window(db, user_id, window_start, end)
+                if occurrence["start_time"] >= start
+                and (course_id is None or occurrence.get("course_id") == course_id)
+            ),
+            key=lambda occurrence: (occurrence["start_time"], str(occurrence["_id"]))
+        )
+        if position:
+            occurrences = [
+                occurrence for occurrence in occurrences
+                if (occurrence["start_time"], str(occurrence["_id"])) > position
+            ]
+        if len(occurrences) > limit:
+            occurrences = occurrences[:limit]
+            last = occurrences[-1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["start_time"], last["_id"])
+        course_names = await get_course_names(db, user_id, {s.get("course_id") for s in occurrences})
+        return encoded_response(request, response, [
+            serialize_schedule(occurrence, course_names.get(str(occurrence.get("course_id"))))
+            for occurrence in occurrences
+        ])
+    
+    query = {"user_id": user_id, **date_range("start_time", start_after, start_before)}
+    if course_id is not None:
+        if not ObjectId.is_valid(course_id):
+            raise HTTPException(status_code=400, detail="Invalid course ID")
+        query["course_id"] = course_id
+    
+    if wants_ndjson(request, stream):
+        course_names = await get_course_names(db, user_id)
+        return ndjson_response(
+            db.schedules.find(
+                paginated_query(query, "start_time", cursor), SCHEDULE_PROJECTION
+            ).sort([("start_time", 1), ("_id", 1)]),
+            lambda schedule: serialize_schedule(schedule, course_names.get(str(schedule.get("course_id"))))
+        )
+    
+    schedules, next_cursor = await fetch_page(
+        db.schedules, query, "start_time", cursor, limit, SCHEDULE_PROJECTION
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    # Resolve every course name with one query instead of one per schedule
+    course_names = await get_course_names(db, user_id, {s.get("course_id") for s in schedules})
+    
+    return encoded_response(request, response, [
+        serialize_schedule(schedule, course_names.get(str(schedule.get("course_id"))))
+        for schedule in schedules
+    ])
+
+@router.get("/range", response_model=List[ScheduleResponse])
+async def get_schedules_in_range(
+    request: Request,
+    response: Response,
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get the schedules overlapping the [from, to) window, e.g. one calendar week or month.
+    
+    Recurring series are returned as their individual occurrences within the window.
+    The response carries an ETag and ``If-None-Match`` is answered with 304.
+    """
+    db = await get_database()
+    
+    start, end = validate_window(start, end)
+    
+    # Answer from the version counters alone when the client's copy is current
+    cached = await versions.not_modified(db, request, response, user_id, "schedules", "courses")
+    if cached:
+        return cached
+    
+    schedules = await find_in_window(db, user_id, start, end)
+    
+    course_names = await get_course_names(db, user_id, {s.get("course_id") for s in schedules})
+    
+    return encoded_response(request, response, [
+        serialize_schedule(schedule, course_names.get(str(schedule.get("course_id"))))
+        for schedule in schedules
+    ])
+
+@router.get("/conflicts", response_model=List[ScheduleConflict])
+async def get_schedule_conflicts(
+    request: Request,
+    response: Response,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get every pair of overlapping events in the window, recurring occurrences included.
+    
+    Defaults to the next SCHEDULE_CONFLICT_HORIZON_DAYS days.
+    """
+    db = await get_database()
+    
+    start = start or datetime.utcnow()
+    end = end or to_utc_naive(start) + timedelta(days=settings.SCHEDULE_CONFLICT_HORIZON_DAYS)
+    start, end = validate_window(start, end)
+    
+    occurrences = await find_in_window(db, user_id, start, end)
+    pairs = list(find_overlaps(occurrences))
+    
+    course_names = await get_course_names(db, user_id, {s.get("course_id") for s in occurrences})
+    
+    return encoded_response(request, response, [
+        {
+            "first": serialize_schedule(first, course_names.get(str(first.get("course_id")))),
+            "second": serialize_schedule(second, course_names.get(str(second.get("course_id"))))
+        }
+        for first, second in pairs
+    ])
+
+@router.get("/free", response_model=FreeBusyResponse)
+async def get_free_busy(
+    start: datetime = Query(..., alias="from"),
+    end: datetime = Query(..., alias="to"),
+    min_minutes: int = Query(30, ge=1),
+    resolution: int = Query(5, ge=1, le=60),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get busy intervals and free slots of at least ``min_minutes`` in the window.
+    
+    Recurring events are expanded first; times are rounded outward to
+    ``resolution``-minute slots.
+    """
+    db = await get_database()
+    
+    start, end = validate_window(start, end)
+    occurrences = await find_in_window(db, user_id, start, end)
+    busy, free = free_busy(occurrences, start, end, resolution, min_minutes)
+    
+    return FreeBusyResponse(
+        busy=[TimeSlot(start=slot_start, end=slot_end) for slot_start, slot_end in busy],
+        free=[TimeSlot(start=slot_start, end=slot_end) for slot_start, slot_end in free]
+    )
+
 @router.get("/{schedule_id}", response_model=ScheduleResponse)
 async def get_schedule(
     schedule_id: str,
@@ -113,31 +405,21 @@ async def get_schedule(
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
-    course_name = None
-    if schedule.get("course_id"):
-        course = await db.courses.find_one({"_id": ObjectId(schedule["course_id"])})
-        course_name = course["course_name"] if course else None
-    
-    return ScheduleResponse(
-        id=str(schedule["_id"]),
-        title=schedule["title"],
-        description=schedule.get("description"),
-        course_id=str(schedule["course_id"]) if schedule.get("course_id") else None,
-        course_name=course_name,
-        start_time=schedule["start_time"],
-        end_time=schedule["end_time"],
-        day_of_week=schedule.get("day_of_week"),
-        location=schedule.get("location"),
-        created_at=schedule.get("created_at", datetime.utcnow())
-    )
+    course_names = await get_course_names(db, user_id, [schedule.get("course_id")])
+    
+    return schedule_response(schedule, course_names.get(str(schedule.get("course_id"))))
 
-@router.put("/{schedule_id}", response_model=ScheduleResponse)
+@router.put("/{schedule_id}", response_model=ScheduleWriteResponse)
 async def update_schedule(
     schedule_id: str,
     schedule: ScheduleCreate,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Update a schedule"""
+    """Update a schedule.
+    
+    Overlapping events don't prevent saving; they are listed in ``conflicts``
+    so the client can warn about them.
+    """
     db = await get_database()
     
     if not ObjectId.is_valid(schedule_id):
@@ -159,27 +441,24 @@ async def update_schedule(
         
         course_name = course["course_name"]
     
-    result = await db.schedules.update_one(
+    schedule_dict = schedule.dict()
+    conflicts = await _find_conflicts(db, user_id, schedule_dict, schedule_id)
+    
+    updated_schedule = await update_document(
+        db.schedules,
         {"_id": ObjectId(schedule_id), "user_id": user_id},
-        {"$set": schedule.dict()}
+        schedule_dict
     )
     
-    if result.matched_count == 0:
+    if not updated_schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
-    updated_schedule = await db.schedules.find_one({"_id": ObjectId(schedule_id)})
-    
-    return ScheduleResponse(
-        id=str(updated_schedule["_id"]),
-        title=updated_schedule["title"],
-        description=updated_schedule.get("description"),
-        course_id=str(updated_schedule["course_id"]) if updated_schedule.get("course_id") else None,
-        course_name=course_name,
-        start_time=updated_schedule["start_time"],
-        end_time=updated_schedule["end_time"],
-        day_of_week=updated_schedule.get("day_of_week"),
-        location=updated_schedule.get("location"),
-        created_at=updated_schedule.get("created_at", datetime.utcnow())
+    await versions.bump(db, user_id, "schedules")
+    calendar_feed.invalidate(user_id)
+    
+    return ScheduleWriteResponse(
+        **serialize_schedule(updated_schedule, course_name),
+        conflicts=[_conflict(event) for event in conflicts]
     )
 
 @router.delete("/{schedule_id}")
@@ -201,4 +480,7 @@ async def delete_schedule(
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Schedule not found")
     
+    await versions.bump(db, user_id, "schedules")
+    calendar_feed.invalidate(user_id)
+    
     return {"message": "Schedule deleted successfully"}
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import HTTPException
+
+from backend.config import settings
+from backend.recurrence import expand_all
+
+# Clients send their offset from UTC in minutes as the ``tz_offset`` query parameter
+MAX_TZ_OFFSET_MINUTES = 14 * 60
+
+def local_now(tz_offset: int) -> datetime:
+    """The client's current wall-clock time, the form stored schedule and due times take"""
+    return datetime.utcnow() + timedelta(minutes=tz_offset)
+
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, the form MongoDB hands back"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def validate_window(start: datetime, end: datetime):
+    """Normalize and bound a requested [start, end) window"""
+    start, end = to_utc_naive(start), to_utc_naive(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=settings.SCHEDULE_MAX_RANGE_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range may span at most {settings.SCHEDULE_MAX_RANGE_DAYS} days"
+        )
+    return start, end
+
+def window_query(user_id: str, start: datetime, end: datetime) -> dict:
+    """Filter for schedules overlapping [start, end).
+
+    One-off events: the start_time bound is what the (user_id, start_time)
+    index can seek on; looking back SCHEDULE_MAX_EVENT_HOURS keeps that scan
+    bounded while still catching events that began before the window and run
+    into it. Recurring series: every series that started before the window
+    ends and hasn't ended before it begins, served by a partial index.
+    """
+    lookback = start - timedelta(hours=settings.SCHEDULE_MAX_EVENT_HOURS)
+    return {
+        "$or": [
+            {
+                "user_id": user_id,
+                "recurrence": None,
+                "start_time": {"$gte": lookback, "$lt": end},
+                "end_time": {"$gt": start},
+            },
+            {
+                "user_id": user_id,
+                "recurrence": {"$type": "object"},
+                "start_time": {"$lt": end},
+                "$or": [
+                    {"recurrence.until": None},
+                    # until is inclusive by date, so allow for a full day plus the event length
+                    {"recurrence.until": {"$gte": lookback - timedelta(days=1)}},
+                ],
+            },
+        ]
+    }
+
+async def find_in_window(database, user_id: str, start: datetime, end: datetime) -> List[dict]:
+    """Fetch the user's schedules overlapping [start, end), ordered by start time.
+
+    Recurring series are expanded into their occurrences within the window.
+    """
+    schedules = await database.schedules.find(window_query(user_id, start, end)).to_list(length=None)
+    schedules.sort(key=lambda schedule: (schedule["start_time"], str(schedule["_id"])))
+    return list(expand_all(schedules, start, end))
@@ -1,9 +1,18 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
+from bson import ObjectId
 from backend.database import get_database
 from backend.email_service import send_assignment_reminder
+from backend.user_stats import reconcile_all
+from backend.leader import LeaderElection
+from backend import metrics
+from backend.config import settings
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
@@ -24,45 +33,60 @@ async def check_assignment_reminders():
                 "$lte": two_days_plus_one_hour
             },
             "completed": False,
-            "reminder_sent": {"$ne": True}
+            # Matches the partial "pending_reminders" index in backend/indexes.py
+            "reminder_sent": False
         }).to_list(length=None)
         
-        print(f"Found {len(assignments)} assignments needing reminders")
+        logger.info(f"Found {len(assignments)} assignments needing reminders")
         
         for assignment in assignments:
-            # Get user email
-            user = await db.users.find_one({"_id": assignment["user_id"]})
+            # Get user email; assignments store the user and course ids as strings
+            user = await db.users.find_one({"_id": ObjectId(assignment["user_id"])})
             if not user:
                 continue
             
             # Get course name
-            course = await db.courses.find_one({"_id": assignment["course_id"]})
+            course = await db.courses.find_one({"_id": ObjectId(assignment["course_id"])})
             course_name = course["course_name"] if course else "Unknown Course"
             
+            # Claim the reminder before sending it, so a run overlapping on another
+            # worker (e.g. around a leader handover) can't send it a second time
+            claim = await db.assignments.update_one(
+                {"_id": assignment["_id"], "reminder_sent": False},
+                {"$set": {"reminder_sent": True}}
+            )
+            if claim.modified_count == 0:
+                continue
+            
             # Send reminder email
-            await send_assignment_reminder(
+            sent = await send_assignment_reminder(
                 user_email=user["email"],
                 assignment_title=assignment["title"],
                 course_name=course_name,
                 due_date=assignment["due_date"]
             )
             
-            # Mark reminder as sent
-            await db.assignments.update_one(
-                {"_id": assignment["_id"]},
-                {"$set": {"reminder_sent": True}}
-            )
+            if not sent:
+                # Release the claim so the next run retries
+                await db.assignments.update_one(
+                    {"_id": assignment["_id"]},
+                    {"$set": {"reminder_sent": False}}
+                )
+                continue
             
-            print(f"Sent reminder for assignment: {assignment['title']} to {user['email']}")
+            logger.info(f"Sent reminder for assignment: {assignment['title']} to {user['email']}")
             
     except Exception as e:
-        print(f"Error in check_assignment_reminders: {str(e)}")
+        logger.exception(f"Error in check_assignment_reminders: {str(e)}")
 
 def start_scheduler():
     """Start the scheduler with jobs at 10 AM and 3 PM"""
+    if scheduler.running:
+        return
+    
     # Schedule for 10:00 AM
     scheduler.add_job(
-        check_assignment_reminders,
+        metrics.timed_job("reminder_10am", check_assignment_reminders),
         CronTrigger(hour=10, minute=0),
         id="reminder_10am",
         name="Check assignment reminders at 10 AM",
@@ -71,17 +95,36 @@ def start_scheduler():
     
     # Schedule for 3:00 PM (15:00)
     scheduler.add_job(
-        check_assignment_reminders,
+        metrics.timed_job("reminder_3pm", check_assignment_reminders),
         CronTrigger(hour=15, minute=0),
         id="reminder_3pm",
         name="Check assignment reminders at 3 PM",
         replace_existing=True
     )
     
+    # Repair any drift in the incrementally maintained user_stats documents
+    scheduler.add_job(
+        metrics.timed_job("reconcile_user_stats", reconcile_all),
+        IntervalTrigger(minutes=settings.USER_STATS_RECONCILE_MINUTES),
+        id="reconcile_user_stats",
+        name="Reconcile user statistics",
+        replace_existing=True
+    )
+    
     scheduler.start()
-    print("Scheduler started - Reminders will be sent at 10 AM and 3 PM")
+    logger.info("Scheduler started - Reminders will be sent at 10 AM and 3 PM")
 
 def stop_scheduler():
     """Stop the scheduler"""
-    scheduler.shutdown()
-    print("Scheduler stopped")
+    if not scheduler.running:
+        return
+    scheduler.shutdown(wait=False)
+    logger.info("Scheduler stopped")
+
+# Only the worker holding the "scheduler" lease runs the jobs; see backend/leader.py
+scheduler_election = LeaderElection("scheduler", on_elected=start_scheduler, on_demoted=stop_scheduler)
+
+metrics.Collector(
+    "scheduler_leader", "gauge", "1 while this worker holds the scheduler lease and runs scheduled jobs",
+    lambda: [("", {}, float(scheduler_election.is_leader))]
+)
@@ -0,0 +1,135 @@
+"""Production server launcher, used by start.sh outside development:
+
+    python -m backend.serve
+
+Settings come from the "Production server" section of backend/config.py.
+With the optional ``gunicorn`` package, a gunicorn arbiter runs uvicorn
+workers: the app is imported once before forking (SERVER_PRELOAD), so
+workers start fast and share the parent's memory pages, and a worker that
+dies is replaced. Without it, uvicorn's own process manager runs the
+workers, each importing the app itself. Either way uvloop and httptools
+replace the asyncio event loop and the h11 parser when they are installed.
+"""
+import importlib.util
+import logging
+import math
+import os
+
+from backend.config import settings
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # optional; uvicorn manages the workers when gunicorn isn't installed
+    BaseApplication = None
+
+logger = logging.getLogger(__name__)
+
+APP = "backend.main:app"
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def event_loop() -> str:
+    return "uvloop" if _installed("uvloop") else "asyncio"
+
+def http_parser() -> str:
+    return "httptools" if _installed("httptools") else "h11"
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS and Windows
+        cpus = os.cpu_count() or 1
+    try:
+        # "<quota> <period>" in microseconds, or "max <period>" without a limit
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+def worker_count() -> int:
+    # The app is async and I/O bound, so one worker per CPU keeps every core busy
+    return settings.SERVER_WORKERS if settings.SERVER_WORKERS > 0 else available_cpus()
+
+def _check_backlog():
+    try:
+        with open("/proc/sys/net/core/somaxconn") as somaxconn:
+            limit = int(somaxconn.read())
+    except (OSError, ValueError):
+        return
+    if settings.SERVER_BACKLOG > limit:
+        logger.warning(f"SERVER_BACKLOG={settings.SERVER_BACKLOG} is capped at net.core.somaxconn={limit}")
+
+def _limit_concurrency():
+    return settings.SERVER_LIMIT_CONCURRENCY or None
+
+if BaseApplication is not None:
+    class Worker(UvicornWorker):
+        # gunicorn passes keep-alive and backlog from its own settings
+        CONFIG_KWARGS = {
+            "loop": event_loop(),
+            "http": http_parser(),
+            "limit_concurrency": _limit_concurrency(),
+        }
+
+    class Application(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for name, value in self.options.items():
+                self.cfg.set(name, value)
+
+        def load(self):
+            from backend.main import app
+            return app
+
+def run_gunicorn(workers: int):
+    Application({
+        "bind": f"{settings.SERVER_HOST}:{settings.SERVER_PORT}",
+        "workers": workers,
+        "worker_class": Worker,
+        "preload_app": settings.SERVER_PRELOAD,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "backlog": settings.SERVER_BACKLOG,
+        # Requests are logged by RequestLoggingMiddleware
+        "accesslog": None,
+    }).run()
+
+def run_uvicorn(workers: int):
+    import uvicorn
+
+    uvicorn.run(
+        APP,
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        loop=event_loop(),
+        http=http_parser(),
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        backlog=settings.SERVER_BACKLOG,
+        limit_concurrency=_limit_concurrency(),
+    )
+
+def main():
+    logging.basicConfig(level=settings.LOG_LEVEL.upper())
+    _check_backlog()
+    workers = worker_count()
+    manager = "gunicorn" if BaseApplication is not None else "uvicorn"
+    logger.info(
+        f"Serving {APP} on {settings.SERVER_HOST}:{settings.SERVER_PORT} with {workers} {manager} worker(s), "
+        f"loop={event_loop()}, http={http_parser()}, preload={settings.SERVER_PRELOAD and manager == 'gunicorn'}"
+    )
+    if BaseApplication is not None:
+        run_gunicorn(workers)
+    else:
+        run_uvicorn(workers)
+
+if __name__ == "__main__":
+    main()
@@ -17,36 +17,39 @@ echo "- DATABASE_NAME: $DATABASE_NAME"
 echo "- ENVIRONMENT: ${ENVIRONMENT:-development}"
 echo "- PYTHONPATH: $PYTHONPATH"
 
-# Install/update dependencies
-echo "📦 Installing/updating dependencies..."
-python -m pip install --upgrade pip
-
-# Install requirements with retry logic
-MAX_RETRIES=3
-RETRY_DELAY=5
-
-for i in $(seq 1 $MAX_RETRIES); do
-    echo "Attempt $i of $MAX_RETRIES: Installing requirements..."
-    if pip install -r requirements.txt; then
-        echo "✅ Dependencies installed successfully"
-        break
-    else
-        if [ $i -eq $MAX_RETRIES ]; then
-            echo "❌ Failed to install dependencies after $MAX_RETRIES attempts"
-            exit 1
+# Dependencies are installed by the build step (pip install -r requirements.txt).
+# Installing them on every boot made cold starts take tens of seconds, so it
+# only happens here when INSTALL_DEPS=true, e.g. on a bare development machine.
+if [ "$INSTALL_DEPS" = "true" ]; then
+    echo "📦 Installing/updating dependencies..."
+    python -m pip install --upgrade pip
+    
+    # Install requirements with retry logic
+    MAX_RETRIES=3
+    RETRY_DELAY=5
+    
+    for i in $(seq 1 $MAX_RETRIES); do
+        echo "Attempt $i of $MAX_RETRIES: Installing requirements..."
+        if pip install -r requirements.txt; then
+            echo "✅ Dependencies installed successfully"
+            break
+        else
+            if [ $i -eq $MAX_RETRIES ]; then
+                echo "❌ Failed to install dependencies after $MAX_RETRIES attempts"
+                exit 1
+            fi
+            echo "⚠️ Installation failed, retrying in $RETRY_DELAY seconds..."
+            sleep $RETRY_DELAY
         fi
-        echo "⚠️ Installation failed, retrying in $RETRY_DELAY seconds..."
-        sleep $RETRY_DELAY
-    fi
-done
+    done
+fi
 
-# Verify critical packages
+# Verify critical packages (find_spec only locates them, without importing anything)
 echo "🔍 Verifying critical packages..."
 python -c "
-import pkg_resources
-required = {'fastapi', 'uvicorn', 'pydantic', 'motor'}
-installed = {pkg.key for pkg in pkg_resources.working_set}
-missing = required - installed
+import importlib.util
+required = ['fastapi', 'uvicorn', 'pydantic', 'motor']
+missing = [name for name in required if importlib.util.find_spec(name) is None]
 if missing:
     print(f'❌ Missing packages: {missing}')
     exit(1)
@@ -59,6 +62,8 @@ if [ "$ENVIRONMENT" = "development" ]; then
     echo "⚡ Running in development mode with auto-reload"
     exec uvicorn backend.main:app --host 0.0.0.0 --port $PORT --reload
 else
+    # Workers, keep-alive, backlog etc. come from the SERVER_* settings in backend/config.py.
+    # Scheduled jobs run in one worker only, elected through MongoDB (backend/leader.py)
     echo "🚀 Running in production mode"
-    exec uvicorn backend.main:app --host 0.0.0.0 --port $PORT
+    exec python -m backend.serve
 fi
@@ -0,0 +1,36 @@
+from typing import AsyncIterator, Callable
+
+import orjson
+from bson import ObjectId
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from backend.config import settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request, stream: bool = False) -> bool:
+    """Whether the client asked for a streamed NDJSON response"""
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _encode_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def ndjson_lines(cursor, serialize: Callable[[dict], object]) -> AsyncIterator[bytes]:
+    """Encode documents from a Motor cursor one line at a time as they arrive"""
+    async for document in cursor:
+        item = serialize(document)
+        if hasattr(item, "dict"):
+            item = item.dict()
+        yield orjson.dumps(item, default=_encode_default, option=orjson.OPT_APPEND_NEWLINE)
+
+def ndjson_response(cursor, serialize: Callable[[dict], object]) -> StreamingResponse:
+    """Stream a Motor cursor as NDJSON.
+
+    Documents are pulled from the server ``STREAM_BATCH_SIZE`` at a time, so
+    memory per request stays constant no matter how many rows are returned.
+    """
+    cursor.batch_size(settings.STREAM_BATCH_SIZE)
+    return StreamingResponse(ndjson_lines(cursor, serialize), media_type=NDJSON_MEDIA_TYPE)
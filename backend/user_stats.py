@@ -0,0 +1,165 @@
+"""Incrementally maintained per-user assignment statistics.
+
+Every user has one document in ``user_stats`` (``_id`` is the user id) holding
+assignment counters::
+
+    {
+        "total": 12, "pending": 5, "completed": 7,
+        "courses": {"<course id>": {"total": 4, "pending": 1, "completed": 3}, ...},
+        "pending_due": {"2024-05-02T14": 2, ...},  # pending assignments per due hour (UTC)
+    }
+
+Write handlers pass the documents they removed and added to ``apply``, which
+turns them into a single ``$inc``, so reading the stats is one ``find_one``
+no matter how many assignments a user has. Overdue and due-this-week counts
+are summed from the hourly ``pending_due`` buckets. ``reconcile_all`` runs
+periodically and rebuilds every document from the assignments to repair
+drift from failed or concurrent writes.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from backend.database import get_database
+
+logger = logging.getLogger(__name__)
+
+BUCKET_FORMAT = "%Y-%m-%dT%H"
+
+def _contribution(assignment: dict) -> Counter:
+    """Counter increments one assignment adds to its owner's stats document"""
+    state = "completed" if assignment.get("completed") else "pending"
+    course = f"courses.{assignment['course_id']}"
+    counts = Counter({
+        "total": 1,
+        state: 1,
+        f"{course}.total": 1,
+        f"{course}.{state}": 1,
+    })
+    if state == "pending" and assignment.get("due_date") is not None:
+        counts[f"pending_due.{assignment['due_date'].strftime(BUCKET_FORMAT)}"] += 1
+    return counts
+
+def _delta(removed: Iterable[Optional[dict]], added: Iterable[Optional[dict]]) -> dict:
+    delta = Counter()
+    for assignment in added:
+        if assignment:
+            delta.update(_contribution(assignment))
+    for assignment in removed:
+        if assignment:
+            delta.subtract(_contribution(assignment))
+    return {field: value for field, value in delta.items() if value}
+
+async def apply(
+    database,
+    user_id: str,
+    removed: Iterable[Optional[dict]] = (),
+    added: Iterable[Optional[dict]] = ()
+):
+    """Update a user's stats for assignments that were removed and/or added.
+
+    An update is a removal of the old version plus an addition of the new one;
+    fields that cancel out are not written. A user without a stats document is
+    left without one: ``get_stats`` builds it from all their assignments on the
+    next read, whereas upserting here would start it from this delta alone.
+    """
+    delta = _delta(removed, added)
+    if not delta:
+        return
+    await database.user_stats.update_one({"_id": user_id}, {"$inc": delta})
+
+async def update_courses(
+    database,
+    user_id: str,
+    added: Iterable[str] = (),
+    removed: Iterable[str] = ()
+):
+    """Start counters at zero for new courses and drop those of deleted ones.
+
+    Assignments of a deleted course still count towards the user's totals.
+    Like ``apply``, this never creates the stats document.
+    """
+    update = {}
+    for course_id in added:
+        update.setdefault("$inc", {}).update({
+            f"courses.{course_id}.{state}": 0 for state in ("total", "pending", "completed")
+        })
+    for course_id in removed:
+        update.setdefault("$unset", {})[f"courses.{course_id}"] = ""
+    if update:
+        await database.user_stats.update_one({"_id": user_id}, update)
+
+async def rebuild(database, user_id: str) -> dict:
+    """Recompute a user's stats document from their assignments and store it"""
+    course_ids = [
+        str(course["_id"])
+        for course in await database.courses.find({"user_id": user_id}, {"_id": 1}).to_list(length=None)
+    ]
+    totals = Counter()
+    assignments = database.assignments.find(
+        {"user_id": user_id},
+        {"course_id": 1, "completed": 1, "due_date": 1}
+    )
+    async for assignment in assignments:
+        totals.update(_contribution(assignment))
+
+    stats = {
+        "total": totals["total"],
+        "pending": totals["pending"],
+        "completed": totals["completed"],
+        "courses": {
+            course_id: {
+                state: totals[f"courses.{course_id}.{state}"]
+                for state in ("total", "pending", "completed")
+            }
+            for course_id in course_ids
+        },
+        "pending_due": {
+            field.split(".", 1)[1]: count
+            for field, count in totals.items()
+            if field.startswith("pending_due.") and count
+        },
+        "reconciled_at": datetime.utcnow(),
+    }
+    await database.user_stats.replace_one({"_id": user_id}, stats, upsert=True)
+    return stats
+
+async def get_stats(database, user_id: str) -> dict:
+    """Read a user's stats, building the document on first use"""
+    stats = await database.user_stats.find_one({"_id": user_id})
+    if stats is None:
+        stats = await rebuild(database, user_id)
+    return stats
+
+def pending_between(stats: dict, start: Optional[datetime], end: Optional[datetime]) -> int:
+    """Number of pending assignments due in [start, end), at hour granularity"""
+    low = start.strftime(BUCKET_FORMAT) if start else ""
+    high = end.strftime(BUCKET_FORMAT) if end else None
+    return sum(
+        count for bucket, count in (stats.get("pending_due") or {}).items()
+        if bucket >= low and (high is None or bucket < high)
+    )
+
+def summarize(stats: dict, now: datetime) -> dict:
+    """Flat counters derived from a stats document"""
+    return {
+        "total": stats.get("total", 0),
+        "pending": stats.get("pending", 0),
+        "completed": stats.get("completed", 0),
+        "overdue": pending_between(stats, None, now),
+        "due_this_week": pending_between(stats, now, now + timedelta(days=7)),
+    }
+
+async def reconcile_all():
+    """Rebuild the stats of every user; scheduled every USER_STATS_RECONCILE_MINUTES"""
+    try:
+        db = await get_database()
+        users = db.users.find({}, {"_id": 1})
+        rebuilt = 0
+        async for user in users:
+            await rebuild(db, str(user["_id"]))
+            rebuilt += 1
+        logger.info(f"Reconciled stats for {rebuilt} users")
+    except Exception as e:
+        logger.error(f"Error reconciling user stats: {str(e)}")
@@ -0,0 +1,107 @@
+"""Per-user collection version counters for conditional GETs.
+
+Each user has one ``collection_versions`` document (``_id`` is the user id)
+with a counter per collection that write handlers bump with ``bump`` after
+every successful write. List endpoints derive their ETag from the counters of
+the collections their response depends on, so ``If-None-Match`` can be
+answered with 304 after a single ``_id`` lookup, before the list query runs.
+
+Counters can also be cached in process for VERSION_CACHE_SECONDS. Writes made
+by another worker only show up once the entry expires, so leave it at 0 (no
+cache) when running more than one worker.
+"""
+import os
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+
+from backend.config import settings
+
+class VersionCache:
+    """LRU of version documents by user id"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[dict]:
+        if self.ttl_seconds <= 0:
+            return None
+        entry = self._entries.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > self.ttl_seconds:
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[0]
+
+    def put(self, user_id: str, versions: dict):
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[user_id] = (versions, time.monotonic())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+version_cache = VersionCache(settings.VERSION_CACHE_SIZE, settings.VERSION_CACHE_SECONDS)
+
+async def bump(database, user_id: str, *collections: str):
+    """Advance the user's version of each collection after a write"""
+    versions = await database.collection_versions.find_one_and_update(
+        {"_id": user_id},
+        {
+            "$inc": {collection: 1 for collection in collections},
+            "$currentDate": {"modified_at": True},
+            # A fresh epoch whenever the document is (re)created keeps old ETags from matching
+            "$setOnInsert": {"epoch": os.urandom(4).hex()},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    version_cache.put(user_id, versions)
+
+async def get_versions(database, user_id: str) -> dict:
+    versions = version_cache.get(user_id)
+    if versions is None:
+        versions = await database.collection_versions.find_one({"_id": user_id}) or {}
+        version_cache.put(user_id, versions)
+    return versions
+
+def _etag(request: Request, user_id: str, versions: Dict[str, int], collections: Tuple[str, ...]) -> str:
+    # Different filters, pages and formats of the same list are different representations
+    variant = zlib.crc32(f"{user_id}|{request.url.query}|{request.headers.get('accept', '')}".encode())
+    counters = ".".join(str(versions.get(collection, 0)) for collection in collections)
+    return f'W/"{versions.get("epoch", "0")}.{counters}.{variant:08x}"'
+
+def matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches a weak ETag, compared weakly as RFC 9110 requires"""
+    tag = etag[2:]
+    return any(
+        candidate.strip() in ("*", etag, tag)
+        for candidate in if_none_match.split(",")
+    )
+
+async def not_modified(
+    database,
+    request: Request,
+    response: Response,
+    user_id: str,
+    *collections: str
+) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current, else set the ETag on ``response``.
+
+    ``collections`` are every collection the response is built from, e.g.
+    assignments and courses for an assignment list with course names.
+    """
+    etag = _etag(request, user_id, await get_versions(database, user_id), collections)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { assignmentsAPI, coursesAPI, schedulesAPI } from '../services/api';
+import { dashboardAPI } from '../services/api';
 import toast from 'react-hot-toast';
 import {
   BookOpen,
@@ -31,28 +31,19 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [coursesRes, assignmentsRes, schedulesRes] = await Promise.all([
-        coursesAPI.getAll(),
-        assignmentsAPI.getAll(),
-        schedulesAPI.getAll(),
-      ]);
+      const { data } = await dashboardAPI.get(5);
 
-      const courses = coursesRes.data;
-      const assignments = assignmentsRes.data;
-      const schedules = schedulesRes.data;
-
-      const pendingAssignments = assignments.filter((a) => !a.completed);
       const now = new Date();
-      const upcoming = schedules.filter((s) => new Date(s.start_time) > now);
+      const upcoming = data.week_schedule.filter((s) => new Date(s.start_time) > now);
 
       setStats({
-        totalCourses: courses.length,
-        totalAssignments: assignments.length,
-        pendingAssignments: pendingAssignments.length,
+        totalCourses: data.courses.length,
+        totalAssignments: data.assignment_counts.total,
+        pendingAssignments: data.assignment_counts.pending,
         upcomingSchedules: upcoming.length,
       });
 
-      setRecentAssignments(pendingAssignments.slice(0, 5));
+      setRecentAssignments(data.pending_assignments);
       setUpcomingSchedules(upcoming.slice(0, 5));
       setLoading(false);
     } catch (error) {
@@ -47,13 +47,20 @@ const Schedule = () => {
         course_id: formData.course_id || null,
       };
 
+      let response;
       if (editingSchedule) {
-        await schedulesAPI.update(editingSchedule.id, submitData);
+        response = await schedulesAPI.update(editingSchedule.id, submitData);
         toast.success('Schedule updated successfully');
       } else {
-        await schedulesAPI.create(submitData);
+        response = await schedulesAPI.create(submitData);
         toast.success('Schedule created successfully! Email notification sent.');
       }
+      // Overlaps are saved anyway; let the user know what they clash with
+      const conflicts = response.data.conflicts || [];
+      if (conflicts.length > 0) {
+        const titles = conflicts.map((event) => event.title).join(', ');
+        toast(`Overlaps with: ${titles}`, { icon: '⚠️' });
+      }
       fetchData();
       closeModal();
     } catch (error) {
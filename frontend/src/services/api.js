@@ -24,6 +24,18 @@ api.interceptors.request.use(
   }
 );
 
+// Follow the X-Next-Cursor header of a paginated list endpoint until the last page
+const getAllPages = async (url, params = {}) => {
+  const items = [];
+  let cursor;
+  do {
+    const response = await api.get(url, { params: { ...params, cursor } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data: items };
+};
+
 // Auth API
 export const authAPI = {
   register: (data) => api.post('/api/auth/register', data),
@@ -45,30 +57,47 @@ export const coursesAPI = {
   create: (data) => api.post('/api/courses/', data),
   update: (id, data) => api.put(`/api/courses/${id}`, data),
   delete: (id) => api.delete(`/api/courses/${id}`),
+  batch: (operations) => api.post('/api/courses/batch', { operations }),
 };
 
 // Assignments API
 export const assignmentsAPI = {
-  getAll: () => api.get('/api/assignments/'),
+  getAll: (params) => getAllPages('/api/assignments/', params),
+  getPage: (params) => api.get('/api/assignments/', { params }),
   getById: (id) => api.get(`/api/assignments/${id}`),
   create: (data) => api.post('/api/assignments/', data),
   update: (id, data) => api.put(`/api/assignments/${id}`, data),
   toggleComplete: (id) => api.patch(`/api/assignments/${id}/complete`),
   delete: (id) => api.delete(`/api/assignments/${id}`),
+  batch: (operations) => api.post('/api/assignments/batch', { operations }),
 };
 
 // Schedules API
 export const schedulesAPI = {
-  getAll: () => api.get('/api/schedules/'),
+  getAll: (params) => getAllPages('/api/schedules/', params),
+  getPage: (params) => api.get('/api/schedules/', { params }),
+  getRange: (from, to) => api.get('/api/schedules/range', { params: { from, to } }),
+  getFree: (from, to, minMinutes = 30) =>
+    api.get('/api/schedules/free', { params: { from, to, min_minutes: minMinutes } }),
   getById: (id) => api.get(`/api/schedules/${id}`),
   create: (data) => api.post('/api/schedules/', data),
   update: (id, data) => api.put(`/api/schedules/${id}`, data),
   delete: (id) => api.delete(`/api/schedules/${id}`),
+  batch: (operations) => api.post('/api/schedules/batch', { operations }),
 };
 
 // Chat API
 export const chatAPI = {
-  sendMessage: (message) => api.post('/api/chat/', { message }),
+  sendMessage: (message) =>
+    api.post('/api/chat/', { message }, { params: { tz_offset: -new Date().getTimezoneOffset() } }),
+};
+
+// Dashboard API
+export const dashboardAPI = {
+  get: (pendingLimit = 5) =>
+    api.get('/api/dashboard', {
+      params: { pending_limit: pendingLimit, tz_offset: -new Date().getTimezoneOffset() },
+    }),
 };
 
 export default api;
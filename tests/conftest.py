@@ -0,0 +1,136 @@
+"""Shared fixtures: an in-memory MongoDB that counts the commands sent to it,
+and an authenticated test client for the FastAPI app.
+
+The app's lifespan (MongoDB connection, indexes, scheduler election) is not
+run; ``backend.database.db`` is pointed at a mongomock-motor client instead.
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from backend import database
+from backend.auth import create_access_token
+
+# Collection methods that each send one command to the server
+COMMANDS = {
+    "aggregate", "bulk_write", "count_documents", "delete_many", "delete_one", "distinct",
+    "find", "find_one", "find_one_and_delete", "find_one_and_replace", "find_one_and_update",
+    "insert_many", "insert_one", "replace_one", "update_many", "update_one",
+}
+
+class CountingCollection:
+    """Forward to a collection, recording every command method called on it"""
+
+    def __init__(self, collection, commands: Counter):
+        self._collection = collection
+        self._commands = commands
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if name not in COMMANDS:
+            return attribute
+
+        def command(*args, **kwargs):
+            self._commands[(self._collection.name, name)] += 1
+            return attribute(*args, **kwargs)
+        return command
+
+class CountingDatabase:
+    """Forward to a database, handing out CountingCollections"""
+
+    def __init__(self, db):
+        self.raw = db
+        self.commands = Counter()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.raw, name)
+        # Database methods are defined on the class; collections are looked up by name
+        if name.startswith("_") or hasattr(type(self.raw), name):
+            return attribute
+        return CountingCollection(attribute, self.commands)
+
+    def __getitem__(self, name):
+        return CountingCollection(self.raw[name], self.commands)
+
+    def total(self) -> int:
+        return sum(self.commands.values())
+
+    def reset(self):
+        self.commands.clear()
+
+@pytest.fixture
+def db():
+    client = AsyncMongoMockClient()
+    counting = CountingDatabase(client["student_planner_test"])
+    database.db.client, database.db.db = client, counting
+    yield counting
+    database.db.client = database.db.db = None
+
+@pytest.fixture
+def client(db, monkeypatch):
+    from backend import email_service
+    from backend.main import app
+
+    async def send(*args, **kwargs):
+        return {}, "OK"
+    # Notification emails are best effort; don't reach for an SMTP server
+    monkeypatch.setattr(email_service.aiosmtplib, "send", send)
+    return TestClient(app)
+
+def run(coroutine):
+    """Run a coroutine, e.g. seeding the database, outside the app"""
+    return asyncio.run(coroutine)
+
+def auth_headers(user_id: str) -> dict:
+    email = f"{user_id}@example.com"
+    return {"Authorization": "Bearer " + create_access_token({"user_id": user_id, "email": email, "sub": email})}
+
+@pytest.fixture
+def user(db):
+    """A new user id and the headers that authenticate as it"""
+    user_id = str(ObjectId())
+    return user_id, auth_headers(user_id)
+
+def course_document(user_id: str, index: int = 0) -> dict:
+    return {
+        "user_id": user_id,
+        "course_name": f"Course {index}",
+        "course_code": f"C{index}",
+        "instructor": None,
+        "description": None,
+        "color": "#3B82F6",
+        "created_at": datetime(2026, 1, 1),
+    }
+
+def assignment_document(user_id: str, course_id: str, index: int = 0) -> dict:
+    return {
+        "user_id": user_id,
+        "course_id": course_id,
+        "title": f"Assignment {index}",
+        "description": None,
+        "due_date": datetime(2026, 9, 1) + timedelta(hours=index),
+        "priority": "medium",
+        "completed": False,
+        "reminder_sent": False,
+        "created_at": datetime(2026, 1, 1),
+    }
+
+def schedule_document(user_id: str, course_id: str, index: int = 0) -> dict:
+    start = datetime(2026, 9, 1, 8) + timedelta(hours=2 * index)
+    return {
+        "user_id": user_id,
+        "course_id": course_id,
+        "title": f"Lecture {index}",
+        "description": None,
+        "start_time": start,
+        "end_time": start + timedelta(hours=1),
+        "day_of_week": None,
+        "location": None,
+        "recurrence": None,
+        "created_at": datetime(2026, 1, 1),
+    }
@@ -0,0 +1,19 @@
+"""The auth dependency rejects malformed tokens and shares one implementation."""
+from jose import jwt
+
+from backend import auth, auth_utils
+from backend.config import settings
+
+def test_token_without_expiry_is_rejected(client, user):
+    user_id, _ = user
+    claims = {"user_id": user_id, "email": f"{user_id}@example.com", "type": "access"}
+    token = jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    response = client.get("/api/courses/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
+    assert auth.token_cache.get(token) is None
+
+def test_auth_utils_reexports_auth():
+    for name in ("create_access_token", "get_current_user", "get_password_hash", "verify_password"):
+        assert getattr(auth_utils, name) is getattr(auth, name)
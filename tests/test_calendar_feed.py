@@ -0,0 +1,69 @@
+"""The iCalendar subscription feed."""
+import re
+
+from bson import ObjectId
+
+from tests.conftest import run
+
+def subscribe(db, client, user) -> str:
+    """Store the user and create their feed token; returns the feed URL"""
+    user_id, headers = user
+    run(db.raw.users.insert_one({"_id": ObjectId(user_id), "email": f"{user_id}@example.com"}))
+    return client.post("/api/calendar/token", headers=headers).json()["url"]
+
+def test_event_times_are_floating_wall_clock_times(db, client, user):
+    _, headers = user
+    schedule = {
+        "title": "Lecture", "start_time": "2026-09-01T18:30:00", "end_time": "2026-09-01T19:30:00",
+        "recurrence": {"weekdays": ["Tuesday"], "until": "2026-12-15T00:00:00", "exceptions": ["2026-10-06"]},
+    }
+    assert client.post("/api/schedules/", json=schedule, headers=headers).status_code == 200
+
+    feed = client.get(subscribe(db, client, user)).text
+
+    assert "DTSTART:20260901T183000\r\n" in feed
+    assert "DTEND:20260901T193000\r\n" in feed
+    assert "RRULE:FREQ=WEEKLY;INTERVAL=1;BYDAY=TU;UNTIL=20261215T235959\r\n" in feed
+    assert "EXDATE:20261006T183000\r\n" in feed
+    # DTSTAMP alone is UTC
+    assert re.search(r"DTSTAMP:\d{8}T\d{6}Z\r\n", feed)
+
+def test_any_worker_answers_304_without_rendering(db, client, user):
+    from backend import calendar_feed
+    url = subscribe(db, client, user)
+    etag = client.get(url).headers["etag"]
+
+    # Another worker: nothing rendered or cached in this process
+    calendar_feed.feed_cache.invalidate(user[0])
+    db.reset()
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert set(db.commands) == {("users", "find_one"), ("collection_versions", "find_one")}
+
+def test_writes_change_the_etag(db, client, user):
+    _, headers = user
+    url = subscribe(db, client, user)
+    etag = client.get(url).headers["etag"]
+    assert client.post("/api/courses/", json={"course_name": "Math"}, headers=headers).status_code == 200
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert client.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+def test_assignments_are_instant_events_without_dtend(db, client, user):
+    _, headers = user
+    course = client.post("/api/courses/", json={"course_name": "Math", "course_code": "M1"}, headers=headers).json()
+    assignment = {"title": "Essay", "course_id": course["id"], "due_date": "2030-01-15T23:59:00"}
+    assert client.post("/api/assignments/", json=assignment, headers=headers).status_code == 200
+
+    feed = client.get(subscribe(db, client, user)).text
+
+    event = feed[feed.index("UID:assignment-"):]
+    event = event[:event.index("END:VEVENT")]
+    assert "DTSTART:20300115T235900\r\n" in event
+    assert "DTEND" not in event
+    assert "SUMMARY:Due: Essay (Math)" in event
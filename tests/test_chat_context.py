@@ -0,0 +1,23 @@
+"""The chatbot's context is anchored at the client's local time."""
+from datetime import datetime, timedelta
+
+from backend.ai_chatbot import AcademicPlannerChatbot
+from tests.conftest import run, schedule_document
+
+def test_context_starts_at_client_local_time(db, user):
+    user_id, _ = user
+    tz_offset = 10 * 60  # UTC+10
+    # Two hours from now in UTC is eight hours ago on the client's wall clock
+    past = schedule_document(user_id, None)
+    past["start_time"] = datetime.utcnow() + timedelta(hours=2)
+    past["end_time"] = past["start_time"] + timedelta(hours=1)
+    run(db.raw.schedules.insert_one(past))
+    chatbot = AcademicPlannerChatbot()
+
+    context = run(chatbot.get_user_context(user_id, tz_offset))
+
+    assert context["schedules"] == []
+    first_free = datetime.strptime(context["free_slots"][0]["start"], "%Y-%m-%d %H:%M")
+    local_now = datetime.utcnow() + timedelta(minutes=tz_offset)
+    assert abs(first_free - local_now) < timedelta(minutes=10)
+    assert "UTC" not in chatbot._create_system_prompt(context)
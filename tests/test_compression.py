@@ -0,0 +1,54 @@
+"""CompressionMiddleware: streamed chunks are flushed as they are sent."""
+import json
+import zlib
+
+import pytest
+
+from backend.middleware import CompressionMiddleware, brotli
+from tests.conftest import run
+
+LINES = [json.dumps({"index": index, "title": f"Assignment {index}"}).encode() + b"\n" for index in range(200)]
+
+async def ndjson(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+    for line in LINES:
+        await send({"type": "http.response.body", "body": line, "more_body": True})
+    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def stream(encoding: bytes) -> list:
+    middleware = CompressionMiddleware(ndjson, minimum_size=1024, gzip_level=6, brotli_quality=4)
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", encoding)]}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    run(middleware(scope, receive, send))
+    return messages
+
+def test_gzip_stream_decodes_chunk_by_chunk():
+    start, *bodies = stream(b"gzip")
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    assert len(bodies) == len(LINES) + 1
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for line, message in zip(LINES, bodies):
+        # Each line is readable as soon as its own chunk arrives
+        assert decompressor.decompress(message["body"]) == line
+    assert decompressor.decompress(bodies[-1]["body"]) == b""
+    assert decompressor.eof
+
+@pytest.mark.skipif(brotli is None, reason="brotli is not installed")
+def test_brotli_stream_decodes_chunk_by_chunk():
+    start, *bodies = stream(b"br")
+    assert (b"content-encoding", b"br") in start["headers"]
+    assert len(bodies) == len(LINES) + 1
+
+    decompressor = brotli.Decompressor()
+    for line, message in zip(LINES, bodies):
+        assert decompressor.process(message["body"]) == line
+    decompressor.process(bodies[-1]["body"])
+    assert decompressor.is_finished()
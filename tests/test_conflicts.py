@@ -0,0 +1,165 @@
+"""Overlap detection checked against brute force, at 10,000 events per user."""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.conflicts import find_conflicts, find_overlaps
+from backend.models import WEEKDAYS
+from backend.recurrence import expand, expand_all
+
+WINDOW_START = datetime(2026, 9, 1)
+WINDOW_END = datetime(2027, 9, 1)
+
+def make_schedules(rng: random.Random, series: int, one_offs: int) -> list:
+    """Weekly series and one-off events at random times, overlapping often"""
+    schedules = []
+    for index in range(series + one_offs):
+        start = WINDOW_START + timedelta(days=rng.randrange(360), hours=rng.randrange(24), minutes=rng.choice((0, 15, 30, 45)))
+        schedule = {
+            "_id": f"event{index}",
+            "start_time": start,
+            "end_time": start + timedelta(minutes=rng.choice((30, 50, 60, 90, 180))),
+            "recurrence": None,
+        }
+        if index < series:
+            schedule["recurrence"] = {
+                "weekdays": rng.sample(WEEKDAYS, rng.randint(1, 3)),
+                "interval": rng.choice((1, 2)),
+                "until": start + timedelta(days=rng.randrange(30, 200)),
+                "exceptions": [start + timedelta(days=7 * rng.randrange(1, 8))],
+            }
+        schedules.append(schedule)
+    return schedules
+
+def overlaps(first: dict, second: dict) -> bool:
+    return first["start_time"] < second["end_time"] and second["start_time"] < first["end_time"]
+
+def pair_ids(pairs) -> set:
+    return {frozenset((str(first["_id"]), str(second["_id"]))) for first, second in pairs}
+
+def brute_force_overlaps(events: list) -> set:
+    return pair_ids(
+        (first, second)
+        for index, first in enumerate(events)
+        for second in events[index + 1:]
+        if overlaps(first, second)
+    )
+
+def sorted_scan_overlaps(events: list) -> set:
+    """Brute force restricted to later-starting events that start before this one ends"""
+    pairs = []
+    for index, first in enumerate(events):
+        for second in events[index + 1:]:
+            if second["start_time"] >= first["end_time"]:
+                break
+            pairs.append((first, second))
+    return pair_ids(pairs)
+
+@pytest.fixture(scope="module")
+def events() -> list:
+    """About 10,000 occurrences: 150 expanded series plus one-off events"""
+    rng = random.Random(9)
+    occurrences = list(expand_all(make_schedules(rng, series=150, one_offs=0), WINDOW_START, WINDOW_END))
+    one_offs = make_schedules(rng, series=0, one_offs=10_000 - len(occurrences))
+    merged = sorted(occurrences + one_offs, key=lambda event: event["start_time"])
+    assert len(merged) == 10_000
+    assert any(event.get("series_id") for event in merged)
+    return merged
+
+def test_sorted_scan_matches_brute_force():
+    # The reference used at 10,000 events, itself checked against all pairs
+    rng = random.Random(3)
+    events = sorted(
+        expand_all(make_schedules(rng, series=10, one_offs=400), WINDOW_START, WINDOW_END),
+        key=lambda event: event["start_time"]
+    )
+    assert sorted_scan_overlaps(events) == brute_force_overlaps(events)
+
+def test_find_overlaps_matches_brute_force(events):
+    found = list(find_overlaps(events))
+
+    assert pair_ids(found) == sorted_scan_overlaps(events)
+    assert len(found) == len(pair_ids(found))  # each pair reported once
+    assert found  # the data does contain overlaps
+
+def test_touching_events_do_not_overlap():
+    first = {"_id": "a", "start_time": datetime(2026, 9, 1, 9), "end_time": datetime(2026, 9, 1, 10)}
+    second = {"_id": "b", "start_time": datetime(2026, 9, 1, 10), "end_time": datetime(2026, 9, 1, 11)}
+
+    assert list(find_overlaps([first, second])) == []
+    assert find_conflicts([second], [first]) == []
+
+@pytest.mark.parametrize("recurring", [True, False])
+def test_find_conflicts_matches_brute_force(events, recurring):
+    rng = random.Random(5)
+    schedule = make_schedules(rng, series=1 if recurring else 0, one_offs=0 if recurring else 1)[0]
+    candidates = list(expand(schedule, WINDOW_START, WINDOW_END))
+
+    found = find_conflicts(candidates, events)
+
+    expected = {str(event["_id"]) for event in events if any(overlaps(event, candidate) for candidate in candidates)}
+    assert expected
+    assert {str(event["_id"]) for event in found} == expected
+    assert [event["start_time"] for event in found] == sorted(event["start_time"] for event in found)
+
+LECTURE = {
+    "title": "Lecture",
+    "start_time": "2026-09-01T10:00:00",
+    "end_time": "2026-09-01T11:00:00",
+    "recurrence": {"weekdays": ["Tuesday"], "interval": 1},
+}
+
+def test_overlapping_schedule_is_saved_with_its_conflicts(client, user):
+    _, headers = user
+    lecture = client.post("/api/schedules/", json=LECTURE, headers=headers).json()
+    assert lecture["conflicts"] == []
+
+    clash = {"title": "Clash", "start_time": "2026-09-08T10:30:00", "end_time": "2026-09-08T11:30:00"}
+    response = client.post("/api/schedules/", json=clash, headers=headers)
+
+    assert response.status_code == 200
+    assert [(event["id"], event["title"], event["start_time"]) for event in response.json()["conflicts"]] == [
+        (f"{lecture['id']}_20260908T1000", "Lecture", "2026-09-08T10:00:00")
+    ]
+    assert len(client.get("/api/schedules/", headers=headers).json()) == 2
+
+    # Moving it clear of the lecture reports nothing, and never reports the event itself
+    moved = {**clash, "start_time": "2026-09-08T11:00:00", "end_time": "2026-09-08T12:00:00"}
+    response = client.put(f"/api/schedules/{response.json()['id']}", json=moved, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["conflicts"] == []
+
+def test_batch_reports_conflicts_with_stored_events_and_each_other(client, user, db):
+    _, headers = user
+    lecture = client.post("/api/schedules/", json=LECTURE, headers=headers).json()
+    clash = {"title": "Clash", "start_time": "2026-09-01T10:30:00", "end_time": "2026-09-01T11:30:00"}
+    later = {"title": "Later", "start_time": "2026-09-01T11:00:00", "end_time": "2026-09-01T12:00:00"}
+    apart = {"title": "Apart", "start_time": "2026-09-02T11:00:00", "end_time": "2026-09-02T12:00:00"}
+    batch = {"operations": [{"op": "create", "data": item} for item in (clash, later, apart)]}
+
+    db.reset()
+    results = client.post("/api/schedules/batch", json=batch, headers=headers).json()["results"]
+
+    assert [result["success"] for result in results] == [True, True, True]
+    conflicts = [
+        [(event["id"], event["title"], event["batch_index"]) for event in result["conflicts"] or []]
+        for result in results
+    ]
+    assert conflicts == [
+        [(f"{lecture['id']}_20260901T1000", "Lecture", None), (None, "Later", 1)],
+        [(None, "Clash", 0)],
+        [],
+    ]
+    # One window query for the whole batch, however many items it has
+    assert db.commands[("schedules", "find")] == 1
+
+def test_batch_ignores_stored_versions_it_replaces(client, user):
+    _, headers = user
+    lecture = client.post("/api/schedules/", json={**LECTURE, "recurrence": None}, headers=headers).json()
+    clash = {"title": "Clash", "start_time": "2026-09-01T10:30:00", "end_time": "2026-09-01T11:30:00"}
+    batch = {"operations": [{"op": "delete", "id": lecture["id"]}, {"op": "create", "data": clash}]}
+
+    results = client.post("/api/schedules/batch", json=batch, headers=headers).json()["results"]
+
+    assert [(result["success"], result["conflicts"]) for result in results] == [(True, None), (True, None)]
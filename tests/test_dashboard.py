@@ -0,0 +1,29 @@
+"""The aggregated dashboard."""
+from datetime import datetime, timedelta
+
+def test_today_is_the_clients_local_day(client, user):
+    _, headers = user
+    # UTC+5:30; stored times are the user's wall-clock times
+    offset = timedelta(hours=5, minutes=30)
+    local_now = datetime.utcnow() + offset
+    evening = datetime.combine(local_now.date(), datetime.min.time()) + timedelta(hours=23)
+    schedule = {"title": "Evening study", "start_time": evening.isoformat(), "end_time": (evening + timedelta(minutes=30)).isoformat()}
+    assert client.post("/api/schedules/", json=schedule, headers=headers).status_code == 200
+
+    dashboard = client.get("/api/dashboard", params={"tz_offset": 330}, headers=headers).json()
+
+    assert [event["title"] for event in dashboard["today_schedule"]] == ["Evening study"]
+
+def test_stats_and_dashboard_agree_on_overdue(client, user):
+    _, headers = user
+    course = client.post("/api/courses/", json={"course_name": "Math", "course_code": "M1"}, headers=headers).json()
+    # Three hours ahead in UTC, but already past on a UTC+10 wall clock
+    due = datetime.utcnow() + timedelta(hours=3)
+    assignment = {"title": "Essay", "course_id": course["id"], "due_date": due.isoformat()}
+    assert client.post("/api/assignments/", json=assignment, headers=headers).status_code == 200
+
+    for tz_offset, overdue in ((0, 0), (600, 1)):
+        params = {"tz_offset": tz_offset}
+        stats = client.get("/api/assignments/stats", params=params, headers=headers).json()
+        dashboard = client.get("/api/dashboard", params=params, headers=headers).json()
+        assert stats["overdue"] == dashboard["assignment_counts"]["overdue"] == overdue
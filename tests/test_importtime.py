@@ -0,0 +1,29 @@
+"""Startup stays within its import-time budget and leaves the LLM stack lazy."""
+import threading
+
+from backend import ai_chatbot, importtime
+from tests.conftest import run
+
+def test_startup_import_budget():
+    timings = importtime.measure()
+
+    assert importtime._total_us(timings) <= importtime.DEFAULT_BUDGET_MS * 1000
+    eager = {name for name, _, _ in timings if name.split(".")[0] in importtime.LAZY_MODULES}
+    assert not eager
+
+def test_first_chat_imports_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def import_llm_stack():
+        threads.append(threading.current_thread())
+
+    def initialize():
+        raise RuntimeError("stop after the imports")
+    monkeypatch.setattr(ai_chatbot, "_import_llm_stack", import_llm_stack)
+    chatbot = ai_chatbot.AcademicPlannerChatbot()
+    monkeypatch.setattr(chatbot, "_initialize", initialize)
+
+    run(chatbot.chat("user", "hello"))
+
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
@@ -0,0 +1,22 @@
+"""Startup must not continue without the indexes that enforce correctness."""
+import pytest
+from pymongo.errors import OperationFailure
+
+from backend.indexes import ensure_indexes
+from tests.conftest import run
+
+def test_duplicate_emails_fail_startup(db):
+    run(db.raw.users.insert_many([{"email": "a@example.com"}, {"email": "a@example.com"}]))
+
+    with pytest.raises(OperationFailure):
+        run(ensure_indexes(db.raw))
+
+def test_registration_rejects_duplicate_email_once_indexed(db, client):
+    run(ensure_indexes(db.raw))
+    user = {"email": "a@example.com", "full_name": "A", "password": "secret123"}
+
+    assert client.post("/api/auth/register", json=user).status_code == 200
+    response = client.post("/api/auth/register", json=user)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
@@ -0,0 +1,142 @@
+"""Leader election between several workers sharing one database.
+
+Each LeaderElection stands in for a worker process: it has its own worker id
+and competes for the same lease document, with leases shortened to fractions
+of a second.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from backend import scheduler
+from backend.leader import LeaderElection
+from tests.conftest import assignment_document, run
+
+LEASE_SECONDS = 0.3
+RENEW_SECONDS = 0.05
+
+def electors(count: int, on_elected=lambda worker: None) -> list:
+    return [
+        LeaderElection(
+            "test",
+            on_elected=lambda worker=worker: on_elected(worker),
+            on_demoted=lambda: None,
+            lease_seconds=LEASE_SECONDS,
+            renew_seconds=RENEW_SECONDS,
+            worker_id=f"worker{worker}",
+        )
+        for worker in range(count)
+    ]
+
+def leaders(workers: list) -> list:
+    return [worker for worker in workers if worker.is_leader]
+
+async def crash(worker: LeaderElection):
+    """Stop renewing without releasing the lease, as a killed process would"""
+    worker._task.cancel()
+    await asyncio.gather(worker._task, return_exceptions=True)
+    worker._task = None
+
+def test_exactly_one_leader(db):
+    async def scenario():
+        workers = electors(5)
+        for worker in workers:
+            worker.start()
+        await asyncio.sleep(4 * LEASE_SECONDS)  # many renewal rounds
+
+        holders = leaders(workers)
+        lease = await db.raw.leases.find_one({"_id": "test"})
+        for worker in workers:
+            await worker.stop()
+        return holders, lease
+
+    holders, lease = run(scenario())
+    assert len(holders) == 1
+    assert lease["holder"] == holders[0].worker_id
+
+def test_takeover_when_the_leader_stops_renewing(db):
+    async def scenario():
+        workers = electors(3)
+        for worker in workers:
+            worker.start()
+        await asyncio.sleep(2 * RENEW_SECONDS)
+        first = leaders(workers)[0]
+
+        await crash(first)
+        # The lease is still held until it expires
+        await asyncio.sleep(LEASE_SECONDS / 3)
+        during = [worker for worker in leaders(workers) if worker is not first]
+        await asyncio.sleep(LEASE_SECONDS + 2 * RENEW_SECONDS)
+        after = [worker for worker in leaders(workers) if worker is not first]
+
+        for worker in workers:
+            await worker.stop()
+        return during, after
+
+    during, after = run(scenario())
+    assert during == []
+    assert len(after) == 1
+
+def test_takeover_right_after_a_clean_release(db):
+    async def scenario():
+        workers = electors(3)
+        for worker in workers:
+            worker.start()
+        await asyncio.sleep(2 * RENEW_SECONDS)
+        first = leaders(workers)[0]
+
+        await first.stop()
+        # Well before the released lease would have expired
+        await asyncio.sleep(2 * RENEW_SECONDS)
+        after = leaders(workers)
+
+        for worker in workers:
+            await worker.stop()
+        return after
+
+    after = run(scenario())
+    assert len(after) == 1
+
+def test_reminders_are_sent_once_across_workers(db, monkeypatch):
+    sent = []
+
+    async def send_assignment_reminder(**kwargs):
+        await asyncio.sleep(0)  # let overlapping runs interleave
+        sent.append(kwargs["assignment_title"])
+        return True
+    monkeypatch.setattr(scheduler, "send_assignment_reminder", send_assignment_reminder)
+
+    async def scenario():
+        user = await db.raw.users.insert_one({"email": "student@example.com"})
+        course = await db.raw.courses.insert_one({"course_name": "Course"})
+        due = datetime.utcnow() + timedelta(days=1)
+        await db.raw.assignments.insert_many([
+            {**assignment_document(str(user.inserted_id), str(course.inserted_id), index), "due_date": due}
+            for index in range(20)
+        ])
+
+        runs = []
+
+        def on_elected(worker):
+            # Each newly elected worker runs the job at once, and twice more in
+            # overlap, as it would when a handover lands on a scheduled time
+            runs.extend(
+                asyncio.get_running_loop().create_task(scheduler.check_assignment_reminders())
+                for _ in range(3)
+            )
+
+        workers = electors(3, on_elected)
+        for worker in workers:
+            worker.start()
+        await asyncio.sleep(2 * RENEW_SECONDS)
+        await crash(leaders(workers)[0])
+        await asyncio.sleep(LEASE_SECONDS + 2 * RENEW_SECONDS)
+
+        elected = len(runs) // 3
+        await asyncio.gather(*runs)
+        for worker in workers:
+            await worker.stop()
+        return elected
+
+    elected = run(scenario())
+    assert elected == 2  # the first leader and the one that took over
+    assert sorted(sent) == sorted(f"Assignment {index}" for index in range(20))
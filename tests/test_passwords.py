@@ -0,0 +1,30 @@
+"""Password pool latency statistics under concurrent observers."""
+import sys
+import threading
+
+from backend.passwords import LATENCY_BUCKETS, LatencyStats
+
+def test_concurrent_observations_are_not_lost():
+    stats = LatencyStats()
+    threads, per_thread = 8, 20000
+
+    def observe():
+        for _ in range(per_thread):
+            stats.observe(0.2)
+
+    workers = [threading.Thread(target=observe) for _ in range(threads)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often, so unlocked updates would collide
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    count, total, maximum, buckets = stats.read()
+    assert count == threads * per_thread
+    assert abs(total - 0.2 * count) < 1e-6 * count
+    assert maximum == 0.2
+    assert buckets == [0 if bound < 0.2 else count for bound in LATENCY_BUCKETS]
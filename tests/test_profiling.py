@@ -0,0 +1,22 @@
+"""Saved request profiles are capped in number."""
+import os
+import time
+
+from backend import profiling
+
+def test_oldest_profiles_are_deleted_beyond_max_files(tmp_path):
+    now = time.time()
+    for index in range(4):
+        old = tmp_path / f"old{index}.pstats"
+        old.write_bytes(b"")
+        os.utime(old, (now - 100 + index, now - 100 + index))
+    (tmp_path / "notes.txt").write_text("not a profile")
+
+    session = profiling._CProfileSession(0.001)
+    session.start()
+    sum(range(1000))
+    session.stop()
+    path = profiling.save(session, str(tmp_path), "new", max_files=3)
+
+    assert sorted(os.listdir(tmp_path)) == ["new.pstats", "notes.txt", "old2.pstats", "old3.pstats"]
+    assert os.path.basename(path) == "new.pstats"
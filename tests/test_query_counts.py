@@ -0,0 +1,74 @@
+"""Reads must issue a fixed number of MongoDB commands however many rows they
+return: course names are resolved with one $in query, not one per row."""
+import pytest
+from bson import ObjectId
+
+from tests.conftest import assignment_document, auth_headers, course_document, run, schedule_document
+
+def seed(db, rows: int):
+    """A new user with ``rows`` assignments and schedules, each in a course of its own"""
+    user_id = str(ObjectId())
+
+    async def insert():
+        courses = await db.raw.courses.insert_many([course_document(user_id, i) for i in range(rows)])
+        course_ids = [str(course_id) for course_id in courses.inserted_ids]
+        assignments = await db.raw.assignments.insert_many(
+            [assignment_document(user_id, course_id, i) for i, course_id in enumerate(course_ids)]
+        )
+        schedules = await db.raw.schedules.insert_many(
+            [schedule_document(user_id, course_id, i) for i, course_id in enumerate(course_ids)]
+        )
+        return {
+            "course": str(courses.inserted_ids[0]),
+            "assignment": str(assignments.inserted_ids[0]),
+            "schedule": str(schedules.inserted_ids[0]),
+        }
+
+    return auth_headers(user_id), run(insert())
+
+def commands_for(db, client, headers, url: str, params: dict, rows: int = None) -> int:
+    db.reset()
+    response = client.get(url, headers=headers, params=params)
+    assert response.status_code == 200, response.text
+    if rows is not None:
+        lines = response.text.splitlines() if params.get("stream") else response.json()
+        assert len(lines) == rows
+    return db.total()
+
+@pytest.mark.parametrize("url, params", [
+    ("/api/courses/", {"limit": 500}),
+    ("/api/courses/", {"stream": "true"}),
+    ("/api/assignments/", {"limit": 500}),
+    ("/api/assignments/", {"stream": "true"}),
+    ("/api/schedules/", {"limit": 500}),
+    ("/api/schedules/", {"stream": "true"}),
+    ("/api/schedules/", {"expand": "true", "limit": 500, "start_after": "2026-08-01T00:00:00", "start_before": "2026-10-01T00:00:00"}),
+    ("/api/schedules/range", {"from": "2026-08-01T00:00:00", "to": "2026-10-01T00:00:00"}),
+])
+def test_list_commands_do_not_grow_with_rows(db, client, url, params):
+    one_headers, _ = seed(db, 1)
+    many_headers, _ = seed(db, 300)
+
+    one = commands_for(db, client, one_headers, url, params, rows=1)
+    many = commands_for(db, client, many_headers, url, params, rows=300)
+
+    assert one == many
+
+@pytest.mark.parametrize("kind", ["course", "assignment", "schedule"])
+def test_single_item_commands_do_not_grow_with_rows(db, client, kind):
+    one_headers, one_ids = seed(db, 1)
+    many_headers, many_ids = seed(db, 300)
+    url = f"/api/{kind}s/{{}}"
+
+    one = commands_for(db, client, one_headers, url.format(one_ids[kind]), {})
+    many = commands_for(db, client, many_headers, url.format(many_ids[kind]), {})
+
+    assert one == many
+
+def test_assignment_list_resolves_course_names_in_one_query(db, client):
+    headers, _ = seed(db, 300)
+
+    commands_for(db, client, headers, "/api/assignments/", {"limit": 500})
+
+    assert db.commands[("courses", "find")] == 1
+    assert db.commands[("assignments", "find")] == 1
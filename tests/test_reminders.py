@@ -0,0 +1,33 @@
+"""Assignment reminders find the user and course the assignment belongs to."""
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from backend import scheduler
+from tests.conftest import assignment_document, course_document, run
+
+def test_reminder_is_sent_to_the_assignment_owner(db, monkeypatch):
+    sent = []
+
+    async def send_assignment_reminder(**kwargs):
+        sent.append(kwargs)
+        return True
+    monkeypatch.setattr(scheduler, "send_assignment_reminder", send_assignment_reminder)
+
+    async def seed():
+        # Stored the way the app stores them: ObjectId _ids, string references
+        user = await db.raw.users.insert_one({"email": "student@example.com", "full_name": "Student"})
+        user_id = str(user.inserted_id)
+        course = await db.raw.courses.insert_one(course_document(user_id))
+        assignment = assignment_document(user_id, str(course.inserted_id))
+        assignment["due_date"] = datetime.utcnow() + timedelta(days=1)
+        return (await db.raw.assignments.insert_one(assignment)).inserted_id
+
+    assignment_id = run(seed())
+    run(scheduler.check_assignment_reminders())
+
+    assert len(sent) == 1
+    assert sent[0]["user_email"] == "student@example.com"
+    assert sent[0]["course_name"] == "Course 0"
+    assignment = run(db.raw.assignments.find_one({"_id": ObjectId(assignment_id)}))
+    assert assignment["reminder_sent"] is True
@@ -0,0 +1,26 @@
+"""Content negotiation between JSON and MessagePack."""
+import msgpack
+import pytest
+
+from tests.conftest import course_document, run
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", "application/msgpack"),
+    ("application/x-msgpack, */*;q=0.8", "application/msgpack"),
+    ("application/json", "application/json"),
+    ("application/msgpack;q=0", "application/json"),
+    ("application/msgpack;q=0, */*", "application/json"),
+    ("application/json, application/msgpack;q=0.5", "application/json"),
+    ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+    ("", "application/json"),
+])
+def test_accept_selects_encoding(client, user, db, accept, expected):
+    user_id, headers = user
+    run(db.raw.courses.insert_one(course_document(user_id)))
+
+    response = client.get("/api/courses/", headers={**headers, "Accept": accept})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == expected
+    body = msgpack.unpackb(response.content) if expected == "application/msgpack" else response.json()
+    assert [course["course_name"] for course in body] == ["Course 0"]
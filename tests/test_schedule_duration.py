@@ -0,0 +1,35 @@
+"""Schedules must end after they start and last at most SCHEDULE_MAX_EVENT_HOURS,
+or window queries and free/busy can't see them correctly."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.config import settings
+
+@pytest.mark.parametrize("end_time", [
+    "2026-09-01T10:00:00",  # zero length
+    "2026-09-01T09:00:00",  # ends before it starts
+    "2026-09-20T10:00:00",  # 19 days
+])
+def test_invalid_durations_are_rejected(client, user, end_time):
+    _, headers = user
+    schedule = {"title": "Event", "start_time": "2026-09-01T10:00:00", "end_time": end_time}
+
+    assert client.post("/api/schedules/", json=schedule, headers=headers).status_code == 422
+    batch = {"operations": [{"op": "create", "data": schedule}]}
+    assert client.post("/api/schedules/batch", json=batch, headers=headers).status_code == 422
+
+def test_longest_allowed_event_shows_up_in_windows_inside_it(client, user):
+    _, headers = user
+    start = datetime(2026, 9, 1)
+    end = start + timedelta(hours=settings.SCHEDULE_MAX_EVENT_HOURS)
+    schedule = {"title": "Field trip", "start_time": start.isoformat(), "end_time": end.isoformat()}
+    assert client.post("/api/schedules/", json=schedule, headers=headers).status_code == 200
+
+    window = end - timedelta(hours=2)
+    response = client.get(
+        "/api/schedules/range", headers=headers,
+        params={"from": window.isoformat(), "to": (window + timedelta(hours=1)).isoformat()}
+    )
+
+    assert [event["title"] for event in response.json()] == ["Field trip"]
@@ -0,0 +1,30 @@
+"""Listing schedules with recurring series expanded into occurrences."""
+WINDOW = {"expand": "true", "start_after": "2026-09-01T00:00:00", "start_before": "2026-11-10T00:00:00"}
+
+def test_expanded_occurrences_are_paged_with_a_cursor(client, user):
+    _, headers = user
+    series = {
+        "title": "Lecture", "start_time": "2026-09-01T10:00:00", "end_time": "2026-09-01T11:00:00",
+        "recurrence": {"weekdays": ["Tuesday", "Thursday"], "interval": 1},
+    }
+    one_off = {"title": "Talk", "start_time": "2026-09-03T10:00:00", "end_time": "2026-09-03T11:00:00"}
+    for schedule in (series, one_off):
+        assert client.post("/api/schedules/", json=schedule, headers=headers).status_code == 200
+
+    everything = client.get("/api/schedules/", params={**WINDOW, "limit": 100}, headers=headers)
+    assert "x-next-cursor" not in everything.headers
+    expected = [(item["start_time"], item["title"]) for item in everything.json()]
+    assert len(expected) == 21  # 20 lectures and the talk, which starts with one of them
+
+    pages, cursor = [], None
+    while True:
+        params = {**WINDOW, "limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/schedules/", params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert all(len(page) == 4 for page in pages[:-1])
+    assert [(item["start_time"], item["title"]) for page in pages for item in page] == expected
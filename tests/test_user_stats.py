@@ -0,0 +1,30 @@
+"""Incrementally maintained assignment statistics."""
+from tests.conftest import assignment_document, course_document, run
+
+def test_first_write_does_not_create_partial_stats(db, client, user):
+    user_id, headers = user
+    # Assignments stored before the user had a stats document
+    course_id = str(run(db.raw.courses.insert_one(course_document(user_id))).inserted_id)
+    run(db.raw.assignments.insert_many([assignment_document(user_id, course_id, i) for i in range(5)]))
+
+    assert client.post("/api/courses/", json={"course_name": "Physics"}, headers=headers).status_code == 200
+    assignment = {"title": "Lab report", "course_id": course_id, "due_date": "2026-09-10T10:00:00"}
+    assert client.post("/api/assignments/", json=assignment, headers=headers).status_code == 200
+
+    stats = client.get("/api/assignments/stats", headers=headers).json()
+    assert (stats["total"], stats["pending"]) == (6, 6)
+    dashboard = client.get("/api/dashboard", headers=headers).json()
+    assert dashboard["assignment_counts"]["total"] == 6
+
+def test_writes_after_the_first_read_are_counted(db, client, user):
+    _, headers = user
+    course_id = client.post("/api/courses/", json={"course_name": "Math"}, headers=headers).json()["id"]
+    assert client.get("/api/assignments/stats", headers=headers).json()["total"] == 0
+
+    assignment = {"title": "Problem set", "course_id": course_id, "due_date": "2026-09-10T10:00:00"}
+    assignment_id = client.post("/api/assignments/", json=assignment, headers=headers).json()["id"]
+    assert client.patch(f"/api/assignments/{assignment_id}/complete", headers=headers).status_code == 200
+
+    stats = client.get("/api/assignments/stats", headers=headers).json()
+    assert (stats["total"], stats["pending"], stats["completed"]) == (1, 0, 1)
+    assert [course["course_id"] for course in stats["by_course"]] == [course_id]